@@ -0,0 +1,121 @@
+"""
+Call Channel
+------------
+
+The audio leg of one call: record the caller's turn, play the
+agent's reply. The voice agent only talks to a channel, so the
+local sound card and a simulated telephony line are interchangeable.
+"""
+
+import asyncio
+import inspect
+from typing import AsyncIterator, Callable
+
+
+class CallDropped(ConnectionError):
+    """
+    The media leg went away mid-call (trunk / socket failure, not a
+    hang-up). The call's session is kept so another worker can
+    resume it.
+    """
+
+
+class CallChannel:
+    # perf_counter() times the caller started / stopped talking during
+    # the last record(); None where the channel cannot tell
+    speech_started: float | None = None
+    speech_ended: float | None = None
+
+    # Called with the WAV captured so far when the caller pauses
+    # (end of speech, before the silence timer ends the turn)
+    on_pause: Callable[[bytes], None] | None = None
+
+    async def record(self, preroll=None) -> bytes:
+        """
+        Return the caller's next turn as WAV bytes.
+        `preroll` is audio already captured by wait_for_speech().
+        """
+        raise NotImplementedError
+
+    async def play(self, audio_bytes: bytes) -> None:
+        """
+        Play raw PCM audio to the caller.
+        """
+        raise NotImplementedError
+
+    async def play_stream(self, chunks: AsyncIterator[bytes]) -> None:
+        """
+        Play PCM chunks as they arrive.
+        Channels that cannot stream collect them and play once.
+        """
+        await self.play(b"".join([chunk async for chunk in chunks]))
+
+    def frames(self) -> AsyncIterator[bytes]:
+        """
+        Continuous raw caller audio, for streaming STT.
+        """
+        raise NotImplementedError
+
+    async def wait_for_speech(self, min_speech_ms: int):
+        """
+        Listen while the agent is talking (barge-in). Resolves once
+        the caller has spoken for `min_speech_ms`, returning the
+        captured audio as preroll for the next record().
+        """
+        raise NotImplementedError
+
+
+async def run_blocking(fn, *args):
+    """
+    Await async callables directly; run blocking ones in a thread
+    so one call never stalls the others sharing the loop.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+class LocalAudioChannel(CallChannel):
+    """
+    Microphone + speakers through a recorder / player pair, either
+    the async ones (AsyncSilenceRecorder / AsyncAudioPlayer) or the
+    blocking ones, which then run in a worker thread.
+    """
+
+    def __init__(self, recorder, player, microphone=None):
+        self.recorder = recorder
+        self.player = player
+        self.microphone = microphone
+
+    async def record(self, preroll=None) -> bytes:
+        # The blocking recorder runs in a worker thread
+        self.recorder.on_pause = None
+        if self.on_pause is not None:
+            loop, on_pause = asyncio.get_running_loop(), self.on_pause
+            self.recorder.on_pause = lambda audio: loop.call_soon_threadsafe(on_pause, audio)
+
+        if preroll is not None:
+            audio = await self.recorder.record(preroll)
+        else:
+            audio = await run_blocking(self.recorder.record)
+
+        self.speech_started = self.recorder.speech_started
+        self.speech_ended = self.recorder.speech_ended
+        return audio
+
+    async def play(self, audio_bytes: bytes) -> None:
+        await run_blocking(self.player.play, audio_bytes)
+
+    async def play_stream(self, chunks: AsyncIterator[bytes]) -> None:
+        if hasattr(self.player, "play_stream"):
+            await self.player.play_stream(chunks)
+        else:
+            await super().play_stream(chunks)
+
+    def frames(self) -> AsyncIterator[bytes]:
+        if self.microphone is None:
+            raise RuntimeError("LocalAudioChannel has no microphone stream")
+        return self.microphone.frames()
+
+    async def wait_for_speech(self, min_speech_ms: int):
+        return await self.recorder.wait_for_speech(min_speech_ms)
@@ -0,0 +1,289 @@
+"""
+Audio Formats and Codecs
+------------------------
+
+Conversions between the formats a call passes through:
+
+    telephony line     8 kHz G.711 mu-law / A-law, 20 ms RTP frames
+    microphone / STT   16 kHz linear16
+    TTS / speakers     24 kHz linear16
+
+Everything works on NumPy views of the caller's buffer
+(np.frombuffer over bytes / memoryview, no intermediate bytes):
+
+  - G.711 in both directions is one table lookup per sample
+    (256-entry decode, 65536-entry encode tables, built once at
+    import, bit-exact with the ITU reference / audioop)
+  - Resampler converts between any two rates in exact integer
+    steps and keeps state between frames, so a stream can be
+    resampled 20 ms at a time without clicks or drift
+  - Transcoder chains the two for one direction of a call, and is
+    a pass-through when both sides already agree
+
+negotiate() picks the format a backend should be asked for: the line
+format itself when the backend supports it, so the call needs no
+transcoding hop at all.
+"""
+
+import math
+import struct
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+ENCODINGS = ("linear16", "mulaw", "alaw")   # Deepgram's names
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    encoding: str
+    sample_rate: int
+
+    def __post_init__(self):
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"Unknown audio encoding: {self.encoding}")
+
+    @property
+    def sample_width(self) -> int:
+        return 2 if self.encoding == "linear16" else 1
+
+    def frame_bytes(self, ms: int) -> int:
+        return self.sample_rate * ms // 1000 * self.sample_width
+
+    @property
+    def silence(self) -> int:
+        """
+        Byte value of a silent sample.
+        """
+        return {"linear16": 0, "mulaw": 0xFF, "alaw": 0xD5}[self.encoding]
+
+    def __str__(self):
+        return f"{self.encoding}/{self.sample_rate}"
+
+
+MULAW_8K = AudioFormat("mulaw", 8000)
+ALAW_8K = AudioFormat("alaw", 8000)
+LINEAR16_8K = AudioFormat("linear16", 8000)
+LINEAR16_16K = AudioFormat("linear16", 16000)
+LINEAR16_24K = AudioFormat("linear16", 24000)
+
+
+# --------------------------------------------------
+# G.711 TABLES
+# --------------------------------------------------
+
+def _segments(values: np.ndarray, ends: list[int]) -> np.ndarray:
+    return np.searchsorted(np.array(ends), values, side="left")
+
+
+def _mulaw_tables() -> tuple[np.ndarray, np.ndarray]:
+    # Encode: 14-bit magnitude + bias, 8 segments of 16 steps
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    mag = np.minimum(np.abs(pcm), 8159) + 0x21
+    seg = _segments(mag, [0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+    code = (seg << 4) | ((mag >> (seg + 1)) & 0xF)
+    encode = (np.where(seg >= 8, 0x7F, code) ^ mask).astype(np.uint8)
+
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0xF) << 3) + 0x84) << ((u & 0x70) >> 4)
+    decode = np.where(u & 0x80, 0x84 - t, t - 0x84).astype(np.int16)
+    return encode, decode
+
+
+def _alaw_tables() -> tuple[np.ndarray, np.ndarray]:
+    # Encode: 13-bit magnitude, 8 segments of 16 steps
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    mag = np.where(pcm >= 0, pcm, -pcm - 1)
+    seg = _segments(mag, [0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+    code = (seg << 4) | ((mag >> np.maximum(seg, 1)) & 0xF)
+    encode = (np.where(seg >= 8, 0x7F, code) ^ mask).astype(np.uint8)
+
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    seg = (a & 0x70) >> 4
+    t = ((a & 0xF) << 4) + np.where(seg == 0, 8, 0x108)
+    t = np.where(seg > 1, t << np.maximum(seg - 1, 0), t)
+    decode = np.where(a & 0x80, t, -t).astype(np.int16)
+    return encode, decode
+
+
+_ENCODE = {}
+_DECODE = {}
+_ENCODE["mulaw"], _DECODE["mulaw"] = _mulaw_tables()
+_ENCODE["alaw"], _DECODE["alaw"] = _alaw_tables()
+
+
+def samples(data) -> np.ndarray:
+    """
+    linear16 bytes / bytearray / memoryview as an int16 view (no copy).
+    """
+    return np.frombuffer(data, dtype="<i2")
+
+
+def decode(data, encoding: str, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    int16 samples from `encoding` bytes; a view for linear16.
+    """
+    if encoding == "linear16":
+        return samples(data)
+    codes = np.frombuffer(data, dtype=np.uint8)
+    return np.take(_DECODE[encoding], codes, out=out)
+
+
+def encode(pcm: np.ndarray, encoding: str, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    `encoding` samples (uint8 codes, or int16 for linear16) from int16.
+    """
+    if encoding == "linear16":
+        return pcm
+    return np.take(_ENCODE[encoding], pcm.view(np.uint16), out=out)
+
+
+# --------------------------------------------------
+# RESAMPLING
+# --------------------------------------------------
+
+class Resampler:
+    """
+    Linear-interpolation resampler for a stream of int16 chunks.
+
+    Output sample j sits at input position j * src / dst, tracked as
+    an integer numerator, so chunk sizes never drift (20 ms at 16 kHz
+    always gives exactly 20 ms at 24 kHz). Downsampling first runs a
+    moving average over src/dst samples against aliasing.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        g = math.gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.up = dst_rate // g
+        self.down = src_rate // g
+
+        self.taps = round(src_rate / dst_rate) if src_rate > dst_rate else 1
+        self._kernel = np.full(self.taps, 1.0 / self.taps)
+        self._history = np.zeros(self.taps - 1)
+        self._prev = None
+        # Next output position * up, from the chunk start. Starting at
+        # down - up makes every chunk yield exactly len * dst / src
+        # samples (a constant sub-sample delay; position -1 is the
+        # previous chunk's last sample).
+        self._t = self.down - self.up
+
+    def convert(self, pcm: np.ndarray) -> np.ndarray:
+        n = len(pcm)
+        if n == 0 or self.up == self.down:
+            return pcm
+
+        x = pcm.astype(np.float64)
+        if self.taps > 1:
+            padded = np.concatenate((self._history, x))
+            self._history = padded[n:]
+            x = np.convolve(padded, self._kernel, mode="valid")
+
+        if self._prev is None:
+            self._prev = x[0]
+
+        last = (n - 1) * self.up
+        count = (last - self._t) // self.down + 1 if last >= self._t else 0
+        positions = (self._t + self.down * np.arange(count)) / self.up
+
+        out = np.interp(positions, np.arange(-1, n), np.concatenate(([self._prev], x)))
+        self._t += count * self.down - n * self.up
+        self._prev = x[-1]
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+
+def resample(pcm: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    One-shot resampling of a whole buffer.
+    """
+    if src_rate == dst_rate:
+        return pcm
+    return Resampler(src_rate, dst_rate).convert(pcm)
+
+
+# --------------------------------------------------
+# TRANSCODING
+# --------------------------------------------------
+
+class Transcoder:
+    """
+    One direction of a call, e.g. line (mulaw/8000) -> STT
+    (linear16/16000). Stateful: feed consecutive chunks of one stream.
+    """
+
+    def __init__(self, src: AudioFormat, dst: AudioFormat):
+        self.src = src
+        self.dst = dst
+        self.passthrough = src == dst
+        self.resampler = (
+            Resampler(src.sample_rate, dst.sample_rate)
+            if src.sample_rate != dst.sample_rate else None
+        )
+        # Trailing half of a sample split across chunks (linear16 over HTTP)
+        self._carry = b""
+
+    def convert(self, data) -> memoryview:
+        """
+        `data` (bytes-like, src format) as a byte memoryview in dst format.
+        """
+        if self.passthrough:
+            return memoryview(data).cast("B")
+
+        view = memoryview(data).cast("B")
+        if self._carry:
+            view = memoryview(self._carry + view)
+        cut = len(view) - len(view) % self.src.sample_width
+        self._carry = bytes(view[cut:])
+
+        pcm = decode(view[:cut], self.src.encoding)
+        if self.resampler is not None:
+            pcm = self.resampler.convert(pcm)
+        return memoryview(encode(pcm, self.dst.encoding)).cast("B")
+
+
+def negotiate(line: AudioFormat, supported: Sequence[AudioFormat]) -> AudioFormat:
+    """
+    Format to request from a backend supporting `supported`, given the
+    call's line format: the line format itself if possible, else
+    linear16 at the line rate (lookup only, no resampling), else the
+    backend's preferred format.
+    """
+    if line in supported:
+        return line
+    linear = AudioFormat("linear16", line.sample_rate)
+    if linear in supported:
+        return linear
+    if not supported:
+        raise ValueError("Backend supports no audio formats")
+    return supported[0]
+
+
+# --------------------------------------------------
+# WAV
+# --------------------------------------------------
+
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def wav_header(sample_rate: int, data_bytes: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    44-byte RIFF header for PCM data of `data_bytes` bytes.
+    """
+    block = channels * sample_width
+    return _WAV_HEADER.pack(
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block, block, sample_width * 8,
+        b"data", data_bytes,
+    )
+
+
+def to_wav(pcm: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Mono int16 samples as WAV bytes, copied once (header + data).
+    """
+    data = memoryview(np.ascontiguousarray(pcm, dtype="<i2")).cast("B")
+    return b"".join((wav_header(sample_rate, data.nbytes), data))
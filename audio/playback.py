@@ -1,6 +1,11 @@
+import asyncio
+from typing import AsyncIterator
+
 import sounddevice as sd
 import numpy as np
 
+from audio.ring_buffer import RingBuffer
+
 
 class AudioPlayer:
     def __init__(self, sample_rate: int = 24000):
@@ -9,4 +14,105 @@ class AudioPlayer:
     def play(self, audio_bytes: bytes):
         audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
         sd.play(audio_np, samplerate=self.sample_rate)
-        sd.wait()
\ No newline at end of file
+        sd.wait()
+
+
+class AsyncAudioPlayer(AudioPlayer):
+    """
+    Non-blocking AudioPlayer.
+
+    Each play() owns its output stream and is fed from the driver's
+    callback; the loop only waits for the finished event. Cancelling
+    the awaiting task aborts playback at once.
+    """
+
+    async def play(self, audio_bytes: bytes):
+        audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
+        if not audio_np.size:
+            return
+
+        loop = asyncio.get_running_loop()
+        finished = asyncio.Event()
+        position = 0
+
+        def callback(outdata, frames, time_info, status):
+            nonlocal position
+            chunk = audio_np[position:position + frames]
+            outdata[:len(chunk), 0] = chunk
+            position += len(chunk)
+
+            if len(chunk) < frames:
+                outdata[len(chunk):] = 0
+                raise sd.CallbackStop
+
+        stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="int16",
+            callback=callback,
+            finished_callback=lambda: loop.call_soon_threadsafe(finished.set),
+        )
+
+        with stream:
+            try:
+                await finished.wait()
+            except asyncio.CancelledError:
+                stream.abort()
+                raise
+
+    async def play_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        buffer_ms: int = 2000,
+    ):
+        """
+        Start playing on the first chunk while the rest still streams in.
+
+        Chunks go through a ring buffer the output callback drains.
+        An underrun plays silence; the producer waits while the
+        buffer is full.
+        """
+        loop = asyncio.get_running_loop()
+        finished = asyncio.Event()
+        ring = RingBuffer(int(self.sample_rate * buffer_ms / 1000))
+        producer_done = False
+
+        def callback(outdata, frames, time_info, status):
+            out = outdata[:, 0]
+            n = ring.read_into(out)
+            if n < frames:
+                out[n:] = 0
+                if producer_done and not ring.available:
+                    raise sd.CallbackStop
+
+        stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="int16",
+            callback=callback,
+            finished_callback=lambda: loop.call_soon_threadsafe(finished.set),
+        )
+
+        with stream:
+            try:
+                carry = b""
+                async for chunk in chunks:
+                    # Chunks can split a sample in half
+                    if carry or len(chunk) % 2:
+                        chunk = carry + chunk
+                        cut = len(chunk) - len(chunk) % 2
+                        chunk, carry = chunk[:cut], chunk[cut:]
+
+                    samples = np.frombuffer(chunk, dtype=np.int16)
+                    while samples.size:
+                        written = ring.write(samples)
+                        samples = samples[written:]
+                        if samples.size:
+                            await asyncio.sleep(0.02)
+
+                producer_done = True
+                await finished.wait()
+
+            except asyncio.CancelledError:
+                stream.abort()
+                raise
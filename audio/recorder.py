@@ -6,13 +6,26 @@ Records microphone input until silence is detected
 and returns proper WAV bytes (with header).
 
 This FIXES Deepgram empty transcription.
+
+Speech / silence decisions come from a pluggable VAD engine
+(audio.vad) on short int16 frames. Audio is written into a
+preallocated buffer, so a turn does not allocate per frame.
+Recordings are mono; with `channels > 1` only the first channel
+is kept.
 """
 
+import asyncio
+import math
+import time
+from contextlib import aclosing
+from typing import AsyncIterator
+
 import sounddevice as sd
 import numpy as np
-import time
-import io
-import wave
+
+from audio.codec import to_wav
+from audio.ring_buffer import RingBuffer
+from audio.vad import EnergyVAD, VADEngine
 
 
 class SilenceRecorder:
@@ -20,12 +33,19 @@ class SilenceRecorder:
         self,
         sample_rate: int = 16000,
         channels: int = 1,
-        chunk_ms: int = 100,
+        chunk_ms: int = 20,
         silence_threshold: float = 350.0,
-        silence_duration_ms: int = 900,
+        silence_duration_ms: int = 700,
         max_record_ms: int = 10000,
         start_timeout_ms: int = 5000,
+        barge_in_threshold: float | None = None,
+        preroll_ms: int = 300,
+        vad: VADEngine | None = None,
     ):
+        """
+        silence_duration_ms is counted once the VAD reports the end
+        of speech, i.e. after its hangover (200 ms for EnergyVAD).
+        """
         self.sample_rate = sample_rate
         self.channels = channels
         self.chunk_ms = chunk_ms
@@ -36,20 +56,94 @@ class SilenceRecorder:
         self.max_record_ms = max_record_ms
         self.start_timeout_ms = start_timeout_ms
 
+        # While the agent talks the mic also hears its playback,
+        # so barge-in needs a louder signal than normal turns
+        self.barge_in_threshold = barge_in_threshold or silence_threshold * 2
+        self.preroll_ms = preroll_ms
+
+        self.vad = vad or EnergyVAD(sample_rate, chunk_ms, threshold=silence_threshold)
+        # No hangover: only frames actually above the threshold count
+        # towards barge_in_ms, so a click cannot barge in
+        self.barge_in_vad = EnergyVAD(
+            sample_rate, chunk_ms, threshold=self.barge_in_threshold,
+            onset_ms=chunk_ms, hangover_ms=0,
+        )
+
+        # One turn at most, plus a barge-in preroll in front of it
+        capacity = int(sample_rate * (max_record_ms + preroll_ms + 1000) / 1000)
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._length = 0
+
+        # perf_counter() of the first / last speech frame in the turn
+        self.speech_started: float | None = None
+        self.speech_ended: float | None = None
+
+        # Called with the WAV so far on the first silent frame after speech
+        self.on_pause = None
+
     # --------------------------------------------------
 
-    def _rms(self, audio: np.ndarray) -> float:
-        return np.sqrt(np.mean(np.square(audio.astype(np.float32))))
+    def _start_turn(self):
+        self._silence_ms = 0
+        self._total_ms = 0
+        self._speech_detected = False
+        self._length = 0
+        self.speech_started = self.speech_ended = None
+        self.vad.reset()
+
+    def _append(self, samples: np.ndarray):
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        n = min(len(samples), len(self._buffer) - self._length)
+        self._buffer[self._length:self._length + n] = samples[:n]
+        self._length += n
+
+    def _should_stop(self, audio_chunk: np.ndarray) -> bool:
+        """
+        Update speech / silence counters with one chunk.
+        Returns True once the turn is over.
+        """
+        if audio_chunk.ndim > 1:
+            audio_chunk = audio_chunk[:, 0]
+        self._total_ms += self.chunk_ms
+
+        if self.vad.is_speech(audio_chunk):
+            self.speech_ended = time.perf_counter()
+            if self.speech_started is None:
+                self.speech_started = self.speech_ended
+            self._speech_detected = True
+            self._silence_ms = 0
+        else:
+            if self._speech_detected:
+                if self._silence_ms == 0 and self.on_pause is not None:
+                    self.on_pause(self._to_wav())
+                self._silence_ms += self.chunk_ms
+
+        if self._speech_detected and self._silence_ms >= self.silence_duration_ms:
+            print("🛑 Silence detected, stopping recording.")
+            return True
+
+        if not self._speech_detected and self._total_ms >= self.start_timeout_ms:
+            print("⏱️ No speech detected, stopping.")
+            return True
+
+        if self._total_ms >= self.max_record_ms:
+            print("⏱️ Max recording time reached.")
+            return True
+
+        return False
+
+    def _to_wav(self) -> bytes:
+        # 🔥 CONVERT TO WAV BYTES (CRITICAL FIX)
+        # Header + the recorded slice of the buffer, copied once
+        return to_wav(self._buffer[:self._length], self.sample_rate)
 
     # --------------------------------------------------
 
     def record(self) -> bytes:
         print("🎙️ Listening for user speech...")
 
-        audio_chunks = []
-        silence_ms = 0
-        total_ms = 0
-        speech_detected = False
+        self._start_turn()
 
         with sd.InputStream(
             samplerate=self.sample_rate,
@@ -60,40 +154,133 @@ class SilenceRecorder:
 
             while True:
                 audio_chunk, _ = stream.read(self.chunk_samples)
-                audio_chunks.append(audio_chunk.copy())
+                self._append(audio_chunk)
 
-                rms = self._rms(audio_chunk)
-                total_ms += self.chunk_ms
+                if self._should_stop(audio_chunk):
+                    break
 
-                if rms > self.silence_threshold:
-                    speech_detected = True
-                    silence_ms = 0
-                else:
-                    if speech_detected:
-                        silence_ms += self.chunk_ms
+        print("✅ Recording complete.")
+        return self._to_wav()
 
-                if speech_detected and silence_ms >= self.silence_duration_ms:
-                    print("🛑 Silence detected, stopping recording.")
-                    break
 
-                if not speech_detected and total_ms >= self.start_timeout_ms:
-                    print("⏱️ No speech detected, stopping.")
-                    break
+class AsyncSilenceRecorder(SilenceRecorder):
+    """
+    Non-blocking SilenceRecorder.
+
+    The audio driver thread copies samples into a preallocated
+    RingBuffer and wakes the event loop; frames are read back into
+    one reused array. Cancelling the awaiting task closes the input
+    stream immediately.
+    """
 
-                if total_ms >= self.max_record_ms:
-                    print("⏱️ Max recording time reached.")
+    async def _frames(self) -> AsyncIterator[np.ndarray]:
+        """
+        Yields the same array every time, refilled with the next
+        frame; copy it if it has to outlive the iteration.
+        """
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        ring = RingBuffer(self.chunk_samples * 50)
+        frame = np.zeros(self.chunk_samples, dtype=np.int16)
+
+        def callback(indata, frames, time_info, status):
+            # A stalled loop loses audio rather than blocking the driver
+            ring.write(indata[:, 0])
+            loop.call_soon_threadsafe(ready.set)
+
+        with sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype="int16",
+            blocksize=self.chunk_samples,
+            callback=callback,
+        ):
+            while True:
+                await ready.wait()
+                ready.clear()
+                while ring.available >= self.chunk_samples:
+                    ring.read_into(frame)
+                    yield frame
+
+    async def record(self, preroll: np.ndarray | None = None) -> bytes:
+        """
+        `preroll` continues a turn that started during playback
+        (see wait_for_speech); the caller is already speaking.
+        """
+        print("🎙️ Listening for user speech...")
+
+        self._start_turn()
+        if preroll is not None:
+            self._append(preroll)
+            self._speech_detected = True
+            self.speech_started = time.perf_counter()
+
+        # aclosing: the input stream must close as soon as we stop reading
+        async with aclosing(self._frames()) as frames:
+            async for frame in frames:
+                self._append(frame)
+
+                if self._should_stop(frame):
                     break
 
         print("✅ Recording complete.")
+        return self._to_wav()
 
-        audio_np = np.concatenate(audio_chunks, axis=0)
+    async def wait_for_speech(self, min_speech_ms: int = 200) -> np.ndarray:
+        """
+        Listen until the caller has spoken above barge_in_threshold
+        for `min_speech_ms`. Returns that speech plus `preroll_ms`
+        of audio before it, so the start of the turn is not lost.
+        """
+        keep = math.ceil((min_speech_ms + self.preroll_ms) / self.chunk_ms)
+        history = np.zeros((keep, self.chunk_samples), dtype=np.int16)
+        count = 0
+        speech_ms = 0
+        self.barge_in_vad.reset()
 
-        # 🔥 CONVERT TO WAV BYTES (CRITICAL FIX)
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, "wb") as wf:
-            wf.setnchannels(self.channels)
-            wf.setsampwidth(2)  # int16 = 2 bytes
-            wf.setframerate(self.sample_rate)
-            wf.writeframes(audio_np.tobytes())
-
-        return wav_buffer.getvalue()
\ No newline at end of file
+        async with aclosing(self._frames()) as frames:
+            async for frame in frames:
+                history[count % keep] = frame
+                count += 1
+
+                if self.barge_in_vad.is_speech(frame):
+                    speech_ms += self.chunk_ms
+                    if speech_ms >= min_speech_ms:
+                        break
+                else:
+                    speech_ms = 0
+
+        # Oldest frame first
+        start = count % keep if count >= keep else 0
+        order = np.roll(np.arange(min(count, keep)), -start)
+        return history[order].reshape(-1)
+
+
+class MicrophoneStream:
+    """
+    Continuous microphone capture for streaming STT.
+    Yields raw int16 frames as the driver delivers them; turn
+    detection is left to the STT service's endpointing.
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, frame_ms: int = 20):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def callback(indata, frames, time_info, status):
+            loop.call_soon_threadsafe(queue.put_nowait, bytes(indata))
+
+        with sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype="int16",
+            blocksize=self.frame_samples,
+            callback=callback,
+        ):
+            while True:
+                yield await queue.get()
@@ -0,0 +1,65 @@
+"""
+Ring Buffer
+-----------
+
+Fixed-size, preallocated sample buffer between a producer (the TTS
+stream on the event loop) and a consumer (the audio driver thread).
+Writes and reads copy straight into / out of the backing array.
+"""
+
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity: int, dtype=np.int16):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=dtype)
+        self._read = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Copy as many samples as fit. Returns the number written.
+        """
+        with self._lock:
+            n = min(len(samples), self.capacity - self._size)
+            start = (self._read + self._size) % self.capacity
+            first = min(n, self.capacity - start)
+
+            self._buf[start:start + first] = samples[:first]
+            self._buf[:n - first] = samples[first:n]
+
+            self._size += n
+            return n
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Fill `out` from the buffer. Returns the number of samples read;
+        the rest of `out` is left untouched.
+        """
+        with self._lock:
+            n = min(len(out), self._size)
+            first = min(n, self.capacity - self._read)
+
+            out[:first] = self._buf[self._read:self._read + first]
+            out[first:n] = self._buf[:n - first]
+
+            self._read = (self._read + n) % self.capacity
+            self._size -= n
+            return n
+
+    def clear(self):
+        with self._lock:
+            self._read = 0
+            self._size = 0
@@ -0,0 +1,303 @@
+"""
+RTP Call Channel
+----------------
+
+A CallChannel over RTP-style packets: the shape of a SIP trunk's
+media leg (20 ms G.711 frames at 8 kHz), with asyncio queues standing
+in for the UDP socket. A datagram protocol feeding `inbound` and
+draining `outbound` turns it into the real thing.
+
+The line format is negotiated against the speech backends
+(audio.codec.negotiate): when streaming STT accepts mu-law at 8 kHz,
+frames() hands each packet's payload straight through as a memoryview
+slice of the packet, no transcoding; and TTS audio already in the line
+format is packetized without conversion. Otherwise each direction
+runs through one stateful Transcoder.
+
+Turn-based record() decodes the line with a table lookup, runs the
+VAD at the line rate and returns linear16 WAV at the STT rate.
+
+Wiring a call: create the speech backends for the line (the registry
+negotiates their format, backends/registry.py), build the channel
+from them with RTPChannel.for_backends, and hand all three to
+LastMileDeliveryVoiceAgent:
+
+    tts = TemplateTTS(TTS_BACKENDS.create("deepgram", line=MULAW_8K))
+    stt = STREAMING_STT_BACKENDS.create("deepgram", line=MULAW_8K)
+    channel = RTPChannel.for_backends(inbound, outbound, tts, stt)
+    agent = LastMileDeliveryVoiceAgent(phone, channel=channel, tts=tts, streaming_stt=stt)
+
+No SIP / UDP transport ships with this tree; `inbound` / `outbound`
+are fed by whatever terminates the media leg.
+"""
+
+import asyncio
+import random
+import struct
+import time
+from typing import AsyncIterator
+
+import numpy as np
+
+from audio.channel import CallChannel
+from audio.codec import (
+    LINEAR16_16K,
+    LINEAR16_24K,
+    MULAW_8K,
+    AudioFormat,
+    Transcoder,
+    decode,
+    resample,
+    to_wav,
+)
+from audio.vad import EnergyVAD
+
+RTP_HEADER = struct.Struct("!BBHII")
+RTP_VERSION = 2
+
+# RFC 3551 static payload types; linear16 uses a dynamic one
+PAYLOAD_TYPES = {"mulaw": 0, "alaw": 8, "linear16": 96}
+
+
+def rtp_packet(
+    payload,
+    seq: int,
+    timestamp: int,
+    ssrc: int,
+    payload_type: int,
+    marker: bool = False,
+) -> bytes:
+    header = RTP_HEADER.pack(
+        RTP_VERSION << 6,
+        (0x80 if marker else 0) | payload_type,
+        seq & 0xFFFF,
+        timestamp & 0xFFFFFFFF,
+        ssrc,
+    )
+    return b"".join((header, payload))
+
+
+def rtp_payload(packet) -> memoryview:
+    """
+    The payload of an RTP packet, as a slice of it (no copy).
+    """
+    view = memoryview(packet)
+    if len(view) < RTP_HEADER.size or view[0] >> 6 != RTP_VERSION:
+        raise ValueError("Not an RTP packet")
+    start = RTP_HEADER.size + 4 * (view[0] & 0x0F)     # CSRCs
+    if view[0] & 0x10:                                 # header extension
+        words = int.from_bytes(view[start + 2:start + 4], "big")
+        start += 4 + 4 * words
+    end = len(view)
+    if view[0] & 0x20:                                 # padding
+        end -= view[-1]
+    return view[start:end]
+
+
+class RTPChannel(CallChannel):
+    def __init__(
+        self,
+        inbound: asyncio.Queue,
+        outbound: asyncio.Queue,
+        line: AudioFormat = MULAW_8K,
+        stt_format: AudioFormat = LINEAR16_16K,
+        tts_format: AudioFormat = LINEAR16_24K,
+        frame_ms: int = 20,
+        silence_threshold: float = 350.0,
+        silence_duration_ms: int = 700,
+        start_timeout_ms: int = 5000,
+        max_record_ms: int = 10000,
+        barge_in_threshold: float | None = None,
+        time_scale: float = 1.0,
+    ):
+        """
+        inbound      packets from the caller; None when they hang up
+        outbound     packets to the caller, one per `frame_ms`
+        stt_format   what frames() yields and record()'s WAV rate
+        tts_format   what play() / play_stream() are given
+        """
+        self.inbound = inbound
+        self.outbound = outbound
+        self.line = line
+        self.stt_format = stt_format
+        self.tts_format = tts_format
+        self.frame_ms = frame_ms
+        self.silence_duration_ms = silence_duration_ms
+        self.start_timeout_ms = start_timeout_ms
+        self.max_record_ms = max_record_ms
+        self.time_scale = time_scale
+
+        self.vad = EnergyVAD(line.sample_rate, frame_ms, threshold=silence_threshold)
+        # No hangover: only frames actually above the threshold count
+        # towards min_speech_ms, so a click cannot barge in
+        self.barge_in_vad = EnergyVAD(
+            line.sample_rate, frame_ms,
+            threshold=barge_in_threshold or silence_threshold * 2,
+            onset_ms=frame_ms, hangover_ms=0,
+        )
+
+        self.hung_up = False
+        self._payload_type = PAYLOAD_TYPES[line.encoding]
+        self._ssrc = random.getrandbits(32)
+        self._seq = random.getrandbits(16)
+        self._timestamp = random.getrandbits(32)
+
+        # Frames converted on the way in / out (0 when formats match)
+        self.transcoded_in = 0
+        self.transcoded_out = 0
+
+    @classmethod
+    def for_backends(
+        cls,
+        inbound: asyncio.Queue,
+        outbound: asyncio.Queue,
+        tts,
+        stt=None,
+        line: AudioFormat = MULAW_8K,
+        **options,
+    ) -> "RTPChannel":
+        """
+        A channel whose stt_format / tts_format are the backends'
+        own (`format`, as negotiated for the line), so audio they
+        already exchange in the line format is not transcoded.
+        """
+        return cls(
+            inbound,
+            outbound,
+            line=line,
+            stt_format=getattr(stt, "format", None) or LINEAR16_16K,
+            tts_format=getattr(tts, "format", None) or LINEAR16_24K,
+            **options,
+        )
+
+    # --------------------------------------------------
+    # CALLER -> AGENT
+    # --------------------------------------------------
+
+    async def _payload(self) -> memoryview | None:
+        if self.hung_up:
+            return None
+        packet = await self.inbound.get()
+        if packet is None:
+            self.hung_up = True
+            return None
+        return rtp_payload(packet)
+
+    async def frames(self) -> AsyncIterator[memoryview]:
+        transcoder = Transcoder(self.line, self.stt_format)
+        while (payload := await self._payload()) is not None:
+            if not transcoder.passthrough:
+                self.transcoded_in += 1
+            yield transcoder.convert(payload)
+
+    async def record(self, preroll=None) -> bytes:
+        self.speech_started = self.speech_ended = None
+        self.vad.reset()
+        pieces = [] if preroll is None else [preroll]
+        speech = preroll is not None
+        silence_ms = total_ms = 0
+
+        while (payload := await self._payload()) is not None:
+            pcm = decode(payload, self.line.encoding)
+            pieces.append(pcm)
+            total_ms += self.frame_ms
+
+            if self.vad.is_speech(pcm):
+                self.speech_ended = time.perf_counter()
+                if self.speech_started is None:
+                    self.speech_started = self.speech_ended
+                speech = True
+                silence_ms = 0
+            elif speech:
+                if silence_ms == 0 and self.on_pause is not None:
+                    self.on_pause(self._wav(pieces))
+                silence_ms += self.frame_ms
+
+            if speech and silence_ms >= self.silence_duration_ms:
+                break
+            if not speech and total_ms >= self.start_timeout_ms:
+                break
+            if total_ms >= self.max_record_ms:
+                break
+
+        # Like the sound card recorders: a valid WAV even when the
+        # caller said nothing, so STT sees a silent turn, not no file
+        return self._wav(pieces)
+
+    def _wav(self, pieces: list[np.ndarray]) -> bytes:
+        pcm = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+        return to_wav(
+            resample(pcm, self.line.sample_rate, self.stt_format.sample_rate),
+            self.stt_format.sample_rate,
+        )
+
+    async def wait_for_speech(self, min_speech_ms: int) -> np.ndarray:
+        """
+        Returns the line audio heard so far (linear16 at the line rate)
+        once the caller has talked for `min_speech_ms`.
+        """
+        self.barge_in_vad.reset()
+        heard = []
+        speech_ms = 0
+        while speech_ms < min_speech_ms:
+            payload = await self._payload()
+            if payload is None:
+                await asyncio.Future()   # hung up: never barges in
+            pcm = decode(payload, self.line.encoding)
+            if self.barge_in_vad.is_speech(pcm):
+                heard.append(pcm)
+                speech_ms += self.frame_ms
+            else:
+                heard.clear()
+                speech_ms = 0
+        return np.concatenate(heard)
+
+    # --------------------------------------------------
+    # AGENT -> CALLER
+    # --------------------------------------------------
+
+    async def _send(self, payload, first: bool):
+        await self.outbound.put(rtp_packet(
+            payload, self._seq, self._timestamp, self._ssrc, self._payload_type, marker=first,
+        ))
+        self._seq += 1
+        self._timestamp += len(payload) // self.line.sample_width
+        # Real time pacing, as a media server would send
+        await asyncio.sleep(self.frame_ms / 1000 * self.time_scale)
+
+    async def play(self, audio_bytes: bytes) -> None:
+        async def single():
+            yield audio_bytes
+        await self.play_stream(single())
+
+    async def play_stream(self, chunks: AsyncIterator[bytes]) -> None:
+        transcoder = Transcoder(self.tts_format, self.line)
+        frame = self.line.frame_bytes(self.frame_ms)
+        pending = bytearray()
+        first = True
+
+        async for chunk in chunks:
+            if not transcoder.passthrough:
+                self.transcoded_out += 1
+            data = transcoder.convert(chunk)
+
+            if pending:
+                take = min(frame - len(pending), len(data))
+                pending += data[:take]
+                data = data[take:]
+                if len(pending) < frame:
+                    continue
+                await self._send(pending, first)
+                pending = bytearray()
+                first = False
+
+            # Whole frames are sent as slices of the converted chunk
+            whole = len(data) - len(data) % frame
+            for start in range(0, whole, frame):
+                await self._send(data[start:start + frame], first)
+                first = False
+            pending += data[whole:]
+
+        if pending:
+            pending += bytes([self.line.silence]) * (frame - len(pending))
+            await self._send(pending, first)
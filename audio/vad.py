@@ -0,0 +1,115 @@
+"""
+Voice Activity Detection
+------------------------
+
+Pluggable per-frame speech detectors for SilenceRecorder.
+
+EnergyVAD works on short int16 frames (10-30 ms) without allocating:
+frame energy is the dot product of the frame with itself in a
+preallocated int64 scratch array, then compared against an adaptive threshold (no
+float conversion, no sqrt). Onset and hangover smoothing keep single
+clicks from starting a turn and short pauses from ending one.
+"""
+
+import numpy as np
+
+
+class VADEngine:
+    """
+    Feed consecutive frames to is_speech(); the result is the
+    smoothed speech / non-speech decision for that frame.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+
+    def reset(self):
+        pass
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        raise NotImplementedError
+
+
+class EnergyVAD(VADEngine):
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        threshold: float = 350.0,
+        noise_ratio: float = 3.0,
+        noise_rise: float = 0.002,
+        onset_ms: int = 40,
+        hangover_ms: int = 200,
+    ):
+        """
+        threshold    absolute RMS level that always counts as speech
+        noise_ratio  speech must also be this many times the noise
+                     floor energy (adaptive threshold on noisy lines)
+        noise_rise   per-frame rate at which the floor follows a
+                     louder background; it drops immediately
+        onset_ms     loud audio needed before speech starts
+        hangover_ms  quiet audio tolerated before speech ends
+        """
+        super().__init__(sample_rate, frame_ms)
+
+        # Mean-square energy per sample (RMS squared) as an integer
+        self.min_energy = int(threshold * threshold)
+        self.noise_ratio = noise_ratio
+        self.noise_rise = noise_rise
+        self.onset_frames = max(1, round(onset_ms / frame_ms))
+        self.hangover_frames = round(hangover_ms / frame_ms)
+
+        self._scratch = np.empty(self.frame_samples, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = 0.0
+        self.in_speech = False
+        self._loud_frames = 0
+        self._quiet_frames = 0
+
+    def energy(self, frame: np.ndarray) -> int:
+        """
+        Sum of squares of an int16 frame, computed in place.
+        """
+        n = len(frame)
+        if n > len(self._scratch):
+            self._scratch = np.empty(n, dtype=np.int64)
+
+        scratch = self._scratch[:n]
+        # Widen before squaring; an int64 accumulator cannot overflow
+        np.copyto(scratch, frame)
+        return int(scratch.dot(scratch))
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        n = len(frame)
+        if not n:
+            return self.in_speech
+
+        energy = self.energy(frame)
+        per_sample = energy // n
+
+        # Track the background: fall at once, rise slowly
+        if not self.noise_floor or per_sample < self.noise_floor:
+            self.noise_floor = float(per_sample)
+        else:
+            self.noise_floor += self.noise_rise * (per_sample - self.noise_floor)
+
+        threshold = max(self.min_energy, self.noise_floor * self.noise_ratio)
+        loud = energy > threshold * n
+
+        if loud:
+            self._loud_frames += 1
+            self._quiet_frames = 0
+            if self._loud_frames >= self.onset_frames:
+                self.in_speech = True
+        else:
+            self._loud_frames = 0
+            if self.in_speech:
+                self._quiet_frames += 1
+                if self._quiet_frames > self.hangover_frames:
+                    self.in_speech = False
+
+        return self.in_speech
@@ -0,0 +1 @@
+"""Backends Module"""
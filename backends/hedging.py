@@ -0,0 +1,198 @@
+"""
+Hedged Requests
+---------------
+
+Speech APIs have long latency tails: most requests are quick, a few
+take several times longer, and those few make the worst calls. A
+hedged backend sends each request to the primary; if it has not
+answered within the primary's recent p90 latency, the same request
+also goes to the secondary, and whichever answers first wins (the
+other is cancelled). Roughly one request in ten is sent twice, and
+the tail is cut to about the primary's p90 plus the secondary's
+typical latency.
+
+A primary that fails outright hands over to the secondary at once.
+
+Both backends must take / produce the same audio (sample rate and
+format, where they declare them). A hedged TTS's cache identity
+(`model`) names both voices when they differ, so renders from the
+pair never share cache entries with either backend alone.
+
+    stt = HedgedSTT(STT_BACKENDS.create("deepgram"), STT_BACKENDS.create("other"))
+    tts = HedgedTTS(primary_tts, secondary_tts, quantile=0.95)
+"""
+
+import asyncio
+import inspect
+import time
+from collections import deque
+
+from audio.channel import run_blocking
+from stt.stt_backend import STTBackend
+from tts.tts_adapter import TTSAdapter
+
+
+class LatencyWindow:
+    """
+    Recent latencies (seconds) of one backend.
+    """
+
+    def __init__(self, size: int = 200):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Hedge:
+    # Attributes both backends must agree on, where both declare them
+    MATCHING: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        primary,
+        secondary,
+        quantile: float = 0.9,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.02,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        """
+        quantile        hedge once the primary is slower than this
+                        share of its recent requests
+        initial_delay   hedge delay until `min_samples` are recorded
+        """
+        for name in self.MATCHING:
+            a, b = getattr(primary, name, None), getattr(secondary, name, None)
+            if a is not None and b is not None and a != b:
+                raise ValueError(f"Hedged backends differ in {name}: {a} vs {b}")
+
+        self.primary = primary
+        self.secondary = secondary
+        self.quantile = quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latency = LatencyWindow(window)
+
+        self.requests = 0
+        self.hedged = 0
+        self.secondary_wins = 0
+
+    @property
+    def delay(self) -> float:
+        if len(self.latency) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, self.latency.quantile(self.quantile))
+
+    async def run(self, call, discard=None):
+        """
+        call(backend) -> awaitable result; discard(result) releases
+        the result of a request that finished but lost.
+        """
+        self.requests += 1
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(call(self.primary))
+
+        done, _ = await asyncio.wait({primary}, timeout=self.delay)
+        if done and primary.exception() is None:
+            self.latency.add(time.perf_counter() - started)
+            return primary.result()
+
+        self.hedged += 1
+        secondary = asyncio.ensure_future(call(self.secondary))
+        pending = {primary, secondary} - done
+        error = primary.exception() if done else None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is primary:
+                        self.latency.add(time.perf_counter() - started)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is secondary:
+                        self.secondary_wins += 1
+                    for other in done - {task}:
+                        if discard is not None and other.exception() is None:
+                            await discard(other.result())
+                    return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if primary in pending:
+                # Still running: at least this slow (keeps p90 honest)
+                self.latency.add(time.perf_counter() - started)
+
+
+# --------------------------------------------------
+# SPEECH BACKENDS
+# --------------------------------------------------
+
+class HedgedSTT(STTBackend, Hedge):
+    MATCHING = ("sample_rate", "format")
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        return await self.run(lambda stt: run_blocking(stt.transcribe, audio_bytes))
+
+
+class HedgedTTS(TTSAdapter, Hedge):
+    """
+    stream() hedges on time to first audio, then plays the winner.
+    """
+
+    MATCHING = ("sample_rate", "format")
+
+    @property
+    def sample_rate(self) -> int:
+        return getattr(self.primary, "sample_rate", 24000)
+
+    @property
+    def format(self):
+        return getattr(self.primary, "format", None)
+
+    @property
+    def model(self) -> str:
+        models = [getattr(tts, "model", type(tts).__name__) for tts in (self.primary, self.secondary)]
+        return models[0] if models[0] == models[1] else "+".join(models)
+
+    async def synthesize(self, text: str) -> bytes:
+        return await self.run(lambda tts: run_blocking(tts.synthesize, text))
+
+    async def stream(self, text: str):
+        async def first_chunk(tts):
+            if not inspect.isasyncgenfunction(getattr(tts, "stream", None)):
+                return None, await run_blocking(tts.synthesize, text)
+            chunks = tts.stream(text)
+            try:
+                return chunks, await chunks.__anext__()
+            except StopAsyncIteration:
+                return None, b""
+            except BaseException:
+                await chunks.aclose()
+                raise
+
+        async def close(result):
+            if result[0] is not None:
+                await result[0].aclose()
+
+        chunks, chunk = await self.run(first_chunk, discard=close)
+        if chunk:
+            yield chunk
+        if chunks is not None:
+            try:
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
@@ -0,0 +1,209 @@
+"""
+Backend Registry
+----------------
+
+Speech and LLM providers by name. Each entry is a "module:attribute"
+string, imported the first time it is created, so a worker only pays
+for the backends its config selects (no Deepgram SDK for a local
+test run, no Groq SDK unless the LLM is used).
+
+API keys are read when a backend is created, not at import time:
+a missing key fails that backend only, with a clear error. Speech
+backends must implement SpeechToText / TextToSpeech: the methods the
+voice loop calls, callable with its arguments (checked against their
+signatures on create, no inheritance needed). Any two can be
+combined into a hedged one (hedging.py).
+
+For a telephony call, pass the line format: a backend that lists its
+audio `formats` is created with the one audio.codec.negotiate() picks
+(the line format itself when supported, so RTP audio needs no
+transcoding), as `encoding` / `sample_rate` options.
+
+    tts = TTS_BACKENDS.create("deepgram", line=MULAW_8K)
+
+    STT_BACKENDS.create(os.getenv("STT_BACKEND", "deepgram"))
+    TTS_BACKENDS.register("mine", "my_pkg.tts:MyTTS", key_env="MY_TTS_KEY")
+"""
+
+import importlib
+import inspect
+import os
+from dataclasses import dataclass
+
+from stt.stt_backend import SpeechToText
+from tts.tts_adapter import TextToSpeech
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Backend:
+    target: str                  # "module:attribute"
+    key_env: str | None = None   # env var passed as api_key, if any
+
+    @property
+    def module(self) -> str:
+        return self.target.partition(":")[0]
+
+
+def implements(instance, protocol: type) -> bool:
+    """
+    `instance` has every method of `protocol`, callable with the
+    protocol's positional arguments and returning a value (or an
+    awaitable), not an async generator.
+    """
+    for name, declared in vars(protocol).items():
+        if name.startswith("_") or not inspect.isfunction(declared):
+            continue
+        method = getattr(instance, name, None)
+        if not callable(method) or inspect.isasyncgenfunction(method):
+            return False
+        arguments = [None] * (len(inspect.signature(declared).parameters) - 1)   # self
+        try:
+            inspect.signature(method).bind(*arguments)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+class BackendRegistry:
+    def __init__(
+        self,
+        kind: str,
+        backends: dict[str, Backend] | None = None,
+        interface: type | None = None,
+    ):
+        self.kind = kind
+        self.interface = interface
+        self._backends: dict[str, Backend] = dict(backends or {})
+        self._loaded: dict[str, object] = {}
+
+    def register(self, name: str, target: str, key_env: str | None = None):
+        if ":" not in target:
+            raise ValueError(f"Backend target must be 'module:attribute', got {target!r}")
+        self._backends[name] = Backend(target, key_env)
+        self._loaded.pop(name, None)
+
+    def names(self) -> list[str]:
+        return sorted(self._backends)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._backends
+
+    def get(self, name: str) -> Backend:
+        try:
+            return self._backends[name]
+        except KeyError:
+            raise BackendError(
+                f"Unknown {self.kind} backend {name!r} (choose from: {', '.join(self.names())})"
+            ) from None
+
+    def load(self, name: str):
+        """
+        The backend's class or factory, importing its module on first use.
+        """
+        if name in self._loaded:
+            return self._loaded[name]
+
+        backend = self.get(name)
+        module_name, _, attribute = backend.target.partition(":")
+        try:
+            factory = getattr(importlib.import_module(module_name), attribute)
+        except ImportError as e:
+            raise BackendError(f"{self.kind} backend {name!r} is not installed: {e}") from e
+        except AttributeError:
+            raise BackendError(f"{self.kind} backend {name!r}: no {backend.target}") from None
+
+        self._loaded[name] = factory
+        return factory
+
+    def create(self, name: str, line=None, **options):
+        """
+        line   telephony line AudioFormat to negotiate the backend's
+               audio format against (backends without `formats`
+               ignore it)
+        """
+        backend = self.get(name)
+        if backend.key_env and options.get("api_key") is None:
+            options["api_key"] = os.getenv(backend.key_env)
+            if not options["api_key"]:
+                raise BackendError(f"{backend.key_env} not set ({self.kind} backend {name!r})")
+        factory = self.load(name)
+        formats = getattr(factory, "formats", None)
+        if line is not None and formats:
+            from audio.codec import negotiate   # numpy: only for telephony
+
+            agreed = negotiate(line, formats)
+            options.setdefault("encoding", agreed.encoding)
+            options.setdefault("sample_rate", agreed.sample_rate)
+        instance = factory(**options)
+        if self.interface is not None and not implements(instance, self.interface):
+            raise BackendError(
+                f"{self.kind} backend {name!r} does not implement {self.interface.__name__}"
+            )
+        return instance
+
+    def create_hedged(
+        self,
+        primary: str,
+        secondary: str | None = None,
+        line=None,
+        **hedge_options,
+    ):
+        """
+        `primary`, hedged with `secondary` when given (options are
+        Hedge's: quantile, initial_delay, ...).
+        """
+        if not secondary:
+            return self.create(primary, line)
+        from backends.hedging import HedgedSTT, HedgedTTS
+
+        hedged = {SpeechToText: HedgedSTT, TextToSpeech: HedgedTTS}.get(self.interface)
+        if hedged is None:
+            raise BackendError(f"{self.kind} backends can't be hedged")
+        try:
+            return hedged(
+                self.create(primary, line), self.create(secondary, line), **hedge_options
+            )
+        except ValueError as e:
+            raise BackendError(f"Can't hedge {self.kind} {primary!r} with {secondary!r}: {e}") from None
+
+
+# --------------------------------------------------
+# BUILT-IN BACKENDS
+# --------------------------------------------------
+
+STT_BACKENDS = BackendRegistry("STT", {
+    "deepgram": Backend("stt.deepgram_stt:AsyncDeepgramSTT", "DEEPGRAM_API_KEY"),
+    "scripted": Backend("campaign.simulated:ScriptedSTT"),
+}, interface=SpeechToText)
+
+STREAMING_STT_BACKENDS = BackendRegistry("streaming STT", {
+    "deepgram": Backend("stt.deepgram_streaming_stt:DeepgramStreamingSTT", "DEEPGRAM_API_KEY"),
+})
+
+TTS_BACKENDS = BackendRegistry("TTS", {
+    "deepgram": Backend("tts.deepgram_tts:AsyncDeepgramTTS", "DEEPGRAM_API_KEY"),
+    "silent": Backend("campaign.simulated:SilentTTS"),
+}, interface=TextToSpeech)
+
+LLM_BACKENDS = BackendRegistry("LLM", {
+    "groq": Backend("llm.groq_client:GroqLLM", "GROQ_API_KEY"),
+    "openai": Backend("llm.chat_client:ChatClient"),
+})
+
+REGISTRIES = {
+    "stt": STT_BACKENDS,
+    "streaming_stt": STREAMING_STT_BACKENDS,
+    "tts": TTS_BACKENDS,
+    "llm": LLM_BACKENDS,
+}
+
+
+def backend_modules(config: dict[str, str]) -> list[str]:
+    """
+    Modules a config ({"stt": "deepgram", "tts": "silent"}) will import.
+    """
+    return [REGISTRIES[kind].get(name).module for kind, name in config.items() if name]
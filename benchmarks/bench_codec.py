@@ -0,0 +1,127 @@
+"""
+Audio Format Pipeline Benchmark
+-------------------------------
+
+CPU time per second of call audio for the media path of one
+telephony call (8 kHz mu-law line, 20 ms frames), both directions:
+
+  legacy     caller: mu-law decoded in Python, resampled to 16 kHz
+             with np.interp over the whole turn, WAV built through
+             wave / io.BytesIO; agent: 24 kHz TTS audio encoded back
+             in Python
+  transcode  audio.codec: table lookups over memoryviews, stateful
+             20 ms resampling in both directions
+  native     STT and TTS negotiated to the line format: RTP payloads
+             pass through untouched
+
+The audio is synthetic, so no network or sound card is needed.
+
+Run:
+    python -m benchmarks.bench_codec
+"""
+
+import argparse
+import io
+import time
+import wave
+
+import numpy as np
+
+from audio.codec import LINEAR16_16K, LINEAR16_24K, MULAW_8K, Transcoder, encode
+from audio.rtp import rtp_packet, rtp_payload
+
+
+def synthetic_line(seconds: float, seed: int = 0) -> list[bytes]:
+    """
+    RTP packets of line noise with 1.5 s talk / 1 s pause.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * 8000)
+    t = np.arange(n) / 8000
+    audio = rng.normal(0, 80, n) + ((t % 2.5) < 1.5) * 6000 * np.sin(2 * np.pi * 180 * t)
+    codes = encode(np.clip(audio, -32768, 32767).astype(np.int16), "mulaw").tobytes()
+    return [rtp_packet(codes[i:i + 160], i // 160, i, 1, 0) for i in range(0, len(codes), 160)]
+
+
+def synthetic_tts(seconds: float) -> list[bytes]:
+    """
+    24 kHz linear16 in 100 ms chunks, as a TTS stream delivers it.
+    """
+    t = np.arange(int(seconds * 24000)) / 24000
+    audio = (6000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+    return [audio[i:i + 4800] for i in range(0, len(audio), 4800)]
+
+
+# --------------------------------------------------
+
+def _ulaw2lin(code: int) -> int:
+    code = ~code & 0xFF
+    t = (((code & 0x0F) << 3) + 0x84) << ((code & 0x70) >> 4)
+    return 0x84 - t if code & 0x80 else t - 0x84
+
+
+def _lin2ulaw(sample: int) -> int:
+    sign = 0x80 if sample < 0 else 0
+    mag = min(abs(sample >> 2), 8159) + 0x21
+    seg = max(mag.bit_length() - 6, 0)
+    code = 0x7F if seg >= 8 else (seg << 4) | ((mag >> (seg + 1)) & 0x0F)
+    return ~(sign | code) & 0xFF
+
+
+def legacy(packets: list[bytes], tts: list[bytes]) -> None:
+    pcm = np.array([_ulaw2lin(b) for p in packets for b in p[12:]], dtype=np.int16)
+    up = np.interp(np.arange(len(pcm) * 2) / 2, np.arange(len(pcm)), pcm).astype(np.int16)
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(up.tobytes())
+    wav_buffer.getvalue()
+
+    for chunk in tts:
+        samples = np.frombuffer(chunk, dtype=np.int16)[::3]
+        bytes(_lin2ulaw(int(s)) for s in samples)
+
+
+def transcode(packets: list[bytes], tts: list[bytes]) -> None:
+    inbound = Transcoder(MULAW_8K, LINEAR16_16K)
+    for packet in packets:
+        inbound.convert(rtp_payload(packet))
+    outbound = Transcoder(LINEAR16_24K, MULAW_8K)
+    for chunk in tts:
+        outbound.convert(chunk)
+
+
+def native(packets: list[bytes], tts: list[bytes]) -> None:
+    for packet in packets:
+        rtp_payload(packet)
+    for chunk in tts:
+        memoryview(chunk)
+
+
+def cpu_per_call_second(fn, seconds: float, runs: int) -> float:
+    packets = synthetic_line(seconds)
+    tts = synthetic_tts(seconds)
+    fn(packets, tts)  # warm-up
+    start = time.process_time()
+    for _ in range(runs):
+        fn(packets, tts)
+    return (time.process_time() - start) / runs / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telephony audio pipeline CPU cost")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pipeline':<12} {'CPU us / call s':>16} {'calls / core':>13}")
+    print("-" * 43)
+    for name, fn in (("legacy", legacy), ("transcode", transcode), ("native", native)):
+        cost = cpu_per_call_second(fn, args.seconds, args.runs)
+        print(f"{name:<12} {cost * 1e6:>16.0f} {1 / cost:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Hedged STT Benchmark
+--------------------
+
+Transcription latency percentiles of one simulated STT backend with a
+long-tailed (lognormal) latency, alone and hedged with a second
+backend of the same distribution, plus the extra load hedging costs.
+
+Simulated seconds are scaled by `--time-scale`; the table reports
+them unscaled.
+
+Run:
+    python -m benchmarks.bench_hedging
+    python -m benchmarks.bench_hedging --latency lognormal:0.3:0.6 --quantile 0.95
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from backends.hedging import HedgedSTT
+from campaign.runner import percentile
+from campaign.simulated import Latency, ScriptedSTT
+
+
+async def measure(stt, requests: int, concurrency: int, time_scale: float) -> list[float]:
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            await stt.transcribe(b"yes")
+            latencies.append((time.perf_counter() - started) / time_scale)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def _stt(spec: str, seed: int, time_scale: float) -> ScriptedSTT:
+    return ScriptedSTT(latency=Latency(spec, random.Random(seed)), time_scale=time_scale)
+
+
+async def run(args):
+    scale = args.time_scale
+    single = _stt(args.latency, 1, scale)
+    hedged = HedgedSTT(
+        _stt(args.latency, 1, scale),
+        _stt(args.secondary or args.latency, 2, scale),
+        quantile=args.quantile,
+        initial_delay=Latency(args.latency).params[0] * scale,
+    )
+    # Learn the primary's p90 first
+    await measure(hedged, 100, args.concurrency, scale)
+    hedged.requests = hedged.hedged = hedged.secondary_wins = 0
+
+    print(f"{'backend':<10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'extra':>7}")
+    print("-" * 54)
+    for name, stt in (("single", single), ("hedged", hedged)):
+        latencies = await measure(stt, args.requests, args.concurrency, scale)
+        extra = getattr(stt, "hedged", 0) / args.requests
+        print(
+            f"{name:<10} "
+            f"{percentile(latencies, 50) * 1000:>8.0f} "
+            f"{percentile(latencies, 90) * 1000:>8.0f} "
+            f"{percentile(latencies, 99) * 1000:>8.0f} "
+            f"{max(latencies) * 1000:>8.0f} "
+            f"{extra:>7.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedged request tail latency benchmark")
+    parser.add_argument("--latency", default="lognormal:0.3:1.0",
+                        help="primary latency distribution (see campaign.simulated.Latency)")
+    parser.add_argument("--secondary", help="secondary distribution (default: same)")
+    parser.add_argument("--quantile", type=float, default=0.9)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--time-scale", type=float, default=0.2)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
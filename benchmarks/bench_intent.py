@@ -0,0 +1,117 @@
+"""
+Intent Classification Benchmark
+-------------------------------
+
+Per-utterance cost of the old substring scans (three functions, each
+lowercasing and rebuilding its keyword list) against one pass of the
+compiled matcher, and how many utterances each gets right. The
+second table grows the phrase table to show that the matcher's cost
+stays flat while substring scanning grows with every phrase added.
+
+Run:
+    python -m benchmarks.bench_intent
+"""
+
+import argparse
+import time
+
+from last_mile_delivery.intent import PHRASES, Intent, IntentMatcher, classify
+
+YES, NO = Intent.YES, Intent.NO
+
+UTTERANCES = [
+    ("yes this is me", YES),
+    ("yeah go ahead", YES),
+    ("no problem", YES),
+    ("okay that works for me", YES),
+    ("that's correct", YES),
+    ("no this is his brother", NO),
+    ("I don't think so", NO),
+    ("okay, not really", NO),
+    ("not okay", NO),
+    ("I'm not available on those days", NO),
+    ("I know the address", None),
+    ("nothing else", None),
+    ("Jan 25 please", None),
+    ("the neighbor is Noah", None),
+]
+
+
+def legacy_is_yes(text: str) -> bool:
+    text = text.lower()
+    return any(k in text for k in ["yes", "yeah", "yep", "ok", "okay", "sure", "fine", "correct"])
+
+
+def legacy_is_no(text: str) -> bool:
+    text = text.lower()
+    return any(k in text for k in ["no", "nope", "not", "don't", "do not", "won't", "cannot", "can't"])
+
+
+def legacy_is_unavailable(text: str) -> bool:
+    text = text.lower()
+    phrases = [
+        "not available", "not free", "cannot receive", "can't receive",
+        "won't be available", "none of these", "no dates work", "busy",
+        "out of town", "not possible",
+    ]
+    return any(p in text for p in phrases)
+
+
+def legacy(text: str) -> Intent | None:
+    # The agent checks is_yes first, then is_no / is_unavailable
+    legacy_is_unavailable(text)
+    if legacy_is_yes(text):
+        return YES
+    if legacy_is_no(text):
+        return NO
+    return None
+
+
+def compiled(text: str) -> Intent | None:
+    return classify(text).polarity
+
+
+def per_call_us(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        for text, _ in UTTERANCES:
+            fn(text)
+    return (time.perf_counter() - start) / (runs * len(UTTERANCES)) * 1e6
+
+
+def scaling(runs: int):
+    print(f"\n{'phrases':>8} {'substring us':>13} {'compiled us':>12}")
+    print("-" * 35)
+
+    for extra in (0, 500, 5000):
+        phrases = {intent: list(words) for intent, words in PHRASES["en"].items()}
+        phrases[Intent.YES] += [f"filler{i} phrase" for i in range(extra)]
+        flat = [p for words in phrases.values() for p in words]
+        matcher = IntentMatcher(phrases)
+
+        def substring(text: str) -> bool:
+            text = text.lower()
+            return any(p in text for p in flat)
+
+        print(f"{len(flat):>8} {per_call_us(substring, runs // 10):>13.2f} "
+              f"{per_call_us(matcher.classify, runs // 10):>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intent classification benchmark")
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'classifier':<12} {'us / utterance':>15} {'correct':>10}")
+    print("-" * 39)
+
+    for name, fn in (("substring", legacy), ("compiled", compiled)):
+        correct = sum(fn(text) is expected for text, expected in UTTERANCES)
+        print(f"{name:<12} {per_call_us(fn, args.runs):>15.2f} "
+              f"{correct:>6}/{len(UTTERANCES)}")
+
+    scaling(args.runs)
+
+
+if __name__ == "__main__":
+    main()
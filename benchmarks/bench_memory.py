@@ -0,0 +1,98 @@
+"""
+Conversation Memory Benchmark
+-----------------------------
+
+Heap held by ConversationMemory at `--sessions` sessions of
+`--turns` turns each (tracemalloc), for:
+
+  legacy   every session kept forever as a list of {"role", "text"} dicts
+  slots    Message records in a rolling window, all sessions still open
+  ended    the same calls with end_session() after each one
+
+Agent lines are shared constants (as in the real agent); caller
+lines are distinct strings, so text is counted once per turn in every
+variant and the difference is the per-turn container overhead.
+
+Run:
+    python -m benchmarks.bench_memory
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from memory.memory import ConversationMemory
+
+AGENT_LINES = (
+    "Hello, am I speaking with Customer?",
+    "Which date would you prefer?",
+    "Just to confirm, should we deliver the parcel on Jan 25?",
+    "Your delivery has been scheduled for Jan 25. Thank you for your time.",
+)
+
+
+class LegacyMemory:
+    def __init__(self):
+        self.sessions = {}
+        self.current_session = None
+
+    def start_session(self, session_id: str):
+        self.sessions[session_id] = []
+        self.current_session = session_id
+
+    def add_message(self, role: str, text: str):
+        self.sessions[self.current_session].append({"role": role, "text": text})
+
+    def end_session(self):
+        pass  # the old memory never forgot a session
+
+
+def fill(memory, sessions: int, turns: int, end: bool):
+    for s in range(sessions):
+        memory.start_session(f"order_{s}")
+        for t in range(turns):
+            if t % 2:
+                memory.add_message("user", f"caller {s} says {t}")
+            else:
+                memory.add_message("agent", AGENT_LINES[t // 2 % len(AGENT_LINES)])
+        if end:
+            memory.end_session()
+
+
+def measure(make, sessions: int, turns: int, end: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    memory = make()
+    fill(memory, sessions, turns, end)
+
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del memory
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConversationMemory footprint")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--turns", type=int, default=8)
+    args = parser.parse_args()
+
+    turns = args.sessions * args.turns
+    print(f"{args.sessions} sessions x {args.turns} turns")
+    print(f"{'memory':<8} {'MB held':>9} {'bytes/session':>14} {'bytes/turn':>11}")
+    print("-" * 45)
+
+    cases = (
+        ("legacy", LegacyMemory, False),
+        ("slots", lambda: ConversationMemory(max_sessions=args.sessions), False),
+        ("ended", ConversationMemory, True),
+    )
+    for name, make, end in cases:
+        held = measure(make, args.sessions, args.turns, end)
+        print(f"{name:<8} {held / 1e6:>9.1f} {held / args.sessions:>14.0f} "
+              f"{held / turns:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Order Store Benchmark
+---------------------
+
+Compares lookup and update throughput of:
+
+  csv-scan   re-parse orders.csv + linear scan / full rewrite
+             (the original data.py behaviour)
+  csv-index  OrderRepository with the append-only journal
+  sqlite     SQLiteOrderStore with batched transactions
+
+Run:
+    python -m benchmarks.bench_order_store --sizes 10000 100000 1000000
+"""
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from last_mile_delivery.data import OrderRepository, save_orders
+from last_mile_delivery.journal import OrderJournal, FSYNC_POLICIES, FSYNC_INTERVAL
+from last_mile_delivery.sqlite_store import COLUMNS, SQLiteOrderStore, import_csv
+
+
+# --------------------------------------------------
+# DATA
+# --------------------------------------------------
+
+def write_orders(path: Path, rows: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            writer.writerow([
+                str(100000 + i),
+                f"Customer {i}",
+                f"9{i:09d}",
+                "Jan 10",
+                "Jan 25|Jan 28|Jan 30",
+                "failed",
+                "",
+                "",
+                "",
+            ])
+
+
+# --------------------------------------------------
+# BASELINE (ORIGINAL BEHAVIOUR)
+# --------------------------------------------------
+
+def scan_load(path: Path) -> list[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def scan_find(path: Path, phone: str):
+    for order in scan_load(path):
+        if order["phone"] == phone:
+            return order
+    return None
+
+
+def scan_update(path: Path, order_id: str, changes: dict):
+    orders = scan_load(path)
+    for order in orders:
+        if order["order_id"] == order_id:
+            order.update(changes)
+            break
+    save_orders(orders, path)
+
+
+# --------------------------------------------------
+# TIMING
+# --------------------------------------------------
+
+def ops_per_sec(fn, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    elapsed = time.perf_counter() - start
+    return len(args_list) / elapsed if elapsed else float("inf")
+
+
+def bench_size(rows: int, ops: int, scan_ops: int, fsync: str, workdir: Path):
+    rng = random.Random(rows)
+    csv_path = workdir / f"orders_{rows}.csv"
+    write_orders(csv_path, rows)
+
+    picks = [rng.randrange(rows) for _ in range(ops)]
+    phones = [(f"9{i:09d}",) for i in picks]
+    updates = [(str(100000 + i), {"status": "scheduled", "scheduled_date": "Jan 25"})
+               for i in picks]
+
+    results = {}
+
+    # ---- csv-scan ----
+    scan_path = workdir / f"scan_{rows}.csv"
+    write_orders(scan_path, rows)
+    results["csv-scan"] = (
+        None,
+        ops_per_sec(lambda p: scan_find(scan_path, p), phones[:scan_ops]),
+        ops_per_sec(lambda o, c: scan_update(scan_path, o, c), updates[:scan_ops]),
+    )
+
+    # ---- csv-index ----
+    repo = OrderRepository(
+        csv_path,
+        journal=OrderJournal(csv_path.with_suffix(".journal"), fsync=fsync),
+    )
+    start = time.perf_counter()
+    repo.refresh()
+    load_s = time.perf_counter() - start
+    results["csv-index"] = (
+        load_s,
+        ops_per_sec(repo.find_by_phone, phones),
+        ops_per_sec(repo.update, updates),
+    )
+
+    # ---- sqlite ----
+    db_path = workdir / f"orders_{rows}.db"
+    start = time.perf_counter()
+    import_csv(csv_path, db_path)
+    load_s = time.perf_counter() - start
+
+    store = SQLiteOrderStore(db_path, batch_size=50)
+    lookup = ops_per_sec(store.find_by_phone, phones)
+
+    start = time.perf_counter()
+    for order_id, changes in updates:
+        store.update(order_id, changes)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    results["sqlite"] = (load_s, lookup, len(updates) / elapsed)
+    store.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--scan-ops", type=int, default=3,
+                        help="operations for the O(N) baseline (slow)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default=FSYNC_INTERVAL)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'engine':<10} {'load s':>8} {'lookups/s':>12} {'updates/s':>12}")
+    print("-" * 55)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            results = bench_size(rows, args.ops, args.scan_ops, args.fsync, Path(tmp))
+            for engine, (load_s, lookups, updates) in results.items():
+                load = f"{load_s:8.2f}" if load_s is not None else f"{'-':>8}"
+                print(f"{rows:>9} {engine:<10} {load} {lookups:>12,.0f} {updates:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+TTS Streaming Latency Benchmark
+-------------------------------
+
+Time-to-first-audio of "synthesize everything, then play" versus
+streaming chunks into a RingBuffer that a simulated audio clock
+drains in real time. The TTS is a local fake: first chunk after
+`--first-chunk-ms`, then audio rendered `--render-speed` x real time.
+
+Run:
+    python -m benchmarks.bench_tts_streaming
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from audio.ring_buffer import RingBuffer
+
+
+SAMPLE_RATE = 24000
+BLOCK_MS = 20
+
+PROMPTS = {
+    "short": "Hello, can you hear me?",
+    "medium": "Just to confirm, should we deliver the parcel on Jan 25?",
+    "long": (
+        "We attempted delivery earlier but couldn't reach you. "
+        "The next available delivery dates are Jan 25, Jan 28, Jan 30. "
+        "Which date would you prefer?"
+    ),
+}
+
+
+class FakeTTSStream:
+    def __init__(self, first_chunk_ms: float, render_speed: float,
+                 chars_per_second: float = 15.0, chunk_ms: int = 100):
+        self.first_chunk = first_chunk_ms / 1000
+        self.render_speed = render_speed
+        self.chars_per_second = chars_per_second
+        self.chunk_samples = int(SAMPLE_RATE * chunk_ms / 1000)
+
+    async def stream(self, text: str):
+        await asyncio.sleep(self.first_chunk)
+        remaining = int(len(text) / self.chars_per_second * SAMPLE_RATE)
+        while remaining > 0:
+            n = min(self.chunk_samples, remaining)
+            remaining -= n
+            yield np.full(n, 1000, dtype=np.int16).tobytes()
+            await asyncio.sleep(n / SAMPLE_RATE / self.render_speed)
+
+    async def synthesize(self, text: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(text)])
+
+
+async def play_collected(tts: FakeTTSStream, text: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    await tts.synthesize(text)
+    # Playback can only start now
+    return time.perf_counter() - start, 0
+
+
+async def play_streamed(tts: FakeTTSStream, text: str) -> tuple[float, int]:
+    """
+    Returns (time to first audible block, underrun blocks).
+    """
+    ring = RingBuffer(SAMPLE_RATE * 2)
+    block = np.zeros(int(SAMPLE_RATE * BLOCK_MS / 1000), dtype=np.int16)
+    done = False
+    first_audio = None
+    underruns = 0
+    start = time.perf_counter()
+
+    async def produce():
+        nonlocal done
+        async for chunk in tts.stream(text):
+            samples = np.frombuffer(chunk, dtype=np.int16)
+            while samples.size:
+                samples = samples[ring.write(samples):]
+                if samples.size:
+                    await asyncio.sleep(BLOCK_MS / 1000)
+        done = True
+
+    async def consume():
+        nonlocal first_audio, underruns
+        while not (done and not ring.available):
+            n = ring.read_into(block)
+            if n and first_audio is None:
+                first_audio = time.perf_counter() - start
+            elif not n and first_audio is not None and not done:
+                underruns += 1
+            await asyncio.sleep(BLOCK_MS / 1000)
+
+    await asyncio.gather(produce(), consume())
+    return first_audio, underruns
+
+
+async def run(args):
+    tts = FakeTTSStream(args.first_chunk_ms, args.render_speed)
+
+    print(f"{'prompt':<8} {'mode':<10} {'first audio ms':>15} {'underruns':>10}")
+    print("-" * 46)
+
+    for name, text in PROMPTS.items():
+        for mode, fn in (("collect", play_collected), ("stream", play_streamed)):
+            samples = [await fn(tts, text) for _ in range(args.runs)]
+            ttfa = statistics.mean(s[0] for s in samples) * 1000
+            underruns = sum(s[1] for s in samples)
+            print(f"{name:<8} {mode:<10} {ttfa:>15.0f} {underruns:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS time-to-first-audio benchmark")
+    parser.add_argument("--first-chunk-ms", type=float, default=250)
+    parser.add_argument("--render-speed", type=float, default=4.0)
+    parser.add_argument("--runs", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
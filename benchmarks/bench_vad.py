@@ -0,0 +1,110 @@
+"""
+VAD CPU Benchmark
+-----------------
+
+CPU time spent per second of captured audio by the recorder's
+per-chunk work:
+
+  legacy   100 ms chunks, float32 RMS, chunks copied into a list
+           and concatenated at the end of the turn
+  energy   20 ms frames, EnergyVAD integer energy, samples copied
+           into one preallocated buffer
+
+The audio is synthetic (noise with speech-like bursts), so no sound
+card is needed.
+
+Run:
+    python -m benchmarks.bench_vad
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from audio.vad import EnergyVAD
+
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_call(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    Background noise with alternating 1.5 s talk / 1 s pause.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0, 80, n)
+
+    t = np.arange(n) / SAMPLE_RATE
+    talking = (t % 2.5) < 1.5
+    audio += talking * 6000 * np.sin(2 * np.pi * 180 * t) * rng.uniform(0.5, 1.0, n)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def legacy(audio: np.ndarray, chunk_ms: int = 100, threshold: float = 350.0) -> int:
+    chunk = int(SAMPLE_RATE * chunk_ms / 1000)
+    chunks = []
+    speech = 0
+
+    for i in range(0, len(audio) - chunk + 1, chunk):
+        audio_chunk = audio[i:i + chunk]
+        chunks.append(audio_chunk.copy())
+        rms = np.sqrt(np.mean(np.square(audio_chunk.astype(np.float32))))
+        speech += rms > threshold
+
+    np.concatenate(chunks, axis=0).tobytes()
+    return speech
+
+
+def energy(audio: np.ndarray, frame_ms: int = 20, threshold: float = 350.0) -> int:
+    vad = EnergyVAD(SAMPLE_RATE, frame_ms, threshold=threshold)
+    frame = int(SAMPLE_RATE * frame_ms / 1000)
+    buffer = np.zeros(len(audio), dtype=np.int16)
+    length = 0
+    speech = 0
+
+    for i in range(0, len(audio) - frame + 1, frame):
+        audio_frame = audio[i:i + frame]
+        buffer[length:length + frame] = audio_frame
+        length += frame
+        speech += vad.is_speech(audio_frame)
+
+    memoryview(buffer[:length]).tobytes()
+    return speech
+
+
+def cpu_per_audio_second(fn, audio: np.ndarray, runs: int, **kwargs) -> float:
+    fn(audio, **kwargs)  # warm-up
+    start = time.process_time()
+    for _ in range(runs):
+        fn(audio, **kwargs)
+    elapsed = time.process_time() - start
+    return elapsed / runs / (len(audio) / SAMPLE_RATE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD CPU cost per second of audio")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    audio = synthetic_call(args.seconds)
+
+    print(f"{'engine':<16} {'frame ms':>9} {'CPU us / audio s':>17} {'recorders / core':>17}")
+    print("-" * 62)
+
+    cases = (
+        ("legacy float", legacy, 100),
+        ("legacy float", legacy, 20),
+        ("EnergyVAD", energy, 20),
+        ("EnergyVAD", energy, 10),
+    )
+    for name, fn, frame_ms in cases:
+        key = "chunk_ms" if fn is legacy else "frame_ms"
+        cost = cpu_per_audio_second(fn, audio, args.runs, **{key: frame_ms})
+        print(f"{name:<16} {frame_ms:>9} {cost * 1e6:>17.0f} {1 / cost:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Voice Loop Benchmark
+--------------------
+
+End-to-end throughput of LastMileDeliveryVoiceAgent without a sound
+card or API keys. Scripted caller conversations are replayed as WAV
+files (cut by the recorder's VAD) against fake STT / TTS backends
+with configurable latency distributions, on the campaign runner.
+
+Reports turns/sec, calls/sec, CPU per call and per turn, and peak
+heap per live call (a separate, smaller tracemalloc pass).
+
+Caller audio is synthesized into a temporary directory unless
+`--wav-dir` points at recorded conversations laid out as
+<script>/NN.wav + <script>/transcript.txt.
+
+Run:
+    python -m benchmarks.bench_voice_loop
+    python -m benchmarks.bench_voice_loop --calls 2000 --concurrency 400 \\
+        --stt-latency lognormal:0.3:0.5 --trace
+    python -m benchmarks.bench_voice_loop --speculative
+"""
+
+import argparse
+import asyncio
+import itertools
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from campaign.runner import CampaignRunner, _simulated_orders, percentile
+from campaign.simulated import (
+    Latency,
+    ReplaySTT,
+    SilentTTS,
+    WavCallerChannel,
+    load_wav_scripts,
+    write_wav_scripts,
+)
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+from telemetry.tracing import Tracer
+
+
+def make_factory(scripts: dict, args, tracer=None):
+    transcripts = {}
+    names = itertools.cycle(sorted(scripts))
+
+    def factory(order: dict) -> LastMileDeliveryVoiceAgent:
+        return LastMileDeliveryVoiceAgent(
+            order["phone"],
+            order=order,
+            channel=WavCallerChannel(
+                scripts[next(names)], transcripts, time_scale=args.time_scale
+            ),
+            stt=ReplaySTT(
+                transcripts, Latency(args.stt_latency), time_scale=args.time_scale
+            ),
+            tts=SilentTTS(Latency(args.tts_latency), time_scale=args.time_scale),
+            tracer=tracer,
+            speculative=args.speculative,
+            verbose=False,
+        )
+
+    return factory
+
+
+async def run_campaign(factory, calls: int, concurrency: int):
+    runner = CampaignRunner(factory, concurrency=concurrency)
+    return await runner.run(_simulated_orders(calls))
+
+
+def throughput(scripts: dict, args):
+    tracer = Tracer() if args.trace else None
+    factory = make_factory(scripts, args, tracer)
+
+    cpu = time.process_time()
+    stats = asyncio.run(run_campaign(factory, args.calls, args.concurrency))
+    cpu = time.process_time() - cpu
+
+    calls = len(stats.results)
+    turns = len(stats.turn_latencies)
+    latencies = stats.turn_latencies
+
+    print(f"calls: {calls} ({stats.count('completed')} completed, "
+          f"{stats.count('error')} errors, {stats.count('timeout')} timeouts)")
+    print(f"wall:  {stats.elapsed:.2f}s   cpu: {cpu:.2f}s")
+    print(f"{calls / stats.elapsed:>10.1f} calls/sec")
+    print(f"{turns / stats.elapsed:>10.1f} turns/sec")
+    print(f"{cpu / calls * 1000:>10.2f} ms CPU per call")
+    if turns:
+        print(f"{cpu / turns * 1000:>10.2f} ms CPU per turn")
+    print(f"turn latency p50={percentile(latencies, 50) * 1000:.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:.1f}ms (scaled time)")
+
+    if tracer is not None:
+        print()
+        print(tracer.report())
+
+
+def memory(scripts: dict, args):
+    calls = min(args.calls, args.concurrency * 2)
+    factory = make_factory(scripts, args)
+
+    tracemalloc.start()
+    asyncio.run(run_campaign(factory, calls, args.concurrency))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{peak / args.concurrency / 1024:>10.1f} KiB peak heap per live call "
+          f"({calls} calls, {args.concurrency} concurrent)")
+    print(f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:>10.1f} MiB max RSS")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline voice loop benchmark")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="simulated time per real second")
+    parser.add_argument("--stt-latency", default="lognormal:0.3:0.3",
+                        help="seconds, or a distribution (see campaign.simulated.Latency)")
+    parser.add_argument("--tts-latency", default="lognormal:0.25:0.3",
+                        help="time to first audio, same format")
+    parser.add_argument("--wav-dir", help="recorded caller conversations")
+    parser.add_argument("--trace", action="store_true", help="per-stage latency table")
+    parser.add_argument("--speculative", action="store_true",
+                        help="synthesize replies during the end-of-speech timer")
+    parser.add_argument("--skip-memory", action="store_true")
+    args = parser.parse_args()
+
+    # Reject bad specs before any call starts
+    Latency(args.stt_latency), Latency(args.tts_latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.wav_dir:
+            scripts = load_wav_scripts(args.wav_dir)
+        else:
+            scripts = write_wav_scripts(tmp, next(_simulated_orders(1)))
+
+        print(f"{len(scripts)} scripts, {sum(len(t) for t in scripts.values())} caller WAVs, "
+              f"STT {args.stt_latency}, TTS {args.tts_latency}, time scale {args.time_scale}")
+        print("-" * 60)
+        throughput(scripts, args)
+        if not args.skip_memory:
+            print("-" * 60)
+            memory(scripts, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Campaign Module"""
@@ -0,0 +1,418 @@
+"""
+Campaign Runner
+---------------
+
+Drives many outbound calls concurrently on one asyncio loop.
+
+  - at most `concurrency` calls are live at any time
+  - pending orders flow through a bounded queue, so a large (or
+    lazily generated) order source is never read ahead of capacity
+  - every call is cut off after `call_timeout` seconds
+
+Simulated run (no sound card, no API keys):
+    python -m campaign.runner --simulate --calls 1000 --concurrency 200
+
+Finished calls can be exported for analytics (see export.py):
+    python -m campaign.runner --simulate --export exports/ --export-format columnar
+
+Per-stage latency table (VAD, STT, agent, TTS, playback), optionally
+also served as Prometheus metrics:
+    python -m campaign.runner --simulate --trace --metrics-port 9464
+
+Unclear answers can go to an LLM (intent_llm.py). Every call shares
+one classifier, so its cache and request scheduler are per campaign;
+the scheduler's queue depth and wait times are printed with the
+summary and exported with the Prometheus metrics:
+    python -m campaign.runner --simulate --intent-llm --intent-llm-batch-ms 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from last_mile_delivery.data import close_repository, load_orders
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+
+
+# --------------------------------------------------
+# RESULTS
+# --------------------------------------------------
+
+@dataclass
+class CallResult:
+    order_id: str
+    outcome: str                 # completed / timeout / error
+    final_state: str = ""
+    duration: float = 0.0
+    turn_latencies: list[float] = field(default_factory=list)
+    error: str = ""
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile; 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class CampaignStats:
+    results: list[CallResult] = field(default_factory=list)
+    started: float = 0.0
+    finished: float = 0.0
+    # HybridIntentClassifier.metrics() at the end of the run
+    intent: dict = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def calls_per_minute(self) -> float:
+        return len(self.results) / self.elapsed * 60 if self.elapsed else 0.0
+
+    @property
+    def mean_call_duration(self) -> float:
+        if not self.results:
+            return 0.0
+        return sum(r.duration for r in self.results) / len(self.results)
+
+    @property
+    def turn_latencies(self) -> list[float]:
+        return [t for r in self.results for t in r.turn_latencies]
+
+    def count(self, outcome: str) -> int:
+        return sum(1 for r in self.results if r.outcome == outcome)
+
+    def summary(self) -> str:
+        latencies = self.turn_latencies
+        return (
+            f"calls={len(self.results)} "
+            f"completed={self.count('completed')} "
+            f"timeout={self.count('timeout')} "
+            f"error={self.count('error')} | "
+            f"{self.calls_per_minute:.1f} calls/min | "
+            f"mean call {self.mean_call_duration:.2f}s | "
+            f"turn latency p50={percentile(latencies, 50) * 1000:.0f}ms "
+            f"p95={percentile(latencies, 95) * 1000:.0f}ms"
+        ) + self._intent_summary()
+
+    def _intent_summary(self) -> str:
+        if not self.intent:
+            return ""
+        line = (
+            f" | intent llm escalated={self.intent['escalated']} "
+            f"fallbacks={self.intent['fallbacks']}"
+        )
+        if "max_queue_depth" in self.intent:
+            line += (
+                f" queue max={self.intent['max_queue_depth']} "
+                f"wait p50={self.intent['wait_p50_ms']:.0f}ms "
+                f"p95={self.intent['wait_p95_ms']:.0f}ms"
+            )
+        return line
+
+
+# --------------------------------------------------
+# RUNNER
+# --------------------------------------------------
+
+def pending_orders(status: str = "failed") -> list[dict]:
+    """
+    Orders still waiting for a redelivery call.
+    """
+    return [order for order in load_orders() if order["status"] == status]
+
+
+class CampaignRunner:
+    def __init__(
+        self,
+        agent_factory: Callable[[dict], LastMileDeliveryVoiceAgent],
+        concurrency: int = 50,
+        call_timeout: float = 120.0,
+        queue_size: int | None = None,
+        intent_classifier=None,
+    ):
+        """
+        intent_classifier   the HybridIntentClassifier the factory hands
+                            to every agent; its metrics go into the
+                            stats and it is closed when the run ends
+        """
+        self.agent_factory = agent_factory
+        self.intent_classifier = intent_classifier
+        self.concurrency = concurrency
+        self.call_timeout = call_timeout
+        self.queue_size = queue_size or concurrency * 2
+        self.stats = CampaignStats()
+
+    async def run(self, orders: Iterable[dict]) -> CampaignStats:
+        self.stats = CampaignStats(started=time.perf_counter())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        workers = [
+            asyncio.create_task(self._worker(queue))
+            for _ in range(self.concurrency)
+        ]
+
+        try:
+            # put() blocks while the queue is full: backpressure
+            for order in orders:
+                await queue.put(order)
+            for _ in workers:
+                await queue.put(None)
+
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.stats.finished = time.perf_counter()
+            if self.intent_classifier is not None:
+                self.stats.intent = self.intent_classifier.metrics()
+                await self.intent_classifier.aclose()
+
+        return self.stats
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            order = await queue.get()
+            if order is None:
+                return
+            self.stats.results.append(await self._call(order))
+
+    async def _call(self, order: dict) -> CallResult:
+        started = time.perf_counter()
+        result = CallResult(order_id=order["order_id"], outcome="completed")
+        agent = None
+
+        try:
+            agent = self.agent_factory(order)
+            await asyncio.wait_for(agent.run(), timeout=self.call_timeout)
+        except asyncio.TimeoutError:
+            result.outcome = "timeout"
+        except Exception as e:
+            result.outcome = "error"
+            result.error = f"{type(e).__name__}: {e}"
+
+        if agent is not None:
+            result.final_state = agent.agent.state.name
+            result.turn_latencies = agent.turn_latencies
+
+        result.duration = time.perf_counter() - started
+        return result
+
+
+# --------------------------------------------------
+# ENTRYPOINT
+# --------------------------------------------------
+
+def _simulated_orders(count: int):
+    for i in range(count):
+        yield {
+            "order_id": f"SIM-{i}",
+            "customer_name": f"Customer {i}",
+            "phone": f"9{i:09d}",
+            "failed_date": "Jan 10",
+            "available_dates": "Jan 25|Jan 28|Jan 30",
+            "status": "failed",
+            "scheduled_date": "",
+            "neighbor_name": "",
+            "neighbor_phone": "",
+        }
+
+
+def _simulated_factory(
+    time_scale: float,
+    barge_in: bool = False,
+    exporter=None,
+    tracer=None,
+    speculative: bool = False,
+    intent_classifier=None,
+):
+    from campaign.simulated import (
+        SCRIPTS,
+        SimulatedChannel,
+        ScriptedSTT,
+        SilentTTS,
+        script_for,
+    )
+
+    scripts = itertools.cycle(SCRIPTS)
+
+    def factory(order: dict) -> LastMileDeliveryVoiceAgent:
+        return LastMileDeliveryVoiceAgent(
+            order["phone"],
+            order=order,
+            channel=SimulatedChannel(
+                script_for(order, next(scripts)),
+                time_scale=time_scale,
+                interrupt_after=1.0 if barge_in else None,
+            ),
+            stt=ScriptedSTT(time_scale=time_scale),
+            tts=SilentTTS(time_scale=time_scale),
+            barge_in=barge_in,
+            exporter=exporter,
+            tracer=tracer,
+            speculative=speculative,
+            intent_classifier=intent_classifier,
+            verbose=False,
+        )
+
+    return factory
+
+
+def _intent_classifier(args):
+    """
+    The one HybridIntentClassifier shared by every call, and its
+    client; (None, None) without --intent-llm.
+    """
+    if not args.intent_llm:
+        return None, None
+
+    from dotenv import load_dotenv
+
+    from last_mile_delivery.intent_llm import HybridIntentClassifier, LLMIntentClassifier
+    from llm.chat_client import ChatClient
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY not set (--intent-llm)")
+
+    client = ChatClient(
+        api_key,
+        base_url=os.getenv("INTENT_LLM_URL", "https://api.groq.com/openai/v1"),
+        model=os.getenv("INTENT_LLM_MODEL", "llama-3.1-8b-instant"),
+    )
+    scheduler = None
+    if args.intent_llm_batch_ms or args.intent_llm_rate:
+        scheduler = {
+            "batch_window": args.intent_llm_batch_ms / 1000,
+            "rate": args.intent_llm_rate or None,
+        }
+    classifier = HybridIntentClassifier(
+        LLMIntentClassifier(client, scheduler=scheduler),
+        budget=args.intent_llm_budget_ms / 1000,
+    )
+    return classifier, client
+
+
+async def _run(runner: CampaignRunner, orders: Iterable[dict], client=None) -> CampaignStats:
+    try:
+        return await runner.run(orders)
+    finally:
+        if client is not None:
+            await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbound delivery call campaign")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="per-call timeout in seconds")
+    parser.add_argument("--simulate", action="store_true",
+                        help="simulated telephony instead of sound card + Deepgram")
+    parser.add_argument("--calls", type=int, default=500,
+                        help="number of simulated calls")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="simulated time per real second")
+    parser.add_argument("--barge-in", action="store_true",
+                        help="let callers interrupt the agent's replies")
+    parser.add_argument("--speculative", action="store_true",
+                        help="synthesize replies during the end-of-speech timer")
+    parser.add_argument("--export", metavar="DIR",
+                        help="write finished-call records to this directory")
+    parser.add_argument("--export-format", choices=("jsonl", "columnar"), default="jsonl")
+    parser.add_argument("--trace", action="store_true",
+                        help="time each voice loop stage and print a p50/p95 table")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve stage histograms at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--intent-llm", action="store_true",
+                        help="send answers the phrase rules can't settle to an LLM")
+    parser.add_argument("--intent-llm-budget-ms", type=float, default=350.0)
+    parser.add_argument("--intent-llm-batch-ms", type=float, default=0.0,
+                        help="batch LLM lookups arriving within this window (0: send directly)")
+    parser.add_argument("--intent-llm-rate", type=float, default=0.0,
+                        help="LLM requests per second at most (0: unlimited)")
+    args = parser.parse_args()
+
+    intent_classifier, llm_client = _intent_classifier(args)
+
+    tracer = metrics = None
+    if args.trace or args.metrics_port is not None:
+        from telemetry.exporters import PrometheusExporter
+        from telemetry.tracing import Tracer
+
+        tracer = Tracer()
+        if args.metrics_port is not None:
+            gauges = {}
+            if intent_classifier is not None:
+                gauges["intent_llm"] = intent_classifier.metrics
+            metrics = PrometheusExporter(tracer, gauges)
+            metrics.serve(args.metrics_port)
+
+    exporter = None
+    if args.export:
+        from last_mile_delivery.export import CallExporter, ColumnarWriter, JSONLWriter
+
+        writer = JSONLWriter if args.export_format == "jsonl" else ColumnarWriter
+        exporter = CallExporter(writer(args.export))
+
+    if args.simulate:
+        orders = _simulated_orders(args.calls)
+        factory = _simulated_factory(
+            args.time_scale, args.barge_in, exporter, tracer, args.speculative,
+            intent_classifier,
+        )
+    else:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.getenv("DEEPGRAM_API_KEY")
+        if not api_key:
+            raise RuntimeError("DEEPGRAM_API_KEY not set")
+
+        orders = pending_orders()
+
+        def factory(order: dict) -> LastMileDeliveryVoiceAgent:
+            return LastMileDeliveryVoiceAgent(
+                order["phone"],
+                api_key=api_key,
+                order=order,
+                barge_in=args.barge_in,
+                exporter=exporter,
+                tracer=tracer,
+                speculative=args.speculative,
+                intent_classifier=intent_classifier,
+            )
+
+    runner = CampaignRunner(
+        factory,
+        concurrency=args.concurrency,
+        call_timeout=args.timeout,
+        intent_classifier=intent_classifier,
+    )
+    try:
+        stats = asyncio.run(_run(runner, orders, llm_client))
+    finally:
+        close_repository()
+        if exporter is not None:
+            exporter.close()
+        if metrics is not None:
+            metrics.close()
+    print(f"📊 {stats.summary()}")
+    if tracer is not None:
+        print(tracer.report())
+    if exporter is not None:
+        print(f"📦 Exported {exporter.exported} calls in {exporter.batches} batches to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
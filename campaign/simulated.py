@@ -0,0 +1,415 @@
+"""
+Simulated Telephony
+-------------------
+
+Stand-ins for the sound card, Deepgram STT and Deepgram TTS, so a
+campaign can drive hundreds of calls without hardware or API keys.
+
+The simulated caller "audio" is the utterance text itself; only
+ScriptedSTT understands it. Every stage sleeps for a realistic
+duration, scaled by `time_scale` (0.01 = 100x faster than real time).
+
+WavCallerChannel replays real (or synthesized) caller WAV audio
+instead, cutting each turn with the same VAD as the live recorder;
+ReplaySTT returns the transcript of whatever audio it captured.
+
+STT / TTS delays take a fixed latency plus uniform jitter, or any
+Latency distribution ("lognormal:0.3:0.4", "uniform:0.2:0.5", ...).
+"""
+
+import asyncio
+import hashlib
+import io
+import math
+import random
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from audio.channel import CallChannel
+from audio.vad import EnergyVAD
+
+
+# Typical conversations; "{date}" is the order's first available date
+SCRIPTS = {
+    "schedule": ["yes", "{date} works for me", "yes"],
+    "neighbor": ["yes", "I won't be available", "yes", "Ramesh", "yes"],
+    "cancel": ["yes", "I'm out of town", "no"],
+    "wrong_person": ["no"],
+    "no_answer": [],
+}
+
+
+class Latency:
+    """
+    Delay distribution in seconds, from a spec string:
+
+        "0.3"                   fixed
+        "uniform:0.2:0.5"       low, high
+        "normal:0.3:0.05"       mean, stddev (never below 0)
+        "lognormal:0.3:0.4"     median, sigma (long right tail)
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str | float, rng: random.Random | None = None):
+        self.spec = str(spec)
+        kind, *params = self.spec.split(":")
+        if not params:
+            kind, params = "fixed", [kind]
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+
+        self.kind = kind
+        try:
+            self.params = tuple(float(p) for p in params)
+        except ValueError:
+            raise ValueError(f"Bad latency spec: {self.spec}") from None
+        if len(self.params) != (1 if kind == "fixed" else 2):
+            raise ValueError(f"Bad latency spec: {self.spec}")
+
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        a, b = self.params
+        if self.kind == "uniform":
+            return self.rng.uniform(a, b)
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(a, b))
+        return a * math.exp(self.rng.gauss(0.0, b))
+
+    def __repr__(self):
+        return f"Latency({self.spec!r})"
+
+
+def _delay(latency, jitter: float) -> float:
+    if isinstance(latency, Latency):
+        return latency.sample()
+    return latency + random.uniform(0, jitter)
+
+
+def script_for(order: dict, name: str) -> list[str]:
+    dates = order["available_dates"]
+    if isinstance(dates, str):
+        dates = dates.split("|")
+    return [line.format(date=dates[0]) for line in SCRIPTS[name]]
+
+
+class SimulatedChannel(CallChannel):
+    def __init__(
+        self,
+        utterances: list[str],
+        time_scale: float = 1.0,
+        sample_rate: int = 24000,
+        answer_delay: float = 0.4,
+        words_per_second: float = 2.5,
+        end_of_speech: float = 0.9,
+        start_timeout: float = 5.0,
+        interrupt_after: float | None = None,
+    ):
+        self.utterances = list(utterances)
+        self.time_scale = time_scale
+        self.sample_rate = sample_rate
+        self.answer_delay = answer_delay
+        self.words_per_second = words_per_second
+        self.end_of_speech = end_of_speech
+        self.start_timeout = start_timeout
+
+        # Impatient caller: starts answering this many seconds into
+        # the agent's reply instead of waiting for it to finish
+        self.interrupt_after = interrupt_after
+
+    async def record(self, preroll=None) -> bytes:
+        self.speech_started = self.speech_ended = None
+        if not self.utterances:
+            # Caller stays silent until the recorder gives up
+            await asyncio.sleep(self.start_timeout * self.time_scale)
+            return b""
+
+        text = self.utterances.pop(0)
+        speech = len(text.split()) / self.words_per_second
+
+        if preroll is not None:
+            # Turn began during playback; `preroll` seconds already heard
+            speech = max(0.0, speech - preroll)
+        else:
+            await asyncio.sleep(self.answer_delay * self.time_scale)
+
+        self.speech_started = time.perf_counter()
+        await asyncio.sleep(speech * self.time_scale)
+        self.speech_ended = time.perf_counter()
+        if self.on_pause is not None:
+            self.on_pause(text.encode("utf-8"))
+        await asyncio.sleep(self.end_of_speech * self.time_scale)
+        return text.encode("utf-8")
+
+    async def wait_for_speech(self, min_speech_ms: int) -> float:
+        if self.interrupt_after is None or not self.utterances:
+            # This caller never talks over the agent
+            await asyncio.Future()
+
+        heard = min_speech_ms / 1000
+        await asyncio.sleep((self.interrupt_after + heard) * self.time_scale)
+        return heard
+
+    async def play(self, audio_bytes: bytes) -> None:
+        duration = len(audio_bytes) / (self.sample_rate * 2)
+        await asyncio.sleep(duration * self.time_scale)
+
+    async def play_stream(self, chunks) -> None:
+        async for chunk in chunks:
+            await self.play(chunk)
+
+
+class ScriptedSTT:
+    def __init__(
+        self,
+        latency: float | Latency = 0.3,
+        jitter: float = 0.1,
+        time_scale: float = 1.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.time_scale = time_scale
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        await asyncio.sleep(_delay(self.latency, self.jitter) * self.time_scale)
+        return audio_bytes.decode("utf-8", errors="ignore")
+
+
+class SilentTTS:
+    """
+    `latency` is time to first audio; the rest of the utterance is
+    rendered `render_speed` times faster than real time.
+    """
+
+    def __init__(
+        self,
+        latency: float | Latency = 0.25,
+        jitter: float = 0.1,
+        sample_rate: int = 24000,
+        chars_per_second: float = 15.0,
+        render_speed: float = 4.0,
+        chunk_ms: int = 100,
+        time_scale: float = 1.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.sample_rate = sample_rate
+        self.chars_per_second = chars_per_second
+        self.render_speed = render_speed
+        self.chunk_ms = chunk_ms
+        self.time_scale = time_scale
+
+    def _samples(self, text: str) -> int:
+        return int(len(text) / self.chars_per_second * self.sample_rate)
+
+    async def synthesize(self, text: str) -> bytes:
+        samples = self._samples(text)
+        render = samples / self.sample_rate / self.render_speed
+        delay = _delay(self.latency, self.jitter) + render
+        await asyncio.sleep(delay * self.time_scale)
+
+        return bytes(samples * 2)  # int16 silence
+
+    async def stream(self, text: str):
+        await asyncio.sleep(_delay(self.latency, self.jitter) * self.time_scale)
+
+        remaining = self._samples(text)
+        chunk_samples = int(self.sample_rate * self.chunk_ms / 1000)
+        while remaining > 0:
+            n = min(chunk_samples, remaining)
+            remaining -= n
+            yield bytes(n * 2)
+            await asyncio.sleep(n / self.sample_rate / self.render_speed * self.time_scale)
+
+
+# --------------------------------------------------
+# WAV REPLAY
+# --------------------------------------------------
+
+def _wav_bytes(samples: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def _wav_samples(data: bytes) -> tuple[np.ndarray, int]:
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError("Caller audio must be mono 16-bit WAV")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16), wf.getframerate()
+
+
+def synth_utterance(
+    text: str,
+    sample_rate: int = 16000,
+    answer_delay: float = 0.4,
+    words_per_second: float = 2.5,
+    tail: float = 1.0,
+) -> bytes:
+    """
+    Speech-like caller audio for `text` as WAV: a voiced burst per
+    word over a low noise floor, then `tail` seconds of silence.
+    """
+    rng = np.random.default_rng(int.from_bytes(hashlib.sha1(text.encode()).digest()[:4], "little"))
+    word = 0.8 / words_per_second
+    gap = 0.2 / words_per_second
+
+    parts = [rng.normal(0, 40, int(answer_delay * sample_rate))]
+    for _ in text.split():
+        n = int(word * sample_rate)
+        t = np.arange(n) / sample_rate
+        pitch = rng.uniform(110, 220)
+        voiced = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+        envelope = np.sin(np.pi * np.arange(n) / n) ** 0.5
+        parts.append(3000 * voiced * envelope + rng.normal(0, 300, n))
+        parts.append(rng.normal(0, 40, int(gap * sample_rate)))
+    parts.append(rng.normal(0, 40, int(tail * sample_rate)))
+
+    return _wav_bytes(np.clip(np.concatenate(parts), -32768, 32767), sample_rate)
+
+
+def write_wav_scripts(directory: Path | str, order: dict, scripts: dict = SCRIPTS) -> dict:
+    """
+    Render every script for `order` as <directory>/<script>/NN.wav
+    plus transcript.txt (one line per WAV). Returns load_wav_scripts().
+    """
+    for name in scripts:
+        folder = Path(directory) / name
+        folder.mkdir(parents=True, exist_ok=True)
+        lines = script_for(order, name)
+        for i, line in enumerate(lines, 1):
+            (folder / f"{i:02d}.wav").write_bytes(synth_utterance(line))
+        (folder / "transcript.txt").write_text(
+            "".join(line + "\n" for line in lines), encoding="utf-8"
+        )
+    return load_wav_scripts(directory)
+
+
+def load_wav_scripts(directory: Path | str) -> dict[str, list[tuple[bytes, str]]]:
+    """
+    {script name: [(wav bytes, transcript), ...]} from a directory of
+    recorded or synthesized conversations (see write_wav_scripts).
+    """
+    scripts = {}
+    for folder in sorted(p for p in Path(directory).iterdir() if p.is_dir()):
+        wavs = sorted(folder.glob("*.wav"))
+        lines = (folder / "transcript.txt").read_text(encoding="utf-8").splitlines()
+        if len(lines) != len(wavs):
+            raise ValueError(f"{folder}: {len(wavs)} WAV files but {len(lines)} transcript lines")
+        scripts[folder.name] = [(wav.read_bytes(), line) for wav, line in zip(wavs, lines)]
+    return scripts
+
+
+def _audio_key(audio_bytes: bytes) -> bytes:
+    return hashlib.sha1(audio_bytes).digest()
+
+
+class WavCallerChannel(SimulatedChannel):
+    """
+    Plays back one caller WAV per turn, cut where the recorder's VAD
+    would stop (`silence_duration_ms` after the end of speech). The
+    captured audio's transcript goes into `transcripts` for ReplaySTT.
+    """
+
+    def __init__(
+        self,
+        turns: list[tuple[bytes, str]],
+        transcripts: dict,
+        time_scale: float = 1.0,
+        silence_duration_ms: int = 700,
+        frame_ms: int = 20,
+        **kwargs,
+    ):
+        super().__init__([text for _, text in turns], time_scale=time_scale, **kwargs)
+        self.turns = list(turns)
+        self.transcripts = transcripts
+        self.silence_duration_ms = silence_duration_ms
+        self.frame_ms = frame_ms
+
+    def _capture(self, samples: np.ndarray, sample_rate: int):
+        """
+        (cut, first speech sample, last speech sample); cut is 0 if
+        the caller never spoke.
+        """
+        vad = EnergyVAD(sample_rate, self.frame_ms)
+        frame = vad.frame_samples
+        first = last = None
+        silence_ms = 0
+
+        for start in range(0, len(samples) - frame + 1, frame):
+            if vad.is_speech(samples[start:start + frame]):
+                if first is None:
+                    first = start
+                last = start + frame
+                silence_ms = 0
+            elif first is not None:
+                silence_ms += self.frame_ms
+                if silence_ms >= self.silence_duration_ms:
+                    return start + frame, first, last
+
+        if first is None:
+            return 0, None, None
+        return len(samples), first, last
+
+    async def record(self, preroll=None) -> bytes:
+        self.speech_started = self.speech_ended = None
+        if not self.turns:
+            await asyncio.sleep(self.start_timeout * self.time_scale)
+            return b""
+
+        wav, text = self.turns.pop(0)
+        self.utterances.pop(0)
+        samples, sample_rate = _wav_samples(wav)
+
+        started = time.perf_counter()
+        cut, first, last = self._capture(samples, sample_rate)
+        if not cut:
+            await asyncio.sleep(len(samples) / sample_rate * self.time_scale)
+            return b""
+
+        scale = self.time_scale / sample_rate
+        self.speech_started = started + first * scale
+        self.speech_ended = started + last * scale
+
+        if self.on_pause is not None:
+            await asyncio.sleep(max(0.0, self.speech_ended - time.perf_counter()))
+            paused = _wav_bytes(samples[:last], sample_rate)
+            self.transcripts[_audio_key(paused)] = text
+            self.on_pause(paused)
+
+        await asyncio.sleep(max(0.0, started + cut * scale - time.perf_counter()))
+
+        audio = _wav_bytes(samples[:cut], sample_rate)
+        self.transcripts[_audio_key(audio)] = text
+        return audio
+
+
+class ReplaySTT(ScriptedSTT):
+    """
+    Transcript of audio captured by a WavCallerChannel sharing the
+    same `transcripts` dict; "" for audio it has never seen.
+    """
+
+    def __init__(
+        self,
+        transcripts: dict,
+        latency: float | Latency = 0.3,
+        jitter: float = 0.1,
+        time_scale: float = 1.0,
+    ):
+        super().__init__(latency, jitter, time_scale)
+        self.transcripts = transcripts
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        await asyncio.sleep(_delay(self.latency, self.jitter) * self.time_scale)
+        return self.transcripts.get(_audio_key(audio_bytes), "")
@@ -1,17 +1,91 @@
 from enum import Enum
-from last_mile_delivery.intent import (
-    is_yes,
-    is_no,
-    is_unavailable,
-    extract_date,
-)
+from last_mile_delivery.dialog import DialogAgent, Flow, Transition, get_flow, register_flow
+from last_mile_delivery.intent import Intent, extract_date
 from last_mile_delivery.data import (
+    find_order_by_id,
     mark_scheduled,
     mark_neighbor_delivery,
     cancel_delivery,
 )
 
 
+# --------------------------------------------------
+# STATIC RESPONSES
+# (same words on every call, so their audio can be cached)
+# --------------------------------------------------
+
+ASK_CORRECT_PERSON = "Just to confirm, am I speaking with the correct person?"
+WRONG_PERSON = "Sorry for the inconvenience. I’ll end the call now."
+OFFER_NEIGHBOR = (
+    "No problem. If you won’t be available, "
+    "we can deliver the parcel to a neighbor or security. "
+    "Would that be okay?"
+)
+INVALID_DATE = (
+    "I didn’t catch a valid date. "
+    "You can choose one of the dates I mentioned, "
+    "or tell me if you won’t be available."
+)
+ASK_OTHER_DATE = "Alright. Please tell me which date works for you."
+ASK_CONFIRM_DATE = "Please confirm if the delivery date is okay."
+ASK_NEIGHBOR_NAME = (
+    "Sure. Please tell me the name of the neighbor or security "
+    "who can receive the parcel."
+)
+CANCELLED = (
+    "Alright. We’ll cancel this delivery attempt for now. "
+    "You can reschedule later. Thank you."
+)
+ASK_NEIGHBOR_AGAIN = "Would you like us to deliver the parcel to a neighbor or security?"
+REPEAT_NEIGHBOR_NAME = "Please tell me the neighbor’s name."
+NEIGHBOR_CONFIRMED = (
+    "Perfect. The parcel will be delivered to your neighbor. "
+    "Thank you for informing them in advance."
+)
+CORRECT_NEIGHBOR_NAME = "No problem. Please tell me the correct neighbor name."
+ASK_CONFIRM_NEIGHBOR = "Please confirm if we should deliver the parcel to the neighbor."
+CLOSING = "Thank you for your time. Have a good day."
+
+STATIC_RESPONSES = (
+    ASK_CORRECT_PERSON,
+    WRONG_PERSON,
+    OFFER_NEIGHBOR,
+    INVALID_DATE,
+    ASK_OTHER_DATE,
+    ASK_CONFIRM_DATE,
+    ASK_NEIGHBOR_NAME,
+    CANCELLED,
+    ASK_NEIGHBOR_AGAIN,
+    REPEAT_NEIGHBOR_NAME,
+    NEIGHBOR_CONFIRMED,
+    CORRECT_NEIGHBOR_NAME,
+    ASK_CONFIRM_NEIGHBOR,
+    CLOSING,
+)
+
+
+# --------------------------------------------------
+# TEMPLATED RESPONSES
+# (fixed text around one slot; see tts/splice.py)
+# --------------------------------------------------
+
+GREETING = "Hello, am I speaking with {customer_name}?"
+OFFER_DATES = (
+    "We attempted delivery earlier but couldn’t reach you. "
+    "The next available delivery dates are {dates}. "
+    "Which date would you prefer?"
+)
+CONFIRM_DATE = "Just to confirm, should we deliver the parcel on {date}?"
+SCHEDULED = "Your delivery has been scheduled for {date}. Thank you for your time."
+CONFIRM_NEIGHBOR = (
+    "Just to confirm, we will deliver the parcel to {neighbor_name}. "
+    "Please make sure to inform them about this delivery. "
+    "Should I proceed?"
+)
+
+TEMPLATES = (GREETING, OFFER_DATES, CONFIRM_DATE, SCHEDULED, CONFIRM_NEIGHBOR)
+
+
 class ConversationState(Enum):
     OPENING = "opening"
     VERIFY_PERSON = "verify_person"
@@ -25,175 +99,118 @@ class ConversationState(Enum):
     CLOSE = "close"
 
 
-class LastMileDeliveryAgent:
-    def __init__(self, memory, order):
-        self.memory = memory
-        self.order = order
-        self.state = ConversationState.OPENING
-        self.context = {}
-
-    # --------------------------------------------------
-    # ENTRY POINT
-    # --------------------------------------------------
-
-    def handle_input(self, user_text: str) -> str:
-        text = user_text.lower().strip()
-        self.memory.add_message("user", user_text)
-
-        if self.state == ConversationState.OPENING:
-            response = self._opening()
-
-        elif self.state == ConversationState.VERIFY_PERSON:
-            response = self._verify_person(text)
-
-        elif self.state == ConversationState.OFFER_DATES:
-            response = self._offer_dates(text)
-
-        elif self.state == ConversationState.CONFIRM_DATE:
-            response = self._confirm_date(text)
-
-        elif self.state == ConversationState.OFFER_NEIGHBOR:
-            response = self._offer_neighbor(text)
-
-        elif self.state == ConversationState.COLLECT_NEIGHBOR_NAME:
-            response = self._collect_neighbor_name(text)
-
-        elif self.state == ConversationState.CONFIRM_NEIGHBOR:
-            response = self._confirm_neighbor(text)
-
-        else:
-            response = self._close()
-
-        self.memory.add_message("agent", response)
-        return response
-
-    # --------------------------------------------------
-    # STATES
-    # --------------------------------------------------
-
-    def _opening(self) -> str:
-        self.state = ConversationState.VERIFY_PERSON
-        return f"Hello, am I speaking with {self.order['customer_name']}?"
-
-    # --------------------------------------------------
-
-    def _verify_person(self, text: str) -> str:
-        if is_yes(text):
-            self.state = ConversationState.OFFER_DATES
-            dates = ", ".join(self.order["available_dates"])
-            return (
-                "We attempted delivery earlier but couldn’t reach you. "
-                f"The next available delivery dates are {dates}. "
-                "Which date would you prefer?"
-            )
-
-        if is_no(text):
-            self.state = ConversationState.CLOSE
-            return "Sorry for the inconvenience. I’ll end the call now."
-
-        return "Just to confirm, am I speaking with the correct person?"
-
-    # --------------------------------------------------
-
-    def _offer_dates(self, text: str) -> str:
-        # USER NOT AVAILABLE AT ALL
-        if is_unavailable(text) or is_no(text):
-            self.state = ConversationState.OFFER_NEIGHBOR
-            return (
-                "No problem. If you won’t be available, "
-                "we can deliver the parcel to a neighbor or security. "
-                "Would that be okay?"
-            )
-
-        # USER SELECTS A DATE
-        date = extract_date(text, self.order["available_dates"])
-        if date:
-            self.context["date"] = date
-            self.state = ConversationState.CONFIRM_DATE
-            return f"Just to confirm, should we deliver the parcel on {date}?"
-
-        return (
-            "I didn’t catch a valid date. "
-            "You can choose one of the dates I mentioned, "
-            "or tell me if you won’t be available."
-        )
-
-    # --------------------------------------------------
-
-    def _confirm_date(self, text: str) -> str:
-        if is_yes(text):
-            mark_scheduled(self.order["order_id"], self.context["date"])
-            self.state = ConversationState.CLOSE
-            return (
-                f"Your delivery has been scheduled for {self.context['date']}. "
-                "Thank you for your time."
-            )
-
-        if is_no(text):
-            self.state = ConversationState.OFFER_DATES
-            return "Alright. Please tell me which date works for you."
-
-        return "Please confirm if the delivery date is okay."
-
-    # --------------------------------------------------
-    # NEIGHBOR FLOW (NEW + IMPORTANT)
-    # --------------------------------------------------
-
-    def _offer_neighbor(self, text: str) -> str:
-        if is_yes(text):
-            self.state = ConversationState.COLLECT_NEIGHBOR_NAME
-            return (
-                "Sure. Please tell me the name of the neighbor or security "
-                "who can receive the parcel."
-            )
-
-        if is_no(text):
-            cancel_delivery(self.order["order_id"])
-            self.state = ConversationState.CLOSE
-            return (
-                "Alright. We’ll cancel this delivery attempt for now. "
-                "You can reschedule later. Thank you."
-            )
-
-        return "Would you like us to deliver the parcel to a neighbor or security?"
-
-    # --------------------------------------------------
-
-    def _collect_neighbor_name(self, text: str) -> str:
-        if len(text) < 2:
-            return "Please tell me the neighbor’s name."
-
-        self.context["neighbor_name"] = text.title()
-        self.state = ConversationState.CONFIRM_NEIGHBOR
-
-        return (
-            f"Just to confirm, we will deliver the parcel to "
-            f"{self.context['neighbor_name']}. "
-            "Please make sure to inform them about this delivery. "
-            "Should I proceed?"
-        )
-
-    # --------------------------------------------------
-
-    def _confirm_neighbor(self, text: str) -> str:
-        if is_yes(text):
-            mark_neighbor_delivery(
-                self.order["order_id"],
-                self.context["neighbor_name"]
-            )
-            self.state = ConversationState.CLOSE
-            return (
-                "Perfect. The parcel will be delivered to your neighbor. "
-                "Thank you for informing them in advance."
-            )
-
-        if is_no(text):
-            self.state = ConversationState.COLLECT_NEIGHBOR_NAME
-            return "No problem. Please tell me the correct neighbor name."
-
-        return "Please confirm if we should deliver the parcel to the neighbor."
-
-    # --------------------------------------------------
-
-    def _close(self) -> str:
-        return "Thank you for your time. Have a good day."
+# --------------------------------------------------
+# HOOKS
+# (looked up at call time, so data functions can be swapped in tests)
+# --------------------------------------------------
+
+def _schedule(turn):
+    mark_scheduled(turn.order["order_id"], turn.context["date"])
+
+
+def _deliver_to_neighbor(turn):
+    mark_neighbor_delivery(
+        turn.order["order_id"],
+        turn.context.get("date") or turn.order["available_dates"][0],
+        turn.context["neighbor_name"],
+    )
+
+
+def _cancel(turn):
+    cancel_delivery(turn.order["order_id"])
+
+
+def _date(turn):
+    return extract_date(turn.text, turn.order["available_dates"])
+
+
+def _neighbor_name(turn):
+    return turn.text.title() if len(turn.text) >= 2 else None
+
+
+def _fields(order: dict, context: dict) -> dict:
+    return {"dates": ", ".join(order["available_dates"])}
+
+
+# --------------------------------------------------
+# DELIVERY FLOW
+# --------------------------------------------------
+
+S = ConversationState
+YES, NO, UNAVAILABLE = Intent.YES, Intent.NO, Intent.UNAVAILABLE
+
+DELIVERY_FLOW = register_flow(Flow(
+    "delivery",
+    initial=S.OPENING.value,
+    final=(S.CLOSE.value,),
+    fields=_fields,
+    states={
+        S.OPENING.value: [
+            Transition(GREETING, S.VERIFY_PERSON.value),
+        ],
+        S.VERIFY_PERSON.value: [
+            Transition(OFFER_DATES, S.OFFER_DATES.value, when=YES),
+            Transition(WRONG_PERSON, S.CLOSE.value, when=NO),
+            Transition(ASK_CORRECT_PERSON),
+        ],
+        S.OFFER_DATES.value: [
+            Transition(OFFER_NEIGHBOR, S.OFFER_NEIGHBOR.value, when=UNAVAILABLE),
+            # A date wins over a bare "no" ("no, the 28th")
+            Transition(CONFIRM_DATE, S.CONFIRM_DATE.value, slot="date", extract=_date),
+            Transition(OFFER_NEIGHBOR, S.OFFER_NEIGHBOR.value, when=NO),
+            Transition(INVALID_DATE),
+        ],
+        S.CONFIRM_DATE.value: [
+            Transition(SCHEDULED, S.CLOSE.value, when=YES, action=_schedule),
+            Transition(ASK_OTHER_DATE, S.OFFER_DATES.value, when=NO),
+            Transition(ASK_CONFIRM_DATE),
+        ],
+        S.OFFER_NEIGHBOR.value: [
+            Transition(ASK_NEIGHBOR_NAME, S.COLLECT_NEIGHBOR_NAME.value, when=YES),
+            Transition(CANCELLED, S.CLOSE.value, when=NO, action=_cancel),
+            Transition(ASK_NEIGHBOR_AGAIN),
+        ],
+        S.COLLECT_NEIGHBOR_NAME.value: [
+            Transition(
+                CONFIRM_NEIGHBOR, S.CONFIRM_NEIGHBOR.value,
+                slot="neighbor_name", extract=_neighbor_name,
+            ),
+            Transition(REPEAT_NEIGHBOR_NAME),
+        ],
+        S.CONFIRM_NEIGHBOR.value: [
+            Transition(NEIGHBOR_CONFIRMED, S.CLOSE.value, when=YES, action=_deliver_to_neighbor),
+            Transition(CORRECT_NEIGHBOR_NAME, S.COLLECT_NEIGHBOR_NAME.value, when=NO),
+            Transition(ASK_CONFIRM_NEIGHBOR),
+        ],
+        S.CLOSE.value: [
+            Transition(CLOSING),
+        ],
+    },
+))
+
+
+class LastMileDeliveryAgent(DialogAgent):
+    state_type = ConversationState
+
+    def __init__(self, memory, order, flow: Flow = DELIVERY_FLOW):
+        # orders.csv stores dates as "Jan 25|Jan 28"
+        dates = order.get("available_dates") or []
+        if isinstance(dates, str):
+            order = {**order, "available_dates": dates.split("|")}
+
+        super().__init__(memory, order, flow)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, memory, order: dict | None = None):
+        """
+        Rebuild an agent from a SessionSnapshot; the order is looked
+        up by id unless given.
+        """
+        if order is None:
+            order = find_order_by_id(snapshot.order_id)
+        if not order:
+            raise RuntimeError(f"No order found for id {snapshot.order_id}")
+
+        agent = cls(memory, order, get_flow(snapshot.flow))
+        agent.restore(snapshot)
+        return agent
@@ -0,0 +1,89 @@
+"""
+Hospital Appointment Flow
+Runs on the same dialog engine as the delivery flow, using the
+states in state.py and the prompts in response.py.
+"""
+
+from last_mile_delivery import response
+from last_mile_delivery.availability import AVAILABILITY
+from last_mile_delivery.dialog import DialogAgent, Flow, Transition, register_flow
+from last_mile_delivery.intent import Intent
+from last_mile_delivery.state import ConversationState
+from last_mile_delivery.storage import generate_appointment_id, save_appointment
+
+S = ConversationState
+
+
+def _department(turn):
+    for department in AVAILABILITY:
+        if department.lower() in turn.text:
+            return department
+    return turn.text.title() if len(turn.text) >= 2 else None
+
+
+def _free_text(turn):
+    return turn.raw.strip() or None
+
+
+def _confirm(turn):
+    return response.confirm_details(
+        turn.context["department"], turn.context["date"], turn.context["time"]
+    )
+
+
+def _book(turn):
+    save_appointment({
+        "appointment_id": generate_appointment_id(),
+        "patient_name": turn.order.get("patient_name", ""),
+        "department": turn.context["department"],
+        "date": turn.context["date"],
+        "time": turn.context["time"],
+        "status": "CONFIRMED",
+    })
+
+
+APPOINTMENT_FLOW = register_flow(Flow(
+    "appointment",
+    initial=S.OPENING.value,
+    final=(S.CLOSE.value,),
+    states={
+        S.OPENING.value: [
+            Transition(lambda t: response.opening(), S.INTENT_SELECTION.value),
+        ],
+        S.INTENT_SELECTION.value: [
+            Transition(lambda t: response.ask_department(), S.COLLECT_DEPARTMENT.value,
+                       when=Intent.YES),
+            Transition(lambda t: response.close(), S.CLOSE.value, when=Intent.NO),
+            Transition(lambda t: response.confirm_purpose_retry()),
+        ],
+        S.COLLECT_DEPARTMENT.value: [
+            Transition(lambda t: response.ask_date(t.context["department"]),
+                       S.COLLECT_DATE.value, slot="department", extract=_department),
+            Transition(lambda t: response.ask_department()),
+        ],
+        S.COLLECT_DATE.value: [
+            Transition(lambda t: response.ask_time(), S.OFFER_SLOTS.value,
+                       slot="date", extract=_free_text),
+        ],
+        S.OFFER_SLOTS.value: [
+            Transition(_confirm, S.CONFIRM_DETAILS.value, slot="time", extract=_free_text),
+        ],
+        S.CONFIRM_DETAILS.value: [
+            Transition(lambda t: response.booking_success(), S.CLOSE.value,
+                       when=Intent.YES, action=_book),
+            Transition(lambda t: response.ask_department(), S.COLLECT_DEPARTMENT.value,
+                       when=Intent.NO),
+            Transition(_confirm),
+        ],
+        S.CLOSE.value: [
+            Transition(lambda t: response.close()),
+        ],
+    },
+))
+
+
+class AppointmentAgent(DialogAgent):
+    state_type = ConversationState
+
+    def __init__(self, memory, caller: dict | None = None):
+        super().__init__(memory, caller or {}, APPOINTMENT_FLOW)
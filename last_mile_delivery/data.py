@@ -1,7 +1,340 @@
+import atexit
 import csv
+import io
+import os
+import tempfile
+import threading
 from pathlib import Path
 
+from last_mile_delivery.journal import OrderJournal, FSYNC_ALWAYS
+from last_mile_delivery.sqlite_store import SQLiteOrderStore, import_csv
+
 DATA_FILE = Path(__file__).parent / "orders.csv"
+JOURNAL_FILE = DATA_FILE.with_suffix(".journal")
+
+# Storage engine: "csv" (snapshot + journal) or "sqlite"
+ORDER_STORE = os.getenv("ORDER_STORE", "csv")
+ORDER_DB = Path(os.getenv("ORDER_DB", DATA_FILE.with_suffix(".db")))
+
+# SQLite batching: commit every ORDER_DB_BATCH_SIZE updates, or once the
+# oldest queued one is ORDER_DB_FLUSH_MS old (1: commit each update)
+ORDER_DB_BATCH_SIZE = int(os.getenv("ORDER_DB_BATCH_SIZE", "1"))
+ORDER_DB_FLUSH_MS = float(os.getenv("ORDER_DB_FLUSH_MS", "500"))
+
+# Journal durability / compaction (see journal.py for policies)
+JOURNAL_FSYNC = os.getenv("ORDER_JOURNAL_FSYNC", FSYNC_ALWAYS)
+JOURNAL_COMPACT_EVERY = int(os.getenv("ORDER_JOURNAL_COMPACT_EVERY", "1000"))
+
+
+# --------------------------------------------------
+# ORDER REPOSITORY (INDEXED, IN-MEMORY)
+# --------------------------------------------------
+
+class OrderRepository:
+    """
+    Loads orders.csv once and serves lookups from hash indexes.
+
+    The file is re-checked (inode, mtime, size) before every access.
+    Rows appended to the file are parsed incrementally; any other
+    change triggers a full reload.
+
+    With a journal, status changes are appended to it instead of
+    rewriting the CSV. Reads see the snapshot with the journal
+    replayed on top, and every `compact_every` appends the journal
+    is folded back into the snapshot.
+    """
+
+    # Bytes before the last parsed offset used to confirm that
+    # the already-parsed prefix of the file is unchanged
+    TAIL_CHECK_BYTES = 64
+
+    def __init__(
+        self,
+        path: Path | str = DATA_FILE,
+        journal: OrderJournal | None = None,
+        compact_every: int = 0,
+    ):
+        self.path = Path(path)
+        self.journal = journal
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+
+        self._fieldnames: list[str] = []
+        self._orders: list[dict] = []
+        self._by_order_id: dict[str, dict] = {}
+        self._by_phone: dict[str, dict] = {}
+
+        self._signature = None
+        self._offset = 0
+        self._tail = b""
+
+        self._journal_offset = 0
+        self._journal_appends = 0
+        self._recovered = False
+
+    # --------------------------------------------------
+    # LOADING
+    # --------------------------------------------------
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _reset(self):
+        self._fieldnames = []
+        self._orders = []
+        self._by_order_id = {}
+        self._by_phone = {}
+        self._offset = 0
+        self._tail = b""
+        self._journal_offset = 0
+
+    def _index(self, order: dict):
+        existing = self._by_order_id.get(order["order_id"])
+        if existing is not None:
+            # Re-appended row for a known order replaces it in place
+            old_phone = existing.get("phone")
+            existing.clear()
+            existing.update(order)
+            order = existing
+            if old_phone != order.get("phone") and self._by_phone.get(old_phone) is order:
+                del self._by_phone[old_phone]
+        else:
+            self._orders.append(order)
+            self._by_order_id[order["order_id"]] = order
+
+        # First order wins for a phone, matching the old linear scan
+        self._by_phone.setdefault(order["phone"], order)
+
+    def _parse(self, data: bytes):
+        text = data.decode("utf-8")
+        if self._fieldnames:
+            reader = csv.DictReader(io.StringIO(text), fieldnames=self._fieldnames)
+        else:
+            reader = csv.DictReader(io.StringIO(text))
+
+        for row in reader:
+            self._index(row)
+
+        if not self._fieldnames and reader.fieldnames:
+            self._fieldnames = list(reader.fieldnames)
+
+    def _consume(self, f, start: int):
+        f.seek(start)
+        data = f.read()
+
+        # Only parse complete lines; a partially written row is
+        # picked up on the next refresh
+        end = data.rfind(b"\n") + 1
+        if end:
+            self._parse(data[:end])
+            self._offset = start + end
+            self._tail = self._read_tail(f)
+
+    def _read_tail(self, f) -> bytes:
+        start = max(0, self._offset - self.TAIL_CHECK_BYTES)
+        f.seek(start)
+        return f.read(self._offset - start)
+
+    def _prefix_unchanged(self, f) -> bool:
+        return bool(self._offset) and self._read_tail(f) == self._tail
+
+    def refresh(self, force: bool = False):
+        """
+        Reload the file if it changed on disk since the last load,
+        then replay any journal records not seen yet.
+        """
+        self._recover_journal()
+        with self._lock:
+            self._refresh_locked(force)
+
+    def _recover_journal(self):
+        # Replays after a crash must not trip over a torn record
+        if self.journal and not self._recovered:
+            self.journal.recover()
+            self._recovered = True
+
+    def _refresh_locked(self, force: bool):
+        signature = self._stat_signature()
+        journal_size = self.journal.size() if self.journal else 0
+
+        # A shrunken journal means another process compacted it
+        if journal_size < self._journal_offset:
+            force = True
+
+        if force or signature != self._signature:
+            self._load_snapshot(signature, force)
+
+        if self.journal and journal_size != self._journal_offset:
+            self._replay_journal()
+
+    def _load_snapshot(self, signature, force: bool):
+        if signature is None:
+            self._reset()
+            self._signature = None
+            return
+
+        # Appends keep the inode; rewrites (save, compaction) replace it
+        appended = (
+            not force
+            and self._signature is not None
+            and signature[0] == self._signature[0]
+            and signature[2] >= self._offset
+        )
+
+        with open(self.path, "rb") as f:
+            if appended and self._prefix_unchanged(f):
+                self._consume(f, self._offset)
+            else:
+                self._reset()
+                self._consume(f, 0)
+
+        self._signature = signature
+
+    def _replay_journal(self):
+        records, self._journal_offset = self.journal.read_from(
+            self._journal_offset
+        )
+        for order_id, changes in records:
+            order = self._by_order_id.get(order_id)
+            if order is not None:
+                order.update(changes)
+
+    # --------------------------------------------------
+    # READS
+    # --------------------------------------------------
+
+    def all(self) -> list[dict]:
+        self.refresh()
+        with self._lock:
+            return [dict(order) for order in self._orders]
+
+    def find_by_phone(self, phone: str) -> dict | None:
+        self.refresh()
+        with self._lock:
+            order = self._by_phone.get(phone)
+            return dict(order) if order else None
+
+    def find_by_order_id(self, order_id: str) -> dict | None:
+        self.refresh()
+        with self._lock:
+            order = self._by_order_id.get(order_id)
+            return dict(order) if order else None
+
+    # --------------------------------------------------
+    # WRITES
+    # --------------------------------------------------
+
+    def update(self, order_id: str, changes: dict) -> bool:
+        """
+        Apply field changes to one order and persist them.
+        Returns False if the order does not exist.
+        """
+        with self._lock:
+            self.refresh()
+            order = self._by_order_id.get(order_id)
+            if order is None:
+                return False
+
+            if self.journal is None:
+                order.update(changes)
+                self.save()
+                return True
+
+            # O(1) write; the record is replayed by other processes
+            # (and harmlessly again by us) on their next refresh
+            self.journal.append(order_id, changes)
+            order.update(changes)
+
+            self._journal_appends += 1
+            if self.compact_every and self._journal_appends >= self.compact_every:
+                self.compact()
+
+            return True
+
+    def compact(self):
+        """
+        Fold the journal into the snapshot and truncate it.
+        """
+        if self.journal is None:
+            return
+
+        self._recover_journal()
+        with self._lock, self.journal.locked(exclusive=True):
+            # No appends can land while we hold the exclusive lock,
+            # so everything read here ends up in the snapshot
+            self._refresh_locked(force=False)
+            self.save()
+            self.journal.truncate()
+            self._journal_offset = 0
+            self._journal_appends = 0
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def save(self):
+        with self._lock:
+            if not self._orders:
+                return
+
+            save_orders(self._orders, self.path, self._fieldnames or None)
+
+            # Our own write must not look like an external change
+            self._signature = self._stat_signature()
+            self._offset = self._signature[2] if self._signature else 0
+            with open(self.path, "rb") as f:
+                self._tail = self._read_tail(f)
+
+
+def create_repository(store: str = ORDER_STORE):
+    if store == "sqlite":
+        if not ORDER_DB.exists():
+            import_csv(DATA_FILE, ORDER_DB)
+        return SQLiteOrderStore(
+            ORDER_DB,
+            batch_size=ORDER_DB_BATCH_SIZE,
+            flush_interval=ORDER_DB_FLUSH_MS / 1000,
+        )
+
+    if store == "csv":
+        return OrderRepository(
+            DATA_FILE,
+            journal=OrderJournal(JOURNAL_FILE, fsync=JOURNAL_FSYNC),
+            compact_every=JOURNAL_COMPACT_EVERY,
+        )
+
+    raise ValueError(f"Unknown order store: {store}")
+
+
+_repository = create_repository()
+
+
+def get_repository() -> OrderRepository | SQLiteOrderStore:
+    return _repository
+
+
+def set_repository(repository: OrderRepository | SQLiteOrderStore) -> None:
+    """
+    Route the module-level functions to another store.
+    """
+    global _repository
+    _repository = repository
+
+
+def close_repository() -> None:
+    """
+    Flush pending writes and release the store's files.
+    """
+    _repository.close()
+
+
+# Queued SQLite batches must reach the database even if the
+# entrypoint forgets to close
+atexit.register(close_repository)
 
 
 # --------------------------------------------------
@@ -9,23 +342,44 @@ DATA_FILE = Path(__file__).parent / "orders.csv"
 # --------------------------------------------------
 
 def load_orders() -> list[dict]:
-    with open(DATA_FILE, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        return list(reader)
+    return _repository.all()
 
 
 # --------------------------------------------------
 # SAVE ORDERS
 # --------------------------------------------------
 
-def save_orders(orders: list[dict]) -> None:
+def save_orders(
+    orders: list[dict],
+    path: Path | str = DATA_FILE,
+    fieldnames: list[str] | None = None,
+) -> None:
     if not orders:
         return
 
-    with open(DATA_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=orders[0].keys())
-        writer.writeheader()
-        writer.writerows(orders)
+    # Write aside and rename, so readers never see a half-written file;
+    # the temp name is unique, so concurrent writers don't share it
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp",
+        delete=False, newline="", encoding="utf-8",
+    ) as f:
+        tmp_path = f.name
+        try:
+            writer = csv.DictWriter(f, fieldnames=fieldnames or orders[0].keys())
+            writer.writeheader()
+            writer.writerows(orders)
+            f.flush()
+            # Temp files are created 0600; keep the snapshot's mode
+            if path.exists():
+                os.chmod(tmp_path, path.stat().st_mode & 0o777)
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+
+    os.replace(tmp_path, path)
 
 
 # --------------------------------------------------
@@ -33,11 +387,7 @@ def save_orders(orders: list[dict]) -> None:
 # --------------------------------------------------
 
 def find_order_by_phone(phone: str) -> dict | None:
-    orders = load_orders()
-    for order in orders:
-        if order["phone"] == phone:
-            return order
-    return None
+    return _repository.find_by_phone(phone)
 
 
 # --------------------------------------------------
@@ -53,21 +403,24 @@ def get_order_by_phone(phone: str) -> dict | None:
 
 
 # --------------------------------------------------
-# SCHEDULE DELIVERY (CUSTOMER AVAILABLE)
+# FIND ORDER BY ID
 # --------------------------------------------------
 
-def mark_scheduled(order_id: str, scheduled_date: str):
-    orders = load_orders()
+def find_order_by_id(order_id: str) -> dict | None:
+    return _repository.find_by_order_id(order_id)
 
-    for order in orders:
-        if order["order_id"] == order_id:
-            order["status"] = "scheduled"
-            order["scheduled_date"] = scheduled_date
-            order["neighbor_name"] = ""
-            order["neighbor_phone"] = ""
-            break
 
-    save_orders(orders)
+# --------------------------------------------------
+# SCHEDULE DELIVERY (CUSTOMER AVAILABLE)
+# --------------------------------------------------
+
+def mark_scheduled(order_id: str, scheduled_date: str):
+    _repository.update(order_id, {
+        "status": "scheduled",
+        "scheduled_date": scheduled_date,
+        "neighbor_name": "",
+        "neighbor_phone": "",
+    })
 
 
 # --------------------------------------------------
@@ -80,17 +433,12 @@ def mark_neighbor_delivery(
     neighbor_name: str,
     neighbor_phone: str = "",
 ):
-    orders = load_orders()
-
-    for order in orders:
-        if order["order_id"] == order_id:
-            order["status"] = "scheduled"
-            order["scheduled_date"] = scheduled_date
-            order["neighbor_name"] = neighbor_name
-            order["neighbor_phone"] = neighbor_phone
-            break
-
-    save_orders(orders)
+    _repository.update(order_id, {
+        "status": "scheduled",
+        "scheduled_date": scheduled_date,
+        "neighbor_name": neighbor_name,
+        "neighbor_phone": neighbor_phone,
+    })
 
 
 # --------------------------------------------------
@@ -98,17 +446,12 @@ def mark_neighbor_delivery(
 # --------------------------------------------------
 
 def cancel_delivery(order_id: str):
-    orders = load_orders()
-
-    for order in orders:
-        if order["order_id"] == order_id:
-            order["status"] = "cancelled"
-            order["scheduled_date"] = ""
-            order["neighbor_name"] = ""
-            order["neighbor_phone"] = ""
-            break
-
-    save_orders(orders)
+    _repository.update(order_id, {
+        "status": "cancelled",
+        "scheduled_date": "",
+        "neighbor_name": "",
+        "neighbor_phone": "",
+    })
 
 
 # --------------------------------------------------
@@ -116,11 +459,4 @@ def cancel_delivery(order_id: str):
 # --------------------------------------------------
 
 def mark_failed(order_id: str):
-    orders = load_orders()
-
-    for order in orders:
-        if order["order_id"] == order_id:
-            order["status"] = "failed"
-            break
-
-    save_orders(orders)
+    _repository.update(order_id, {"status": "failed"})
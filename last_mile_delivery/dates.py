@@ -0,0 +1,280 @@
+"""
+Date Resolution
+---------------
+
+Maps what the customer says ("the 25th", "january twenty eighth",
+"tomorrow", "next Monday", "the first one", "not the 25th, the
+28th") onto one of the order's available dates.
+
+available_dates ("Jan 25", ...) are parsed once per order into real
+dates with lookup indexes by (month, day), day of month, weekday and
+calendar date. An utterance is tokenized and scanned once; every
+date mention adds to the score of the options it points at, and the
+options are returned ranked.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+
+WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1,
+    "wednesday": 2, "wed": 2, "thursday": 3, "thu": 3, "thurs": 3,
+    "friday": 4, "fri": 4, "saturday": 5, "sat": 5, "sunday": 6, "sun": 6,
+}
+
+CARDINALS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "thirty": 30,
+}
+
+ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+    "eleventh": 11, "twelfth": 12, "thirteenth": 13, "fourteenth": 14,
+    "fifteenth": 15, "sixteenth": 16, "seventeenth": 17,
+    "eighteenth": 18, "nineteenth": 19, "twentieth": 20, "thirtieth": 30,
+}
+
+# "the first one", "the last option", "the earliest"
+POSITIONS = {"first": 0, "second": 1, "third": 2, "last": -1, "earliest": 0, "latest": -1}
+POSITION_NOUNS = {"one", "option", "date", "day", "slot"}
+
+RELATIVE_DAYS = {"today": 0, "tomorrow": 1}
+NEGATORS = {"not", "except"}
+# A mention after one of these replaces the earlier ones; without
+# them two different dates ("the 30th or 28th") are ambiguous
+CORRECTIONS = {"actually", "instead", "rather", "wait", "sorry", "no"}
+
+# Scores per kind of mention
+EXACT = 3.0       # month + day, or a relative date that is available
+DAY = 2.0         # day of month only
+POSITION = 2.0
+WEEKDAY = 1.0
+
+_TOKEN = re.compile(r"[a-z]+|\d+")
+_ORDINAL_SUFFIXES = {"st", "nd", "rd", "th"}
+
+
+def parse_date(label: str, today: date) -> date | None:
+    """
+    "Jan 25" -> the Jan 25 closest to `today`.
+    """
+    try:
+        parsed = datetime.strptime(label.strip(), "%b %d")
+    except ValueError:
+        return None
+
+    candidates = []
+    for year in (today.year - 1, today.year, today.year + 1):
+        try:
+            candidates.append(parsed.replace(year=year).date())
+        except ValueError:  # Feb 29
+            continue
+    return min(candidates, key=lambda d: abs(d - today), default=None)
+
+
+def _tokens(text: str) -> list[tuple[str, object]]:
+    """
+    Words -> ("num", n, spoken word) | ("month", m) | ("weekday", w)
+    | ("word", w). Number words are folded ("twenty fifth" -> 25).
+    """
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _ORDINAL_SUFFIXES]
+    items = []
+
+    i = 0
+    while i < len(words):
+        word = words[i]
+
+        if word.isdigit():
+            items.append(("num", int(word), word))
+        elif word in CARDINALS or word in ORDINALS:
+            value = CARDINALS.get(word) or ORDINALS[word]
+            nxt = words[i + 1] if i + 1 < len(words) else ""
+            if word in ("twenty", "thirty") and (nxt in CARDINALS or nxt in ORDINALS):
+                extra = CARDINALS.get(nxt) or ORDINALS[nxt]
+                if extra < 10:
+                    value += extra
+                    i += 1
+            items.append(("num", value, word))
+        elif word in MONTHS:
+            items.append(("month", MONTHS[word]))
+        elif word in WEEKDAYS:
+            items.append(("weekday", WEEKDAYS[word]))
+        else:
+            items.append(("word", word))
+        i += 1
+
+    return items
+
+
+class DateResolver:
+    def __init__(self, available_dates: list[str], today: date | None = None):
+        self.today = today or date.today()
+        self.labels = list(available_dates)
+
+        self.by_month_day: dict[tuple[int, int], str] = {}
+        self.by_day: dict[int, list[str]] = {}
+        self.by_weekday: dict[int, list[str]] = {}
+        self.by_date: dict[date, str] = {}
+        self.dates: dict[str, date] = {}
+
+        for label in self.labels:
+            parsed = parse_date(label, self.today)
+            if parsed is None:
+                continue
+            self.dates[label] = parsed
+            self.by_month_day[(parsed.month, parsed.day)] = label
+            self.by_day.setdefault(parsed.day, []).append(label)
+            self.by_weekday.setdefault(parsed.weekday(), []).append(label)
+            self.by_date[parsed] = label
+
+        # Positional references follow calendar order
+        self.ordered = sorted(self.dates, key=self.dates.get)
+
+    # --------------------------------------------------
+
+    def candidates(self, text: str) -> list[tuple[str, float]]:
+        """
+        Available dates mentioned in `text`, best first.
+        """
+        scores: dict[str, float] = {}
+        items = _tokens(text)
+
+        def add(labels, score: float, at: int):
+            negated = any(
+                item[0] == "word" and item[1] in NEGATORS
+                for item in items[max(0, at - 3):at]
+            )
+            # Corrections win ties ("the 25th... actually the 28th")
+            if any(item == ("word", w) for item in items[:at] for w in CORRECTIONS):
+                score += at * 0.01
+            for label in labels:
+                scores[label] = scores.get(label, 0.0) + (-score if negated else score)
+
+        i = 0
+        while i < len(items):
+            kind = items[i][0]
+            nxt = items[i + 1] if i + 1 < len(items) else ("",)
+            after = items[i + 2] if i + 2 < len(items) else ("",)
+
+            if kind == "month" and nxt[0] == "num":
+                label = self.by_month_day.get((items[i][1], nxt[1]))
+                add([label] if label else [], EXACT, i)
+                i += 2
+                continue
+
+            if kind == "num":
+                value, word = items[i][1], items[i][2]
+
+                # "25 jan", "25th of january"
+                month = None
+                if nxt[0] == "month":
+                    month, skip = nxt[1], 2
+                elif nxt[:2] == ("word", "of") and after[0] == "month":
+                    month, skip = after[1], 3
+
+                if month is not None:
+                    label = self.by_month_day.get((month, value))
+                    add([label] if label else [], EXACT, i)
+                    i += skip
+                    continue
+
+                # "the second one": nxt[-1] is the word as spoken
+                noun = nxt[-1] in POSITION_NOUNS
+                if word in POSITIONS and (noun or value not in self.by_day):
+                    add(self._position(POSITIONS[word]), POSITION, i)
+                    i += 2 if noun else 1
+                    continue
+                if 1 <= value <= 31:
+                    add(self.by_day.get(value, []), DAY, i)
+                i += 1
+                continue
+
+            if kind == "weekday":
+                following = i > 0 and items[i - 1] == ("word", "next")
+                for label, score in self._weekday(items[i][1], following):
+                    add([label], score, i)
+                i += 1
+                continue
+
+            if kind == "word":
+                word = items[i][1]
+                if word in ("last", "earliest", "latest") and (
+                    word != "last" or nxt[0] != "weekday"
+                ):
+                    add(self._position(POSITIONS[word]), POSITION, i)
+                    if nxt[-1] in POSITION_NOUNS:
+                        i += 1
+                elif word in RELATIVE_DAYS:
+                    offset = RELATIVE_DAYS[word]
+                    # "day after tomorrow"
+                    if (
+                        word == "tomorrow"
+                        and i >= 2
+                        and items[i - 1] == ("word", "after")
+                        and items[i - 2] == ("word", "day")
+                    ):
+                        offset = 2
+                    label = self.by_date.get(self.today + timedelta(days=offset))
+                    add([label] if label else [], EXACT, i)
+
+            i += 1
+
+        ranked = [(label, score) for label, score in scores.items() if score > 0]
+        ranked.sort(key=lambda item: (-item[1], self.dates[item[0]]))
+        return ranked
+
+    def resolve(self, text: str) -> str | None:
+        """
+        The single best available date, or None if nothing (or
+        nothing unambiguous) was said.
+        """
+        ranked = self.candidates(text)
+        if not ranked:
+            return None
+        if len(ranked) > 1 and ranked[1][1] >= ranked[0][1]:
+            return None
+        return ranked[0][0]
+
+    # --------------------------------------------------
+
+    def _position(self, index: int) -> list[str]:
+        if not self.ordered or index >= len(self.ordered):
+            return []
+        return [self.ordered[index]]
+
+    def _weekday(self, weekday: int, following: bool) -> list[tuple[str, float]]:
+        """
+        "Monday" is the coming Monday, "next Monday" the one after.
+        Other available dates on that weekday rank lower.
+        """
+        ahead = (weekday - self.today.weekday()) % 7 or 7
+        target = self.today + timedelta(days=ahead + (7 if following else 0))
+
+        ranked = []
+        for n, label in enumerate(sorted(self.by_weekday.get(weekday, []), key=self.dates.get)):
+            if self.dates[label] == target:
+                ranked.append((label, EXACT))
+            else:
+                ranked.append((label, WEEKDAY - n * 0.1))
+        return ranked
+
+
+@lru_cache(maxsize=1024)
+def get_resolver(available_dates: tuple[str, ...], today: date) -> DateResolver:
+    """
+    One resolver per distinct set of dates (per order, in practice).
+    """
+    return DateResolver(list(available_dates), today)
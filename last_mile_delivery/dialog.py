@@ -0,0 +1,340 @@
+"""
+Dialog Engine
+-------------
+
+Conversation flows as data instead of if/elif chains.
+
+A Flow is a set of states, each with an ordered list of Transitions.
+A transition has an optional guard (an Intent, or any predicate on
+the turn), an optional slot extractor, a response (a str.format
+template over the order + conversation context, or a callable), a
+target state and an optional side-effect hook. The first transition
+whose guard passes (and whose extractor finds a value) wins.
+
+Flows are compiled once into a dispatch table (state -> transitions),
+so a turn costs one dict lookup plus the guards of the current state.
+validate() reports unknown targets and unreachable / dead-end states.
+
+    flow = Flow("delivery", initial="opening", states={...})
+    engine = DialogEngine(flow, order)
+    reply = engine.handle("yes that's me")
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from last_mile_delivery.intent import Intent, IntentResult, classify
+from last_mile_delivery.session import SessionError, SessionSnapshot
+
+
+# --------------------------------------------------
+# DEFINITIONS
+# --------------------------------------------------
+
+class Turn:
+    """
+    One customer utterance. Intents are classified lazily, once.
+    """
+
+    __slots__ = ("raw", "text", "order", "context", "_intents")
+
+    def __init__(self, raw: str, order: dict, context: dict, intents: IntentResult | None = None):
+        self.raw = raw
+        self.text = raw.lower().strip()
+        self.order = order
+        self.context = context
+        self._intents = intents
+
+    @property
+    def intents(self) -> IntentResult:
+        if self._intents is None:
+            self._intents = classify(self.text)
+        return self._intents
+
+
+@dataclass(frozen=True)
+class Transition:
+    respond: str | Callable[[Turn], str]
+    target: str | None = None                    # None: stay in the state
+    when: Intent | Callable[[Turn], bool] | None = None
+    slot: str | None = None                      # context key for `extract`
+    extract: Callable[[Turn], Any] | None = None
+    action: Callable[[Turn], None] | None = None
+
+    def matches(self, turn: Turn) -> bool:
+        if self.when is None:
+            return True
+        if isinstance(self.when, Intent):
+            if self.when in (Intent.YES, Intent.NO, Intent.UNCERTAIN):
+                return turn.intents.polarity is self.when
+            return self.when in turn.intents
+        return bool(self.when(turn))
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """
+    What a turn would do, computed without side effects.
+    """
+    state: str
+    target: str
+    response: str
+    transition: Transition | None
+    captured: dict = field(default_factory=dict)
+
+    @property
+    def understood(self) -> bool:
+        """
+        A guarded transition (intent or slot) matched, not a catch-all.
+        """
+        t = self.transition
+        return t is not None and (t.when is not None or t.extract is not None)
+
+
+class FlowError(ValueError):
+    pass
+
+
+class Flow:
+    def __init__(
+        self,
+        name: str,
+        initial: str,
+        states: dict[str, list[Transition]],
+        final: tuple[str, ...] = ("close",),
+        fallback: str = "Sorry, I didn’t catch that.",
+        fields: Callable[[dict, dict], dict] | None = None,
+    ):
+        """
+        fields   extra template values computed from (order, context)
+        """
+        self.name = name
+        self.initial = initial
+        self.final = frozenset(final)
+        self.fallback = fallback
+        self.fields = fields
+
+        # Dispatch table; tuples so a compiled flow cannot drift
+        self.table: dict[str, tuple[Transition, ...]] = {
+            state: tuple(transitions) for state, transitions in states.items()
+        }
+
+        problems = self.validate(reachability=False)
+        if problems:
+            raise FlowError(f"{name}: " + "; ".join(problems))
+
+    @property
+    def states(self) -> list[str]:
+        return list(self.table)
+
+    def validate(self, reachability: bool = True) -> list[str]:
+        """
+        Problems with the flow definition (empty list if none).
+        """
+        problems = []
+        if self.initial not in self.table:
+            problems.append(f"initial state '{self.initial}' is not defined")
+
+        for state, transitions in self.table.items():
+            for t in transitions:
+                if t.target is not None and t.target not in self.table:
+                    problems.append(f"'{state}' -> unknown state '{t.target}'")
+                if t.extract is not None and t.slot is None:
+                    problems.append(f"'{state}': extract without a slot")
+
+        if not reachability or problems:
+            return problems
+
+        reachable = self.reachable()
+        for state in self.table:
+            if state not in reachable:
+                problems.append(f"'{state}' is unreachable from '{self.initial}'")
+
+        for state in reachable - self.final:
+            targets = {t.target for t in self.table[state]} - {None, state}
+            if not targets:
+                problems.append(f"'{state}' is a dead end")
+
+        return problems
+
+    def reachable(self) -> set[str]:
+        seen = {self.initial}
+        pending = [self.initial]
+        while pending:
+            for t in self.table.get(pending.pop(), ()):
+                if t.target is not None and t.target not in seen:
+                    seen.add(t.target)
+                    pending.append(t.target)
+        return seen
+
+    # --------------------------------------------------
+
+    def resolve(self, state: str, turn: Turn) -> Resolution:
+        for transition in self.table[state]:
+            if not transition.matches(turn):
+                continue
+
+            captured = {}
+            if transition.extract is not None:
+                value = transition.extract(turn)
+                if not value:
+                    continue
+                captured[transition.slot] = value
+
+            target = transition.target or state
+            context = {**turn.context, **captured}
+            return Resolution(
+                state, target, self._render(transition.respond, turn, context),
+                transition, captured,
+            )
+
+        return Resolution(state, state, self.fallback, None)
+
+    def _render(self, respond, turn: Turn, context: dict) -> str:
+        if callable(respond):
+            return respond(Turn(turn.raw, turn.order, context, turn._intents))
+
+        values = {**turn.order, **context}
+        if self.fields is not None:
+            values.update(self.fields(turn.order, context))
+        return respond.format(**values)
+
+
+# --------------------------------------------------
+# RUNTIME
+# --------------------------------------------------
+
+class DialogEngine:
+    """
+    One conversation running through a Flow.
+    """
+
+    def __init__(self, flow: Flow, order: dict, context: dict | None = None):
+        self.flow = flow
+        self.order = order
+        self.context = context if context is not None else {}
+        self.state = flow.initial
+
+    @property
+    def finished(self) -> bool:
+        return self.state in self.flow.final
+
+    def preview(self, text: str, intents: IntentResult | None = None) -> Resolution:
+        """
+        Reply and next state for `text`, without changing anything.
+        """
+        return self.flow.resolve(
+            self.state, Turn(text, self.order, dict(self.context), intents)
+        )
+
+    def handle(self, text: str, intents: IntentResult | None = None) -> str:
+        """
+        `intents` overrides the rule classification (e.g. from the
+        hybrid LLM classifier in intent_llm.py).
+        """
+        turn = Turn(text, self.order, self.context, intents)
+        resolution = self.flow.resolve(self.state, turn)
+
+        self.context.update(resolution.captured)
+        if resolution.transition is not None and resolution.transition.action:
+            resolution.transition.action(turn)
+
+        self.state = resolution.target
+        return resolution.response
+
+
+class DialogAgent:
+    """
+    A flow plus conversation memory, with the handle_input / start
+    API the voice loop expects. `state_type` maps state names to an
+    Enum (state names are its values).
+    """
+
+    state_type = None
+
+    def __init__(self, memory, order: dict, flow: Flow, state_type=None):
+        self.memory = memory
+        self.order = order
+        self.engine = DialogEngine(flow, order)
+        if state_type is not None:
+            self.state_type = state_type
+
+    @property
+    def state(self):
+        if self.state_type is None:
+            return self.engine.state
+        return self.state_type(self.engine.state)
+
+    @state.setter
+    def state(self, state):
+        self.engine.state = getattr(state, "value", state)
+
+    @property
+    def context(self) -> dict:
+        return self.engine.context
+
+    # --------------------------------------------------
+    # SNAPSHOT / RESTORE (see session.py)
+    # --------------------------------------------------
+
+    def snapshot(self) -> SessionSnapshot:
+        return SessionSnapshot(
+            flow=self.engine.flow.name,
+            state=self.engine.state,
+            order_id=str(self.order.get("order_id", "")),
+            context=dict(self.engine.context),
+            turns=[(m["role"], m["text"]) for m in self.memory.get_conversation()],
+        )
+
+    def restore(self, snapshot: SessionSnapshot):
+        """
+        Continue a saved call. The memory's current session is
+        expected to be empty.
+        """
+        if snapshot.flow != self.engine.flow.name:
+            raise SessionError(
+                f"Snapshot is for flow '{snapshot.flow}', not '{self.engine.flow.name}'"
+            )
+        if snapshot.state not in self.engine.flow.table:
+            raise SessionError(f"Unknown state '{snapshot.state}'")
+
+        self.engine.state = snapshot.state
+        self.engine.context.clear()
+        self.engine.context.update(snapshot.context)
+        for role, text in snapshot.turns:
+            self.memory.add_message(role, text)
+
+    # --------------------------------------------------
+
+    def start(self) -> str:
+        """
+        Opening line, before the other party speaks.
+        """
+        response = self.engine.handle("")
+        self.memory.add_message("agent", response)
+        return response
+
+    def handle_input(self, user_text: str, intents: IntentResult | None = None) -> str:
+        self.memory.add_message("user", user_text)
+        response = self.engine.handle(user_text, intents)
+        self.memory.add_message("agent", response)
+        return response
+
+
+# --------------------------------------------------
+# REGISTRY
+# --------------------------------------------------
+
+_flows: dict[str, Flow] = {}
+
+
+def register_flow(flow: Flow) -> Flow:
+    _flows[flow.name] = flow
+    return flow
+
+
+def get_flow(name: str) -> Flow:
+    try:
+        return _flows[name]
+    except KeyError:
+        raise FlowError(f"Unknown flow '{name}'") from None
@@ -0,0 +1,237 @@
+"""
+Call Export
+-----------
+
+Finished-call records (transcript, state path, outcome, turn timings)
+for downstream analytics, written in batches off the call path.
+
+    exporter = CallExporter(JSONLWriter("exports"))
+    exporter.submit(record)        # never blocks on disk
+    ...
+    exporter.close()               # writes whatever is left
+
+submit() only appends to an in-memory batch. A background thread
+writes a batch once `batch_size` records are waiting, or every
+`flush_interval` seconds, whichever comes first.
+
+Writers:
+  JSONLWriter      one JSON object per line, rotated by size
+  ColumnarWriter   one file per batch: Parquet if pyarrow is
+                   installed, else column-oriented JSON
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+
+@dataclass
+class CallRecord:
+    call_id: str
+    order_id: str
+    flow: str
+    outcome: str                 # completed / no_response / aborted / error / dropped
+    final_state: str
+    state_path: list[str] = field(default_factory=list)
+    turns: list[tuple[str, str]] = field(default_factory=list)
+    turn_latencies: list[float] = field(default_factory=list)
+    barge_ins: int = 0
+    started: float = 0.0         # unix time
+    duration: float = 0.0        # seconds
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+COLUMNS = tuple(f.name for f in fields(CallRecord))
+
+
+def _batch_name(prefix: str, seq: int, suffix: str) -> str:
+    return f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{seq:05d}{suffix}"
+
+
+# --------------------------------------------------
+# WRITERS
+# --------------------------------------------------
+
+class JSONLWriter:
+    """
+    Appends batches to the current file; starts a new one once it
+    reaches `max_bytes`.
+    """
+
+    def __init__(self, directory: Path | str, prefix: str = "calls", max_bytes: int = 64 << 20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+
+        self.path: Path | None = None
+        self._size = 0
+        self._seq = 0
+
+    def _rotate(self):
+        self._seq += 1
+        self.path = self.directory / _batch_name(self.prefix, self._seq, ".jsonl")
+        self._size = 0
+
+    def write(self, records: list[CallRecord]):
+        data = "".join(
+            json.dumps(r.to_dict(), ensure_ascii=False) + "\n" for r in records
+        ).encode("utf-8")
+
+        if self.path is None or self._size >= self.max_bytes:
+            self._rotate()
+
+        # One write per batch
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self._size += len(data)
+
+
+class ColumnarWriter:
+    """
+    One file per batch, one column per CallRecord field.
+    """
+
+    def __init__(self, directory: Path | str, prefix: str = "calls", parquet: bool | None = None):
+        if parquet and pyarrow is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.parquet = pyarrow is not None if parquet is None else parquet
+        self._seq = 0
+
+    @staticmethod
+    def columns(records: list[CallRecord]) -> dict[str, list]:
+        return {name: [getattr(r, name) for r in records] for name in COLUMNS}
+
+    def write(self, records: list[CallRecord]):
+        self._seq += 1
+        columns = self.columns(records)
+
+        if self.parquet:
+            path = self.directory / _batch_name(self.prefix, self._seq, ".parquet")
+            pyarrow.parquet.write_table(pyarrow.table(columns), path)
+            return
+
+        # Write aside and rename, so readers never see a partial batch
+        path = self.directory / _batch_name(self.prefix, self._seq, ".columns.json")
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"rows": len(records), "columns": columns}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+
+# --------------------------------------------------
+# BATCHING
+# --------------------------------------------------
+
+class CallExporter:
+    def __init__(
+        self,
+        writer,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_pending: int = 10000,
+    ):
+        """
+        max_pending   records kept while the writer falls behind;
+                      beyond that new records are dropped (and counted)
+        """
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.exported = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._pending: list[CallRecord] = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="call-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: CallRecord):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Exporter is closed")
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _take(self) -> list[CallRecord]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                batch = self._take()
+                closed = self._closed
+
+            self._write(batch)
+            if closed:
+                return
+
+    def _write(self, batch: list[CallRecord]):
+        if not batch:
+            return
+        with self._write_lock:
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start:start + self.batch_size]
+                try:
+                    self.writer.write(chunk)
+                except Exception as e:
+                    self.failed += len(chunk)
+                    print(f"⚠️ Call export failed ({len(chunk)} records): {e}")
+                    continue
+                self.exported += len(chunk)
+                self.batches += 1
+
+    def flush(self):
+        """
+        Write everything submitted so far, in the calling thread.
+        """
+        with self._cond:
+            batch = self._take()
+        self._write(batch)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,5 +1,197 @@
+"""
+Intent Detection
+----------------
+
+Every phrase of every intent is compiled once into a table keyed by
+first word. classify() tokenizes the utterance, scans it in a
+single pass and returns all intents it heard plus the overall
+polarity (the last YES / NO / UNCERTAIN phrase wins: "okay, not
+really" is NO).
+
+Negation: a negator ("not", "don't", "never", ...) followed within
+two words by a YES phrase flips it to NO ("not okay", "don't think
+so"), and by an UNAVAILABLE phrase flips it to YES ("I am not
+busy"); the negator then counts only through the phrase it negates.
+Longer phrases win over their parts, so "no problem" is YES and
+"not available" is UNAVAILABLE rather than a bare "not".
+
+Apostrophes are ignored on both sides, so "dont mind" from STT
+matches "don't mind".
+"""
+
 import re
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+
+from last_mile_delivery.dates import get_resolver
+
+
+class Intent(Enum):
+    YES = "yes"
+    NO = "no"
+    UNAVAILABLE = "unavailable"
+    UNCERTAIN = "uncertain"
+
+
+# --------------------------------------------------
+# PHRASE TABLES (per language)
+# --------------------------------------------------
+
+PHRASES = {
+    "en": {
+        Intent.YES: (
+            "yes", "yeah", "yep", "yup", "ok", "okay", "sure", "fine",
+            "correct", "right", "alright", "of course", "go ahead",
+            "that works", "sounds good", "no problem", "not a problem", "why not",
+            "don't mind", "do not mind", "please do",
+        ),
+        Intent.NO: (
+            "no", "nope", "nah", "not", "don't", "dont", "do not",
+            "won't", "wont", "cannot", "can't", "cant", "never",
+            "wrong number",
+        ),
+        Intent.UNAVAILABLE: (
+            "not available", "not free", "cannot receive", "can't receive",
+            "won't be available", "will not be available", "won't be home",
+            "none of these", "none of them", "no dates work", "busy",
+            "out of town", "not possible", "not home", "away that day",
+            "be away", "going away",
+        ),
+        Intent.UNCERTAIN: (
+            "maybe", "perhaps", "not sure", "don't know", "dont know",
+            "do not know", "no idea", "let me check", "let me think",
+        ),
+    },
+}
+
+NEGATORS = {
+    "en": ("not", "don't", "dont", "do not", "never", "can't", "cannot", "won't", "wont"),
+}
+
+# Intents that set the answer's polarity; UNAVAILABLE is a refusal
+_POLARITY = {
+    Intent.YES: Intent.YES,
+    Intent.NO: Intent.NO,
+    Intent.UNCERTAIN: Intent.UNCERTAIN,
+    Intent.UNAVAILABLE: Intent.NO,
+}
+
+# Words and punctuation marks; punctuation never matches a phrase
+_TOKEN = re.compile(r"[\w']+|[.,;:!?]")
+_PUNCTUATION = frozenset(".,;:!?")
+
+# Between a negator and the phrase it negates: at most two words,
+# no punctuation
+_NEGATION_SCOPE = 2
+
+# What a negated phrase means instead
+_NEGATED = {
+    Intent.YES: Intent.NO,
+    Intent.UNAVAILABLE: Intent.YES,
+}
+
+
+def _normalize(text: str) -> str:
+    # STT drops apostrophes as often as not ("dont mind"): match
+    # phrases and utterances without them
+    return text.lower().replace("\u2019", "").replace("'", "")
+
+
+@dataclass(frozen=True)
+class IntentResult:
+    intents: frozenset
+    polarity: Intent | None = None
+
+    def __contains__(self, intent: Intent) -> bool:
+        return intent in self.intents
+
+
+class IntentMatcher:
+    """
+    Token-level phrase matcher. Phrases are indexed by their first
+    word, so the cost per token does not grow with the phrase table.
+    """
+
+    def __init__(self, phrases: dict, negators=()):
+        self.intent_of: dict[tuple, Intent] = {}
+        for intent, words in phrases.items():
+            for phrase in words:
+                self.intent_of[tuple(_normalize(phrase).split())] = intent
+        self.negators = frozenset(tuple(_normalize(n).split()) for n in negators)
+
+        # first word -> candidate phrases, longest first, so a phrase
+        # beats any phrase it starts with
+        self.by_first_word: dict[str, list[tuple]] = {}
+        for phrase in set(self.intent_of) | self.negators:
+            self.by_first_word.setdefault(phrase[0], []).append(phrase)
+        for candidates in self.by_first_word.values():
+            candidates.sort(key=len, reverse=True)
+
+    def classify(self, text: str) -> IntentResult:
+        words = _TOKEN.findall(_normalize(text))
+        if not words:
+            return _NOTHING
+
+        intents = set()
+        polarity = None
+        negation_end = -1    # token index right after the last negator
+        negator_open = False # that negator has not negated a phrase yet
+
+        i = 0
+        while i < len(words):
+            for phrase in self.by_first_word.get(words[i], ()):
+                if tuple(words[i:i + len(phrase)]) == phrase:
+                    break
+            else:
+                i += 1
+                continue
+
+            intent = self.intent_of.get(phrase)
+            if negator_open:
+                if (
+                    intent in _NEGATED
+                    and i - negation_end <= _NEGATION_SCOPE
+                    and _PUNCTUATION.isdisjoint(words[negation_end:i])
+                ):
+                    intent = _NEGATED[intent]
+                else:
+                    # Negated nothing: it stands as a NO of its own
+                    intents.add(Intent.NO)
+                negator_open = False
+
+            i += len(phrase)
+            if phrase in self.negators:
+                negation_end = i
+                negator_open = True
+                polarity = Intent.NO
+                continue
+
+            intents.add(intent)
+            polarity = _POLARITY[intent]
+
+        if negator_open:
+            intents.add(Intent.NO)
+
+        return IntentResult(frozenset(intents), polarity)
+
+
+_NOTHING = IntentResult(frozenset())
+
+
+_matchers: dict[str, IntentMatcher] = {}
+
+
+def get_matcher(language: str = "en") -> IntentMatcher:
+    matcher = _matchers.get(language)
+    if matcher is None:
+        matcher = IntentMatcher(PHRASES[language], NEGATORS.get(language, ()))
+        _matchers[language] = matcher
+    return matcher
+
+
+def classify(text: str, language: str = "en") -> IntentResult:
+    return get_matcher(language).classify(text)
 
 
 # --------------------------------------------------
@@ -7,35 +199,11 @@ from datetime import datetime
 # --------------------------------------------------
 
 def is_yes(text: str) -> bool:
-    text = text.lower()
-    return any(
-        k in text for k in [
-            "yes",
-            "yeah",
-            "yep",
-            "ok",
-            "okay",
-            "sure",
-            "fine",
-            "correct",
-        ]
-    )
+    return classify(text).polarity is Intent.YES
 
 
 def is_no(text: str) -> bool:
-    text = text.lower()
-    return any(
-        k in text for k in [
-            "no",
-            "nope",
-            "not",
-            "don't",
-            "do not",
-            "won't",
-            "cannot",
-            "can't",
-        ]
-    )
+    return classify(text).polarity is Intent.NO
 
 
 # --------------------------------------------------
@@ -46,20 +214,7 @@ def is_unavailable(text: str) -> bool:
     """
     Detects user saying they are NOT available on any date
     """
-    text = text.lower()
-    phrases = [
-        "not available",
-        "not free",
-        "cannot receive",
-        "can't receive",
-        "won't be available",
-        "none of these",
-        "no dates work",
-        "busy",
-        "out of town",
-        "not possible",
-    ]
-    return any(p in text for p in phrases)
+    return Intent.UNAVAILABLE in classify(text)
 
 
 # --------------------------------------------------
@@ -68,22 +223,9 @@ def is_unavailable(text: str) -> bool:
 
 def extract_date(text: str, available_dates: list[str]) -> str | None:
     """
-    Match spoken date with available dates
+    Match spoken date with available dates (see dates.py)
     """
-    text = text.lower()
-
-    for date in available_dates:
-        if date.lower() in text:
-            return date
-
-    # Try loose matching like "25th", "25"
-    numbers = re.findall(r"\d{1,2}", text)
-    for num in numbers:
-        for date in available_dates:
-            if num in date:
-                return date
-
-    return None
+    return get_resolver(tuple(available_dates), date.today()).resolve(text)
 
 
 def extract_person_name(text: str) -> str:
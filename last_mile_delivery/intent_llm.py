@@ -0,0 +1,266 @@
+"""
+Hybrid Intent Classification
+----------------------------
+
+The phrase matcher in intent.py answers almost every turn in
+microseconds. Only utterances it cannot settle go to an LLM:
+
+  - nothing recognised, and the flow found no slot in it either
+    ("I'll be at my cousin's wedding", but not "the 28th")
+  - both a yes and a no ("yes, no wait, not that day")
+
+LLM answers are cached by normalized text (TTL), identical questions
+in flight from concurrent calls share one request, and every lookup
+has a hard latency budget: past it, the rule result is used and the
+request is left to finish (and fill the cache) in the background.
+
+With `scheduler` options, lookups from concurrent calls go through an
+LLMScheduler (llm/scheduler.py): those arriving within a few ms are
+asked in one numbered-list request (BATCH_PROMPT), under a rate limit,
+callers mid-conversation first.
+
+    hybrid = HybridIntentClassifier(LLMIntentClassifier(ChatClient(key)))
+    result = await hybrid.classify("I'll be at my cousin's wedding")
+
+One classifier (and so one cache and one scheduler) is meant to be
+shared by every call of a process; await aclose() when they are done.
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import OrderedDict
+
+from last_mile_delivery.intent import _POLARITY, Intent, IntentResult, classify
+from llm.errors import LLMError
+from llm.scheduler import PRIORITY_ACTIVE, LLMScheduler
+
+SYSTEM_PROMPT = (
+    "You classify a customer's reply on a parcel redelivery phone call.\n"
+    "Answer with JSON only, like {\"intent\": \"yes\"}.\n"
+    "Intents:\n"
+    "  yes          agrees / confirms\n"
+    "  no           declines / denies\n"
+    "  unavailable  cannot receive the parcel on any offered date\n"
+    "  uncertain    unsure, needs time\n"
+    "  unknown      none of the above"
+)
+
+BATCH_PROMPT = (
+    "You classify customer replies on parcel redelivery phone calls.\n"
+    "You get numbered replies, one per line. Answer with a JSON list of\n"
+    "intents only, one per reply in the same order, like [\"yes\", \"no\"].\n"
+    "Intents:\n"
+    "  yes          agrees / confirms\n"
+    "  no           declines / denies\n"
+    "  unavailable  cannot receive the parcel on any offered date\n"
+    "  uncertain    unsure, needs time\n"
+    "  unknown      none of the above"
+)
+
+_WORDS = re.compile(r"[\w']+")
+
+
+def normalize(text: str) -> str:
+    """
+    Cache key: lower case words only ("Yes, sure!" == "yes sure").
+    """
+    return " ".join(_WORDS.findall(text.lower().replace("’", "'")))
+
+
+def is_ambiguous(result: IntentResult, understood: bool = False) -> bool:
+    """
+    understood   the dialog flow already matched a guarded
+                 transition with the rule result (Resolution.understood)
+    """
+    polarities = {_POLARITY[intent] for intent in result.intents}
+    if {Intent.YES, Intent.NO} <= polarities:
+        return True
+    return result.polarity is None and not understood
+
+
+def parse_intent(reply: str) -> Intent | None:
+    """
+    Intent from the model's reply; None for "unknown" or junk.
+    """
+    match = re.search(r"\{.*?\}", reply, re.S)
+    try:
+        label = json.loads(match.group(0))["intent"] if match else reply
+    except (ValueError, KeyError, TypeError):
+        label = reply
+    label = str(label).strip().strip("\"'.").lower()
+    try:
+        return Intent(label)
+    except ValueError:
+        return None
+
+
+def parse_intents(reply: str, count: int) -> list[Intent | None]:
+    """
+    Intents from a BATCH_PROMPT reply, one per numbered question.
+    """
+    match = re.search(r"\[.*\]", reply, re.S)
+    try:
+        labels = json.loads(match.group(0)) if match else None
+    except ValueError:
+        labels = None
+    if not isinstance(labels, list) or len(labels) != count:
+        raise LLMError(f"Expected a JSON list of {count} intents, got: {reply[:80]!r}")
+    return [parse_intent(str(label)) for label in labels]
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: str, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_MISSING = object()
+
+
+class LLMIntentClassifier:
+    """
+    One cached, coalesced LLM lookup per normalized utterance.
+    """
+
+    def __init__(self, client, cache: TTLCache | None = None, scheduler: dict | None = None):
+        """
+        scheduler   LLMScheduler options (batch_window, max_batch,
+                    max_in_flight, rate, burst, timeout) to queue and
+                    micro-batch lookups; None sends each one directly
+        """
+        self.client = client
+        self.cache = cache if cache is not None else TTLCache()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.scheduler = None
+        if scheduler is not None:
+            self.scheduler = LLMScheduler(self._complete, self._complete_batch, **scheduler)
+
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    async def classify(self, text: str, priority: int = PRIORITY_ACTIVE) -> Intent | None:
+        key = normalize(text)
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.cache_hits += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(self._ask(key, priority))
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._done(key, f))
+        return await asyncio.shield(future)
+
+    def _done(self, key: str, future: asyncio.Future):
+        self._inflight.pop(key, None)
+        # Nobody may be waiting any more (budget expired)
+        if not future.cancelled():
+            future.exception()
+
+    async def _ask(self, key: str, priority: int) -> Intent | None:
+        if self.scheduler is not None:
+            intent = await self.scheduler.submit(key, priority)
+        else:
+            intent = await self._complete(key)
+        self.cache.put(key, intent)
+        return intent
+
+    async def _complete(self, key: str) -> Intent | None:
+        reply = await self.client.complete([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": key},
+        ])
+        return parse_intent(reply)
+
+    async def _complete_batch(self, keys: list[str]) -> list[Intent | None]:
+        questions = "\n".join(f"{i}. {key}" for i, key in enumerate(keys, 1))
+        reply = await self.client.complete(
+            [
+                {"role": "system", "content": BATCH_PROMPT},
+                {"role": "user", "content": questions},
+            ],
+            max_tokens=16 + 8 * len(keys),
+        )
+        return parse_intents(reply, len(keys))
+
+    async def aclose(self):
+        if self.scheduler is not None:
+            await self.scheduler.close()
+
+
+class HybridIntentClassifier:
+    def __init__(self, llm: LLMIntentClassifier | None, budget: float = 0.35):
+        """
+        budget   seconds to wait for the LLM before using the rules
+        """
+        self.llm = llm
+        self.budget = budget
+
+        self.escalated = 0
+        self.fallbacks = 0
+
+    async def classify(
+        self,
+        text: str,
+        understood: bool = False,
+        priority: int = PRIORITY_ACTIVE,
+    ) -> IntentResult:
+        result = classify(text)
+        if self.llm is None or not text.strip() or not is_ambiguous(result, understood):
+            return result
+
+        self.escalated += 1
+        try:
+            intent = await asyncio.wait_for(self.llm.classify(text, priority), self.budget)
+        except (asyncio.TimeoutError, LLMError):
+            self.fallbacks += 1
+            return result
+
+        if intent is None:
+            return result
+        return IntentResult(frozenset({intent}), _POLARITY[intent])
+
+    def metrics(self) -> dict:
+        """
+        Escalation counters, plus the LLM scheduler's queue depth and
+        wait times when lookups are scheduled.
+        """
+        metrics = {"escalated": self.escalated, "fallbacks": self.fallbacks}
+        if self.llm is not None:
+            metrics["cache_hits"] = self.llm.cache_hits
+            metrics["coalesced"] = self.llm.coalesced
+            if self.llm.scheduler is not None:
+                metrics.update(self.llm.scheduler.metrics())
+        return metrics
+
+    async def aclose(self):
+        if self.llm is not None:
+            await self.llm.aclose()
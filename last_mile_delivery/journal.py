@@ -0,0 +1,189 @@
+"""
+Append-only journal for order status mutations
+----------------------------------------------
+
+Each status change is appended as one JSON line:
+
+    {"order_id": "101", "changes": {"status": "scheduled", ...}}
+
+Records carry absolute field values, so replaying a record twice
+is harmless. The snapshot (orders.csv) plus the journal is the
+current state; compaction folds the journal back into the snapshot.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+FSYNC_ALWAYS = "always"      # fsync after every record
+FSYNC_INTERVAL = "interval"  # fsync at most every `fsync_interval` seconds
+FSYNC_NEVER = "never"        # leave flushing to the OS
+
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+
+class OrderJournal:
+    def __init__(
+        self,
+        path: Path | str,
+        fsync: str = FSYNC_ALWAYS,
+        fsync_interval: float = 1.0,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.path = Path(path)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._fd = None
+        self._last_sync = 0.0
+
+    # --------------------------------------------------
+    # FILE HANDLE / LOCKING
+    # --------------------------------------------------
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self._fd = os.open(
+                self.path,
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                0o644,
+            )
+        return self._fd
+
+    @contextmanager
+    def locked(self, exclusive: bool = False):
+        """
+        Cross-process lock on the journal.
+        Appends take it shared, compaction and recovery exclusive.
+        """
+        with self._lock:
+            fd = self._open()
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield fd
+            finally:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    # --------------------------------------------------
+    # WRITES
+    # --------------------------------------------------
+
+    def append(self, order_id: str, changes: dict):
+        record = json.dumps(
+            {"order_id": order_id, "changes": changes},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        data = (record + "\n").encode("utf-8")
+
+        with self.locked() as fd:
+            # One write() per record keeps O_APPEND records whole
+            os.write(fd, data)
+            self._maybe_sync(fd)
+
+    def _maybe_sync(self, fd: int):
+        if self.fsync == FSYNC_ALWAYS:
+            os.fsync(fd)
+        elif self.fsync == FSYNC_INTERVAL:
+            now = time.monotonic()
+            if now - self._last_sync >= self.fsync_interval:
+                os.fsync(fd)
+                self._last_sync = now
+
+    def sync(self):
+        with self.locked() as fd:
+            os.fsync(fd)
+            self._last_sync = time.monotonic()
+
+    def truncate(self):
+        """
+        Drop all records. Caller must hold the exclusive lock.
+        """
+        os.ftruncate(self._open(), 0)
+        os.fsync(self._fd)
+
+    # --------------------------------------------------
+    # READS
+    # --------------------------------------------------
+
+    def size(self) -> int:
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def read_from(self, offset: int = 0) -> tuple[list[tuple[str, dict]], int]:
+        """
+        Read complete records starting at `offset`.
+        Returns the records and the offset just past the last one.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        end = data.rfind(b"\n") + 1
+        records = []
+
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                records.append((record["order_id"], record["changes"]))
+            except (ValueError, KeyError, TypeError):
+                # Skip a corrupted record rather than refusing to start
+                continue
+
+        return records, offset + end
+
+    # --------------------------------------------------
+    # CRASH RECOVERY
+    # --------------------------------------------------
+
+    def recover(self):
+        """
+        Cut off a record torn by a crash mid-write, so that the
+        next append starts on a clean line.
+        """
+        # Nothing written yet: don't create the file on a read path
+        # (the first append does)
+        if not self.size():
+            return
+
+        with self.locked(exclusive=True) as fd:
+            size = self.size()
+            if not size:
+                return
+
+            with open(self.path, "rb") as f:
+                f.seek(max(0, size - 1))
+                if f.read(1) == b"\n":
+                    return
+                f.seek(0)
+                data = f.read()
+
+            os.ftruncate(fd, data.rfind(b"\n") + 1)
+            os.fsync(fd)
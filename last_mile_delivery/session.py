@@ -0,0 +1,318 @@
+"""
+Call Session Snapshots
+----------------------
+
+Everything needed to continue a call on another worker (or after a
+restart) in a few hundred bytes: flow name, current state, slot
+context, order reference (order_id only; the order itself is read
+back from the order store) and the turn log.
+
+Binary layout (little endian):
+
+    "LS" | version u8 | flags u8 | body
+    body = flow, state, order_id           (strings)
+           varint n, n x (key, tag u8, value)   slot context
+           varint n, n x (role u8, text)        turn log
+    string = varint byte length + utf-8
+
+flags bit 0: body is zlib-compressed (only when that is smaller).
+
+Stores are plain key-value backends: DictSessionStore (in process),
+FileSessionStore (one file per call) and SQLiteSessionStore.
+"""
+
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+MAGIC = b"LS"
+VERSION = 1
+FLAG_COMPRESSED = 0x01
+
+_HEADER = struct.Struct("<2sBB")
+_F64 = struct.Struct("<d")
+_I64 = struct.Struct("<q")
+
+# Context value types
+_NONE, _STR, _INT, _FLOAT, _TRUE, _FALSE = range(6)
+
+# Turn roles; anything else is stored by name
+_ROLES = ("agent", "user")
+_OTHER_ROLE = 255
+
+# Compressing tiny snapshots only adds the zlib header
+_COMPRESS_MIN = 256
+
+
+class SessionError(ValueError):
+    pass
+
+
+@dataclass
+class SessionSnapshot:
+    flow: str
+    state: str
+    order_id: str = ""
+    context: dict = field(default_factory=dict)
+    turns: list[tuple[str, str]] = field(default_factory=list)
+
+
+# --------------------------------------------------
+# CODEC
+# --------------------------------------------------
+
+def _write_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _write_str(out: bytearray, text: str):
+    data = text.encode("utf-8")
+    _write_varint(out, len(data))
+    out += data
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.data):
+            raise SessionError("Truncated session snapshot")
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        n = shift = 0
+        while True:
+            b = self.byte()
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def raw(self, size: int) -> bytes:
+        if self.pos + size > len(self.data):
+            raise SessionError("Truncated session snapshot")
+        value = bytes(self.data[self.pos:self.pos + size])
+        self.pos += size
+        return value
+
+    def str(self) -> str:
+        return self.raw(self.varint()).decode("utf-8")
+
+
+def encode(snapshot: SessionSnapshot) -> bytes:
+    body = bytearray()
+    _write_str(body, snapshot.flow)
+    _write_str(body, snapshot.state)
+    _write_str(body, str(snapshot.order_id or ""))
+
+    _write_varint(body, len(snapshot.context))
+    for key, value in snapshot.context.items():
+        _write_str(body, key)
+        if value is None:
+            body.append(_NONE)
+        elif value is True:
+            body.append(_TRUE)
+        elif value is False:
+            body.append(_FALSE)
+        elif isinstance(value, int):
+            body.append(_INT)
+            body += _I64.pack(value)
+        elif isinstance(value, float):
+            body.append(_FLOAT)
+            body += _F64.pack(value)
+        elif isinstance(value, str):
+            body.append(_STR)
+            _write_str(body, value)
+        else:
+            raise SessionError(f"Cannot store context value of type {type(value).__name__}")
+
+    _write_varint(body, len(snapshot.turns))
+    for role, text in snapshot.turns:
+        if role in _ROLES:
+            body.append(_ROLES.index(role))
+        else:
+            body.append(_OTHER_ROLE)
+            _write_str(body, role)
+        _write_str(body, text)
+
+    flags = 0
+    if len(body) >= _COMPRESS_MIN:
+        packed = zlib.compress(bytes(body))
+        if len(packed) < len(body):
+            body, flags = packed, FLAG_COMPRESSED
+
+    return _HEADER.pack(MAGIC, VERSION, flags) + bytes(body)
+
+
+def decode(data: bytes) -> SessionSnapshot:
+    if len(data) < _HEADER.size:
+        raise SessionError("Truncated session snapshot")
+
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SessionError("Not a session snapshot")
+    if version != VERSION:
+        raise SessionError(f"Unsupported session snapshot version {version}")
+
+    body = data[_HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        body = zlib.decompress(body)
+
+    r = _Reader(body)
+    snapshot = SessionSnapshot(flow=r.str(), state=r.str(), order_id=r.str())
+
+    for _ in range(r.varint()):
+        key = r.str()
+        tag = r.byte()
+        if tag == _NONE:
+            value = None
+        elif tag == _TRUE:
+            value = True
+        elif tag == _FALSE:
+            value = False
+        elif tag == _INT:
+            value = _I64.unpack(r.raw(_I64.size))[0]
+        elif tag == _FLOAT:
+            value = _F64.unpack(r.raw(_F64.size))[0]
+        elif tag == _STR:
+            value = r.str()
+        else:
+            raise SessionError(f"Unknown context value tag {tag}")
+        snapshot.context[key] = value
+
+    for _ in range(r.varint()):
+        code = r.byte()
+        role = r.str() if code == _OTHER_ROLE else _ROLES[code]
+        snapshot.turns.append((role, r.str()))
+
+    return snapshot
+
+
+# --------------------------------------------------
+# STORES
+# --------------------------------------------------
+
+class DictSessionStore:
+    def __init__(self):
+        self._data: dict[str, bytes] = {}
+
+    def get(self, call_id: str) -> bytes | None:
+        return self._data.get(call_id)
+
+    def put(self, call_id: str, data: bytes):
+        self._data[call_id] = data
+
+    def delete(self, call_id: str):
+        self._data.pop(call_id, None)
+
+
+class FileSessionStore:
+    def __init__(self, directory: Path | str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, call_id: str) -> Path:
+        return self.directory / f"{call_id}.session"
+
+    def get(self, call_id: str) -> bytes | None:
+        try:
+            return self._path(call_id).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, call_id: str, data: bytes):
+        # Write aside and rename, so readers never see a partial snapshot
+        path = self._path(call_id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, call_id: str):
+        self._path(call_id).unlink(missing_ok=True)
+
+
+class SQLiteSessionStore:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            call_id TEXT PRIMARY KEY,
+            data    BLOB NOT NULL
+        )
+    """
+
+    def __init__(self, path: Path | str = ":memory:"):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if str(path) != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(self.SCHEMA)
+
+    def get(self, call_id: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE call_id = ?", (call_id,)
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put(self, call_id: str, data: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (call_id, data) VALUES (?, ?)",
+                (call_id, data),
+            )
+
+    def delete(self, call_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE call_id = ?", (call_id,))
+
+    def close(self):
+        self._conn.close()
+
+
+# --------------------------------------------------
+# SAVE / RESTORE
+# --------------------------------------------------
+
+class SessionManager:
+    """
+    Saves agent snapshots to a store and brings them back.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else DictSessionStore()
+
+    def save(self, call_id: str, agent) -> int:
+        """
+        Returns the snapshot size in bytes.
+        """
+        data = encode(agent.snapshot())
+        self.store.put(call_id, data)
+        return len(data)
+
+    def load(self, call_id: str) -> SessionSnapshot | None:
+        data = self.store.get(call_id)
+        return decode(data) if data is not None else None
+
+    def restore(self, call_id: str, agent) -> bool:
+        """
+        Put a saved call back into `agent`. False if none was saved.
+        """
+        snapshot = self.load(call_id)
+        if snapshot is None:
+            return False
+        agent.restore(snapshot)
+        return True
+
+    def discard(self, call_id: str):
+        self.store.delete(call_id)
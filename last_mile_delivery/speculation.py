@@ -0,0 +1,176 @@
+"""
+Speculative Replies
+-------------------
+
+Starts on the agent's next reply before the caller's turn is over.
+
+While the end-of-speech timer is still running we usually already
+know what was said: streaming STT sends interim transcripts, and the
+recorder reports a pause (audio so far) as soon as the VAD hears
+silence. Each of those is previewed against the dialog flow
+(DialogEngine.preview, no side effects); if it resolves to a guarded
+transition (an intent or slot was recognised, not a catch-all
+re-prompt), synthesis of that reply starts right away.
+
+When the final transcript arrives, take() keeps the prepared audio
+only if the final text resolves to the same transition, target,
+slots and reply. Otherwise it is discarded and the turn runs as usual.
+The transition itself (and its side effects) only ever runs on the
+final transcript.
+"""
+
+import asyncio
+import inspect
+
+from audio.channel import run_blocking
+from last_mile_delivery.dialog import Resolution
+
+
+def _same(a: Resolution, b: Resolution) -> bool:
+    return (
+        a.transition is b.transition
+        and a.target == b.target
+        and a.response == b.response
+        and a.captured == b.captured
+    )
+
+
+class Speculation:
+    """
+    One pre-synthesized reply; audio is buffered as it arrives.
+    """
+
+    def __init__(self, text: str, resolution: Resolution, tts):
+        self.text = text
+        self.resolution = resolution
+        self.streaming = inspect.isasyncgenfunction(getattr(tts, "stream", None))
+
+        self._chunks: list[bytes] = []
+        self._more = asyncio.Event()
+        if self.streaming:
+            self.task = asyncio.create_task(self._fill(tts.stream(resolution.response)))
+        else:
+            self.task = asyncio.create_task(run_blocking(tts.synthesize, resolution.response))
+        # Discarded speculations are never awaited; don't warn about them
+        self.task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    @property
+    def response(self) -> str:
+        return self.resolution.response
+
+    async def _fill(self, chunks):
+        try:
+            async for chunk in chunks:
+                self._chunks.append(chunk)
+                self._more.set()
+        finally:
+            self._more.set()
+
+    async def stream(self):
+        """
+        Buffered chunks first, then the rest as synthesis produces it.
+        """
+        sent = 0
+        while True:
+            while sent < len(self._chunks):
+                yield self._chunks[sent]
+                sent += 1
+            if self.task.done():
+                self.task.result()  # re-raise a synthesis error
+                if sent == len(self._chunks):
+                    return
+                continue
+            self._more.clear()
+            await self._more.wait()
+
+    async def audio(self) -> bytes:
+        result = await self.task
+        return b"".join(self._chunks) if self.streaming else result
+
+    def cancel(self):
+        self.task.cancel()
+
+
+class Speculator:
+    def __init__(self, agent, tts, stt=None):
+        """
+        stt   transcribes recorder pauses (offer_audio); not needed
+              with streaming STT, which offers interim text directly
+        """
+        self.agent = agent
+        self.tts = tts
+        self.stt = stt
+
+        self.current: Speculation | None = None
+        self._generation = 0
+        self._pending: set[asyncio.Task] = set()
+
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+
+    def offer(self, text: str):
+        """
+        Interim transcript of the turn in progress.
+        """
+        if not text.strip():
+            return
+
+        resolution = self.agent.engine.preview(text)
+        if not resolution.understood:
+            return
+
+        if self.current is not None:
+            if _same(self.current.resolution, resolution):
+                return
+            self.current.cancel()
+
+        self.current = Speculation(text, resolution, self.tts)
+        self.started += 1
+
+    def offer_audio(self, audio_bytes: bytes):
+        """
+        Caller paused: transcribe what we have in the background.
+        The audio of a later pause contains this one's, so a newer
+        pause cancels the transcription still running for an older
+        one: at most one is in flight per turn.
+        """
+        if self.stt is None or not audio_bytes:
+            return
+        for task in self._pending:
+            task.cancel()
+        task = asyncio.create_task(self._transcribe(audio_bytes, self._generation))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _transcribe(self, audio_bytes: bytes, generation: int):
+        text = (await run_blocking(self.stt.transcribe, audio_bytes)).strip()
+        # The turn may have ended while we were transcribing
+        if generation == self._generation:
+            self.offer(text)
+
+    def take(self, final_text: str, intents=None) -> Speculation | None:
+        """
+        The prepared reply if it still holds for `final_text`.
+        Call before agent.handle_input(final_text, intents).
+        """
+        speculation, self.current = self.current, None
+        self._generation += 1
+        for task in self._pending:
+            task.cancel()
+
+        if speculation is None:
+            return None
+
+        if final_text.strip() and _same(
+            speculation.resolution, self.agent.engine.preview(final_text, intents)
+        ):
+            self.hits += 1
+            return speculation
+
+        self.misses += 1
+        speculation.cancel()
+        return None
+
+    def cancel(self):
+        self.take("")
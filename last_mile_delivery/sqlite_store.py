@@ -0,0 +1,303 @@
+"""
+SQLite-backed order store
+-------------------------
+
+Drop-in alternative to OrderRepository for large order files and
+many worker processes. The database runs in WAL mode, so readers
+never block the single writer, and status changes are grouped into
+batched transactions.
+
+One-shot import from the orders.csv schema:
+
+    python -m last_mile_delivery.sqlite_store orders.csv orders.db
+"""
+
+import csv
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+COLUMNS = (
+    "order_id",
+    "customer_name",
+    "phone",
+    "failed_date",
+    "available_dates",
+    "status",
+    "scheduled_date",
+    "neighbor_name",
+    "neighbor_phone",
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS orders (
+    {COLUMNS[0]} TEXT PRIMARY KEY,
+    {", ".join(f"{c} TEXT NOT NULL DEFAULT ''" for c in COLUMNS[1:])}
+);
+CREATE INDEX IF NOT EXISTS idx_orders_phone ON orders (phone);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status);
+"""
+
+
+class SQLiteOrderStore:
+    """
+    Same read/write surface as OrderRepository.
+
+    Updates are committed as they are made. With `batch_size` > 1
+    (or inside batch()) they are queued and committed together once
+    `batch_size` are pending or the oldest is `flush_interval`
+    seconds old; reads from this store see queued updates at once,
+    other processes after the flush, and close() must be called so
+    the last batch is not lost.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        batch_size: int = 1,
+        flush_interval: float = 0.5,
+        timeout: float = 30.0,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        # Every thread's connection, so close() can close them all
+        self._connections: set[sqlite3.Connection] = set()
+        self._pending: dict[str, dict] = {}
+        self._pending_since = 0.0
+
+        self._connect().executescript(SCHEMA)
+
+    # --------------------------------------------------
+    # CONNECTIONS
+    # --------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        with self._lock:
+            if conn is not None and conn in self._connections:
+                return conn
+
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,    # explicit BEGIN/COMMIT
+                check_same_thread=False,  # used by one thread, closed by close()
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._connections.add(conn)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so concurrent
+        # writers queue on busy_timeout instead of failing mid-way
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        """
+        Flush, then close the connections of every thread (executor
+        threads included); a later call reconnects.
+        """
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+
+    # --------------------------------------------------
+    # READS
+    # --------------------------------------------------
+
+    def _row(self, row) -> dict | None:
+        if row is None:
+            return None
+
+        order = dict(row)
+        with self._lock:
+            pending = self._pending.get(order["order_id"])
+            if pending:
+                order.update(pending)
+        return order
+
+    def refresh(self, force: bool = False):
+        # Every query reads the committed state; nothing to reload
+        self._maybe_flush()
+
+    def all(self) -> list[dict]:
+        self._maybe_flush()
+        rows = self._connect().execute(
+            "SELECT * FROM orders ORDER BY rowid"
+        ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def find_by_phone(self, phone: str) -> dict | None:
+        self._maybe_flush()
+        row = self._connect().execute(
+            "SELECT * FROM orders WHERE phone = ? ORDER BY rowid LIMIT 1",
+            (phone,),
+        ).fetchone()
+        return self._row(row)
+
+    def find_by_order_id(self, order_id: str) -> dict | None:
+        self._maybe_flush()
+        row = self._connect().execute(
+            "SELECT * FROM orders WHERE order_id = ?",
+            (order_id,),
+        ).fetchone()
+        return self._row(row)
+
+    def find_by_status(self, status: str) -> list[dict]:
+        self._maybe_flush()
+        rows = self._connect().execute(
+            "SELECT * FROM orders WHERE status = ? ORDER BY rowid",
+            (status,),
+        ).fetchall()
+        return [self._row(row) for row in rows]
+
+    # --------------------------------------------------
+    # WRITES
+    # --------------------------------------------------
+
+    def update(self, order_id: str, changes: dict) -> bool:
+        """
+        Write (or queue, when batching) field changes for one order.
+        Returns False if the order does not exist.
+        """
+        unknown = set(changes) - set(COLUMNS[1:])
+        if unknown:
+            raise ValueError(f"Unknown order fields: {sorted(unknown)}")
+
+        with self._lock:
+            if order_id not in self._pending:
+                exists = self._connect().execute(
+                    "SELECT 1 FROM orders WHERE order_id = ?",
+                    (order_id,),
+                ).fetchone()
+                if not exists:
+                    return False
+
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.setdefault(order_id, {}).update(changes)
+
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            else:
+                self._maybe_flush()
+
+        return True
+
+    def _maybe_flush(self):
+        if (
+            self._pending
+            and time.monotonic() - self._pending_since >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """
+        Commit all queued updates in one transaction.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            try:
+                with self._transaction() as conn:
+                    for order_id, changes in pending.items():
+                        fields = ", ".join(f"{name} = ?" for name in changes)
+                        conn.execute(
+                            f"UPDATE orders SET {fields} WHERE order_id = ?",
+                            (*changes.values(), order_id),
+                        )
+            except BaseException:
+                # Keep the batch for the next flush
+                self._pending = pending
+                raise
+
+    @contextmanager
+    def batch(self):
+        """
+        Group every update inside the block into one transaction.
+        """
+        with self._lock:
+            limits = (self.batch_size, self.flush_interval)
+            self.batch_size, self.flush_interval = sys.maxsize, float("inf")
+            try:
+                yield self
+            finally:
+                self.batch_size, self.flush_interval = limits
+                self.flush()
+
+    def compact(self):
+        self.flush()
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+# --------------------------------------------------
+# CSV IMPORT
+# --------------------------------------------------
+
+def import_csv(
+    csv_path: Path | str,
+    db_path: Path | str,
+    chunk_size: int = 10000,
+) -> int:
+    """
+    Load an orders.csv file into a SQLite store.
+    Existing rows with the same order_id are replaced.
+    Returns the number of imported rows.
+    """
+    store = SQLiteOrderStore(db_path)
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    sql = f"INSERT OR REPLACE INTO orders ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+
+    count = 0
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        chunk = []
+
+        for row in reader:
+            chunk.append(tuple(row.get(c) or "" for c in COLUMNS))
+            if len(chunk) >= chunk_size:
+                with store._transaction() as conn:
+                    conn.executemany(sql, chunk)
+                count += len(chunk)
+                chunk = []
+
+        if chunk:
+            with store._transaction() as conn:
+                conn.executemany(sql, chunk)
+            count += len(chunk)
+
+    store.close()
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m last_mile_delivery.sqlite_store <orders.csv> <orders.db>")
+        sys.exit(1)
+
+    imported = import_csv(sys.argv[1], sys.argv[2])
+    print(f"✅ Imported {imported} orders into {sys.argv[2]}")
@@ -0,0 +1,431 @@
+"""
+Last-Mile Delivery Voice Agent
+Runs one outbound call: channel audio -> STT -> agent -> TTS -> channel
+"""
+
+import asyncio
+import inspect
+import time
+from contextlib import suppress
+
+from audio.channel import run_blocking
+from backends.registry import STT_BACKENDS, TTS_BACKENDS
+from memory.memory import ConversationMemory
+from last_mile_delivery.agent import LastMileDeliveryAgent, ConversationState
+from last_mile_delivery.data import get_order_by_phone
+from last_mile_delivery.export import CallRecord
+from last_mile_delivery.speculation import Speculator
+from llm.scheduler import PRIORITY_ACTIVE, PRIORITY_NEW
+from telemetry.tracing import (
+    END_OF_SPEECH,
+    HANDLE_INPUT,
+    INTENT,
+    LISTEN,
+    NULL_TRACER,
+    PLAYBACK,
+    STT,
+    TTS_FIRST_BYTE,
+    TTS_TOTAL,
+    TURN,
+    VAD_WAIT,
+)
+
+
+# Said by the call loop itself when the caller stays silent
+NO_RESPONSE_PROMPT = "Hello, can you hear me?"
+NO_RESPONSE_GOODBYE = "It seems now is not a good time. We will try again later."
+
+STATIC_PROMPTS = (NO_RESPONSE_PROMPT, NO_RESPONSE_GOODBYE)
+
+
+class LastMileDeliveryVoiceAgent:
+    def __init__(
+        self,
+        customer_phone: str,
+        api_key: str | None = None,
+        order: dict | None = None,
+        channel=None,
+        stt=None,
+        tts=None,
+        streaming_stt=None,
+        listen_timeout: float = 10.0,
+        barge_in: bool = False,
+        barge_in_ms: int = 200,
+        sessions=None,
+        transcript_archive: str | None = None,
+        exporter=None,
+        tracer=None,
+        speculative: bool = False,
+        intent_classifier=None,
+        verbose: bool = True,
+    ):
+        # Lookup order by phone number
+        if order is None:
+            order = get_order_by_phone(customer_phone)
+        if not order:
+            raise RuntimeError("No order found for this phone number")
+
+        self.order = order
+        self.verbose = verbose
+
+        # Memory (finished transcripts go to `transcript_archive`, if set)
+        self.memory = ConversationMemory(archive_path=transcript_archive)
+        self.memory.start_session(f"order_{order['order_id']}")
+
+        # Core agent
+        self.agent = LastMileDeliveryAgent(
+            memory=self.memory,
+            order=order
+        )
+
+        # Audio / speech components (local sound card + Deepgram by default)
+        if channel is None:
+            from audio.recorder import AsyncSilenceRecorder, MicrophoneStream
+            from audio.playback import AsyncAudioPlayer
+            from audio.channel import LocalAudioChannel
+
+            channel = LocalAudioChannel(
+                recorder=AsyncSilenceRecorder(
+                    start_timeout_ms=5000,
+                    silence_threshold=350.0,
+                    silence_duration_ms=700,
+                    max_record_ms=10000,
+                ),
+                player=AsyncAudioPlayer(sample_rate=24000),
+                microphone=MicrophoneStream(sample_rate=16000),
+            )
+
+        if stt is None and streaming_stt is None:
+            stt = STT_BACKENDS.create("deepgram", api_key=api_key)
+
+        if tts is None:
+            from tts.splice import TemplateTTS
+            tts = TemplateTTS(TTS_BACKENDS.create("deepgram", api_key=api_key))
+
+        self.channel = channel
+        self.stt = stt
+        self.tts = tts
+
+        # Real-time mode: endpointing replaces the recorder's silence timer
+        self.streaming_stt = streaming_stt
+        self.listen_timeout = listen_timeout
+        self.transcriber = None
+
+        # Full duplex: caller speech for `barge_in_ms` stops playback
+        self.barge_in = barge_in
+        self.barge_in_ms = barge_in_ms
+        self.barge_in_count = 0
+        self._preroll = None
+
+        self.no_response_count = 0
+
+        # Snapshot after every turn, so another worker can pick the
+        # call up (SessionManager from session.py)
+        self.sessions = sessions
+        self.call_id = f"order_{order['order_id']}"
+
+        # Caller audio captured -> agent audio starts, per turn (seconds)
+        self.turn_latencies: list[float] = []
+        self._turn_started = None
+        self._audio_started = None
+
+        # Finished-call record for analytics (CallExporter from export.py)
+        self.exporter = exporter
+        self.state_path: list[str] = []
+        self.outcome: str | None = None
+
+        # Stage timings (telemetry/tracing.py); a no-op unless enabled
+        self.trace = (tracer or NULL_TRACER).call(self.call_id)
+
+        # Rules first, LLM only for unclear answers (intent_llm.py)
+        self.intent_classifier = intent_classifier
+
+        # Start on the reply from interim transcripts / caller pauses,
+        # keep it only if the final transcript agrees (speculation.py)
+        self.speculator = Speculator(self.agent, tts, stt) if speculative else None
+        if self.speculator is not None and streaming_stt is None:
+            channel.on_pause = self.speculator.offer_audio
+
+    # --------------------------------------------------
+
+    def log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    # --------------------------------------------------
+
+    def _first_audio(self) -> float:
+        now = time.perf_counter()
+        if self._turn_started is not None:
+            self.turn_latencies.append(now - self._turn_started)
+            self.trace.record(TURN, now - self._turn_started)
+            self._turn_started = None
+        return now
+
+    async def _timed_stream(self, chunks, started: float):
+        first = True
+        async for chunk in chunks:
+            if first:
+                self._audio_started = self._first_audio()
+                self.trace.record(TTS_FIRST_BYTE, self._audio_started - started)
+                first = False
+            yield chunk
+        self.trace.record(TTS_TOTAL, time.perf_counter() - started)
+
+    async def _play(self, text: str, prepared=None):
+        """
+        `prepared` is a Speculation already synthesizing `text`.
+        """
+        started = time.perf_counter()
+
+        # Streaming TTS: playback starts on the first chunk
+        if inspect.isasyncgenfunction(getattr(self.tts, "stream", None)):
+            chunks = prepared.stream() if prepared else self.tts.stream(text)
+            self._audio_started = None
+            await self.channel.play_stream(self._timed_stream(chunks, started))
+            if self._audio_started is not None:
+                self.trace.record(PLAYBACK, time.perf_counter() - self._audio_started)
+            return
+
+        if prepared is not None:
+            audio = await prepared.audio()
+        else:
+            audio = await run_blocking(self.tts.synthesize, text)
+        audio_started = self._first_audio()
+        self.trace.record(TTS_FIRST_BYTE, audio_started - started)
+        self.trace.record(TTS_TOTAL, audio_started - started)
+
+        await self.channel.play(audio)
+        self.trace.record(PLAYBACK, time.perf_counter() - audio_started)
+
+    async def _wait_for_caller(self):
+        """
+        Resolve once the caller has been talking for barge_in_ms.
+        Returns the audio captured so far (None in streaming mode,
+        where the STT session already has it).
+        """
+        if self.transcriber is not None:
+            await self.transcriber.wait_for_speech()
+            return None
+        return await self.channel.wait_for_speech(self.barge_in_ms)
+
+    def _save_session(self):
+        self.state_path.append(self.agent.engine.state)
+        if self.sessions is not None:
+            self.sessions.save(self.call_id, self.agent)
+
+    def _export(self, started: float, duration: float):
+        if self.exporter is None:
+            return
+        self.exporter.submit(CallRecord(
+            call_id=self.call_id,
+            order_id=str(self.order.get("order_id", "")),
+            flow=self.agent.engine.flow.name,
+            outcome=self.outcome or "aborted",
+            final_state=self.agent.engine.state,
+            state_path=list(self.state_path),
+            turns=[(m["role"], m["text"]) for m in self.memory.get_conversation()],
+            turn_latencies=list(self.turn_latencies),
+            barge_ins=self.barge_in_count,
+            started=started,
+            duration=duration,
+        ))
+
+    async def speak(self, text: str, prepared=None):
+        self.log(f"\n🤖 AGENT: {text}")
+
+        if not self.barge_in:
+            await self._play(text, prepared)
+            return
+
+        playback = asyncio.create_task(self._play(text, prepared))
+        listener = asyncio.create_task(self._wait_for_caller())
+
+        try:
+            await asyncio.wait(
+                {playback, listener},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if listener.done() and not playback.done():
+                self.log("✋ Caller interrupted, stopping playback.")
+                self.barge_in_count += 1
+                self._preroll = listener.result()
+            else:
+                playback.result()
+        finally:
+            for task in (playback, listener):
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    # --------------------------------------------------
+
+    async def listen_and_transcribe(self) -> str:
+        if self.transcriber is not None:
+            return await self._listen_streaming()
+
+        preroll, self._preroll = self._preroll, None
+        started = time.perf_counter()
+        audio_bytes = await self.channel.record(preroll)
+        self._turn_started = time.perf_counter()
+        self._trace_listen(started, preroll is not None)
+
+        self.log("🧠 Transcribing user speech...")
+        with self.trace.span(STT):
+            transcript = (await run_blocking(self.stt.transcribe, audio_bytes)).strip()
+
+        if transcript:
+            self.log(f"📝 STT RESULT: {transcript}")
+        else:
+            self.log("📝 STT RESULT: <empty>")
+
+        return transcript
+
+    def _trace_listen(self, started: float, barged_in: bool):
+        self.trace.record(LISTEN, self._turn_started - started)
+
+        speech_started = getattr(self.channel, "speech_started", None)
+        speech_ended = getattr(self.channel, "speech_ended", None)
+        if speech_started is not None and not barged_in:
+            self.trace.record(VAD_WAIT, speech_started - started)
+        if speech_ended is not None:
+            self.trace.record(END_OF_SPEECH, self._turn_started - speech_ended)
+
+    async def _listen_streaming(self) -> str:
+        self.log("🎙️ Listening (streaming)...")
+        started = time.perf_counter()
+        event = await self.transcriber.next_turn(timeout=self.listen_timeout)
+        self._turn_started = time.perf_counter()
+        self.trace.record(LISTEN, self._turn_started - started)
+
+        transcript = event.text.strip() if event else ""
+        self.log(f"📝 STT RESULT: {transcript or '<empty>'}")
+        return transcript
+
+    # --------------------------------------------------
+
+    async def run(self):
+        started, clock = time.time(), time.perf_counter()
+        resumable = False
+        try:
+            if self.streaming_stt is None:
+                await self._converse()
+            else:
+                await self._converse_streaming()
+        except ConnectionError:
+            # Transport drop (CallDropped): another worker picks it up
+            self.outcome = "dropped"
+            resumable = True
+            raise
+        except Exception:
+            self.outcome = "error"
+            raise
+        finally:
+            # Any other ending is final: a later dial of the same order
+            # must start over, not replay this call's last line
+            if self.sessions is not None and not resumable:
+                self.sessions.discard(self.call_id)
+            # Hand the call to the exporter, then release (or archive)
+            # the transcript
+            self._export(started, time.perf_counter() - clock)
+            self.trace.end()
+            self.memory.end_session()
+
+    async def _converse_streaming(self):
+        from stt.streaming_transcriber import StreamingTranscriber
+
+        on_partial = None
+        if self.speculator is not None:
+            on_partial = lambda event: self.speculator.offer(event.text)
+
+        self.transcriber = StreamingTranscriber(
+            self.streaming_stt,
+            self.channel.frames(),
+            on_partial=on_partial,
+        )
+        await self.transcriber.start()
+        try:
+            await self._converse()
+        finally:
+            await self.transcriber.close()
+            self.transcriber = None
+
+    async def _converse(self):
+        self.log("=" * 60)
+        self.log("🚚 Last-Mile Delivery Voice Agent (Outbound)")
+        self.log("=" * 60)
+
+        # Resume a saved call (repeat the last line), or greet
+        if self.sessions is not None and self.sessions.restore(self.call_id, self.agent):
+            self.log("♻️ Resumed saved session.")
+            agent_lines = [
+                m["text"] for m in self.memory.get_conversation() if m["role"] == "agent"
+            ]
+            await self.speak(agent_lines[-1] if agent_lines else self.agent.start())
+        else:
+            await self.speak(self.agent.start())
+        self._save_session()
+
+        # Conversation loop
+        while True:
+            user_text = await self.listen_and_transcribe()
+
+            # ------------------------
+            # NO RESPONSE HANDLING
+            # ------------------------
+            if not user_text:
+                if self.speculator is not None:
+                    self.speculator.cancel()
+                self.no_response_count += 1
+
+                if self.no_response_count == 1:
+                    await self.speak(NO_RESPONSE_PROMPT)
+                    continue
+
+                if self.no_response_count == 2:
+                    await self.speak(NO_RESPONSE_GOODBYE)
+
+                self.outcome = "no_response"
+                break
+
+            # ------------------------
+            # USER SPOKE
+            # ------------------------
+            self.no_response_count = 0
+            self.log(f"\n👤 HUMAN: {user_text}")
+
+            intents = None
+            if self.intent_classifier is not None:
+                understood = self.agent.engine.preview(user_text).understood
+                # Answer to the greeting queues behind calls already under way
+                priority = PRIORITY_NEW if len(self.state_path) <= 1 else PRIORITY_ACTIVE
+                with self.trace.span(INTENT):
+                    intents = await self.intent_classifier.classify(
+                        user_text, understood, priority
+                    )
+
+            prepared = None
+            if self.speculator is not None:
+                prepared = self.speculator.take(user_text, intents)
+
+            with self.trace.span(HANDLE_INPUT):
+                response = self.agent.handle_input(user_text, intents)
+            self._save_session()
+
+            if prepared is not None and prepared.response != response:
+                prepared.cancel()
+                prepared = None
+
+            # Caller already on the next turn (heard before the state moved)
+            if self.speculator is not None and self.transcriber is not None:
+                if self.transcriber.partial:
+                    self.speculator.offer(self.transcriber.partial)
+            if prepared is not None:
+                self.log("⚡ Reply prepared during end of speech.")
+            await self.speak(response, prepared)
+
+            # Stop if agent closed the conversation
+            if self.agent.state == ConversationState.CLOSE:
+                self.outcome = "completed"
+                break
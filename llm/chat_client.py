@@ -0,0 +1,70 @@
+"""
+Chat Completions Client
+Async client for OpenAI-compatible /chat/completions endpoints
+(Groq by default) over one pooled httpx connection pool.
+
+Create one per process and share it between calls; every request
+reuses the pool's keep-alive connections instead of opening a new
+TLS session.
+"""
+
+import httpx
+
+from llm.errors import LLMError
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+class ChatClient:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str = GROQ_BASE_URL,
+        model: str = "llama-3.1-8b-instant",
+        max_connections: int = 20,
+        timeout: float = 10.0,
+    ):
+        self.model = model
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self.requests = 0
+
+    async def complete(
+        self,
+        messages: list[dict],
+        temperature: float = 0.0,
+        max_tokens: int | None = 64,
+    ) -> str:
+        """
+        Text of the first choice.
+        """
+        payload = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+
+        self.requests += 1
+        try:
+            response = await self._http.post("/chat/completions", json=payload)
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+        except httpx.HTTPError as e:
+            raise LLMError(f"Chat completion failed: {e}") from e
+        except (KeyError, IndexError, ValueError) as e:
+            raise LLMError(f"Unexpected chat completion response: {e}") from e
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,9 @@
+"""
+LLM Errors
+Kept apart from the HTTP client so callers can catch them without
+importing httpx.
+"""
+
+
+class LLMError(RuntimeError):
+    pass
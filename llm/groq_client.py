@@ -1,12 +1,6 @@
 import os
-import asyncio
-from groq import Groq
-from dotenv import load_dotenv
 
-load_dotenv()
-
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-assert GROQ_API_KEY, "Missing GROQ_API_KEY"
+from llm.errors import LLMError
 
 
 SYSTEM_PROMPT = (
@@ -22,26 +16,52 @@ SYSTEM_PROMPT = (
 
 class GroqLLM:
     """
-    Async-compatible Groq client.
-    Behavior is IDENTICAL to the previous version.
+    Async-compatible Groq client: generate() goes through a pooled
+    ChatClient (Groq's OpenAI-compatible endpoint), __call__ through
+    the blocking Groq SDK.
     """
 
-    def __init__(self, model: str = "llama-3.1-8b-instant"):
-        self.client = Groq(api_key=GROQ_API_KEY)
+    def __init__(self, model: str = "llama-3.1-8b-instant", api_key: str | None = None):
+        # Read on construction, not import (call load_dotenv() first)
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        if not self.api_key:
+            raise LLMError("GROQ_API_KEY not set")
         self.model = model
+        self._chat = None
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        Groq SDK client for the blocking path, imported on first use.
+        """
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=self.api_key)
+        return self._client
 
     async def generate(self, prompt: str) -> str:
         """
-        Non-blocking wrapper around Groq API.
-        Runs the blocking SDK call in a thread executor.
+        Non-blocking Groq call over a pooled HTTP client
+        (keep-alive connections shared by every generate()).
         """
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._sync_generate,
-            prompt
+        if self._chat is None:
+            from llm.chat_client import ChatClient
+            self._chat = ChatClient(self.api_key, model=self.model)
+        return await self._chat.complete(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=None,
         )
 
+    async def aclose(self):
+        if self._chat is not None:
+            await self._chat.aclose()
+            self._chat = None
+
     def _sync_generate(self, prompt: str) -> str:
         response = self.client.chat.completions.create(
             model=self.model,
@@ -0,0 +1,247 @@
+"""
+LLM Request Scheduler
+---------------------
+
+Queues LLM requests from many concurrent calls in front of one
+provider connection.
+
+  - requests arriving within `batch_window` seconds are sent as one
+    batched request (with `send_batch`), or one by one with at most
+    `max_in_flight` outstanding (with only `send`)
+  - a token bucket keeps the request rate under the provider limit
+    (a batch is one request)
+  - lower priority numbers go first: callers mid-conversation
+    (PRIORITY_ACTIVE) before calls that just picked up (PRIORITY_NEW)
+  - each request has a deadline; requests still queued when it
+    passes fail with DeadlineExceeded instead of being sent
+
+    scheduler = LLMScheduler(llm.generate, rate=5, burst=10)
+    reply = await scheduler.submit(prompt, priority=PRIORITY_NEW, timeout=2.0)
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+
+from llm.errors import LLMError
+from telemetry.tracing import Histogram
+
+PRIORITY_ACTIVE = 0   # caller is mid-conversation
+PRIORITY_NEW = 1      # first turn of a new call
+
+
+class DeadlineExceeded(LLMError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int | None = None):
+        """
+        rate    tokens per second
+        burst   bucket size (default: one second's worth)
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity = float(burst or max(1.0, rate))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """
+        Seconds until a token is available (0.0: take one now).
+        """
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    async def take(self):
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self.tokens -= 1
+
+
+class _Request:
+    __slots__ = ("priority", "seq", "payload", "future", "deadline", "enqueued")
+
+    def __init__(self, priority, seq, payload, future, deadline, enqueued):
+        self.priority = priority
+        self.seq = seq
+        self.payload = payload
+        self.future = future
+        self.deadline = deadline
+        self.enqueued = enqueued
+
+    def __lt__(self, other: "_Request") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        send,
+        send_batch=None,
+        max_in_flight: int = 8,
+        batch_window: float = 0.005,
+        max_batch: int = 16,
+        rate: float | None = None,
+        burst: int | None = None,
+        timeout: float = 10.0,
+    ):
+        """
+        send         async payload -> result
+        send_batch   async [payload, ...] -> [result, ...] in one request
+        timeout      default deadline per request, in seconds
+        """
+        self.send = send
+        self.send_batch = send_batch
+        self.max_in_flight = max_in_flight
+        self.batch_window = batch_window
+        self.max_batch = max_batch if send_batch else 1
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.timeout = timeout
+
+        self._queue: list[_Request] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._sends: set[asyncio.Task] = set()
+
+        # Metrics
+        self.wait = Histogram()
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.batches = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _start(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def submit(self, payload, priority: int = PRIORITY_ACTIVE, timeout: float | None = None):
+        self._start()
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        timeout = self.timeout if timeout is None else timeout
+
+        request = _Request(
+            priority, next(self._seq), payload, loop.create_future(), now + timeout, now
+        )
+        heapq.heappush(self._queue, request)
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        self._wakeup.set()
+
+        try:
+            return await asyncio.wait_for(request.future, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"LLM request not answered within {timeout:.2f}s") from None
+
+    # --------------------------------------------------
+
+    def _take_batch(self, now: float) -> list[_Request]:
+        batch = []
+        while self._queue and len(batch) < self.max_batch:
+            request = heapq.heappop(self._queue)
+            if request.future.done():
+                continue  # caller gave up
+            if request.deadline <= now:
+                self.expired += 1
+                request.future.set_exception(DeadlineExceeded("LLM request expired in queue"))
+                continue
+            batch.append(request)
+        return batch
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Let concurrent requests gather into one batch
+            if self.batch_window and len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.batch_window)
+
+            await self._slots.acquire()
+            if self.bucket is not None:
+                await self.bucket.take()
+
+            now = loop.time()
+            batch = self._take_batch(now)
+            if not batch:
+                self._slots.release()
+                continue
+
+            for request in batch:
+                self.wait.observe(now - request.enqueued)
+
+            task = asyncio.create_task(self._send(batch))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, batch: list[_Request]):
+        self.in_flight += 1
+        self.batches += 1
+        try:
+            if len(batch) > 1:
+                results = await self.send_batch([r.payload for r in batch])
+                if len(results) != len(batch):
+                    raise LLMError(f"Batch of {len(batch)} returned {len(results)} results")
+            else:
+                results = [await self.send(batch[0].payload)]
+        except Exception as e:
+            self.failed += len(batch)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        else:
+            self.completed += len(batch)
+            for request, result in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    # --------------------------------------------------
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "batches": self.batches,
+            "mean_batch": self.completed / self.batches if self.batches else 0.0,
+            "wait_p50_ms": self.wait.quantile(0.5) * 1000,
+            "wait_p95_ms": self.wait.quantile(0.95) * 1000,
+        }
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        for task in list(self._sends):
+            task.cancel()
+        for request in self._queue:
+            if not request.future.done():
+                request.future.cancel()
+        self._queue.clear()
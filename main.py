@@ -7,14 +7,8 @@ import os
 import asyncio
 from dotenv import load_dotenv
 
-from memory.memory import ConversationMemory
-from audio.recorder import SilenceRecorder
-from audio.playback import AudioPlayer
-from stt.deepgram_stt import DeepgramSTT
-from tts.deepgram_tts import DeepgramTTS
-
-from last_mile_delivery.agent import LastMileDeliveryAgent
-from last_mile_delivery.data import get_order_by_phone
+from last_mile_delivery.data import close_repository
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
 
 
 # --------------------------------------------------
@@ -23,131 +17,131 @@ from last_mile_delivery.data import get_order_by_phone
 
 load_dotenv()
 
-DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
-if not DEEPGRAM_API_KEY:
-    raise RuntimeError("DEEPGRAM_API_KEY not set")
-
-
-# --------------------------------------------------
-# VOICE AGENT
-# --------------------------------------------------
-
-class LastMileDeliveryVoiceAgent:
-    def __init__(self, customer_phone: str):
-        # Lookup order by phone number
-        order = get_order_by_phone(customer_phone)
-        if not order:
-            raise RuntimeError("No order found for this phone number")
-
-        self.order = order
-
-        # Memory
-        self.memory = ConversationMemory()
-        self.memory.start_session(f"order_{order['order_id']}")
-
-        # Core agent
-        self.agent = LastMileDeliveryAgent(
-            memory=self.memory,
-            order=order
-        )
-
-        # Audio components
-        self.recorder = SilenceRecorder(
-            start_timeout_ms=5000,
-            silence_threshold=350.0,
-            silence_duration_ms=900,
-            max_record_ms=10000,
-        )
-
-        self.stt = DeepgramSTT(DEEPGRAM_API_KEY)
-        self.tts = DeepgramTTS(DEEPGRAM_API_KEY)
-        self.player = AudioPlayer(sample_rate=24000)
-
-        self.no_response_count = 0
-
-    # --------------------------------------------------
-
-    async def speak(self, text: str):
-        print(f"\n🤖 AGENT: {text}")
-        audio = self.tts.synthesize(text)
-        self.player.play(audio)
-
-    # --------------------------------------------------
+# Speech providers by registry name (backends/registry.py); only the
+# chosen ones are imported, and their API keys checked, at startup
+STT_BACKEND = os.getenv("STT_BACKEND", "deepgram")
+TTS_BACKEND = os.getenv("TTS_BACKEND", "deepgram")
 
-    async def listen_and_transcribe(self) -> str:
-        audio_bytes = self.recorder.record()
+# Second provider, asked too when the first is slower than its recent
+# p90 (HEDGE_QUANTILE); whichever answers first is used
+STT_HEDGE = os.getenv("STT_HEDGE")
+TTS_HEDGE = os.getenv("TTS_HEDGE")
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.9"))
 
-        print("🧠 Transcribing user speech...")
-        transcript = self.stt.transcribe(audio_bytes).strip()
+# "turn" = silence-timer recording, "streaming" = real-time endpointing
+STT_MODE = os.getenv("STT_MODE", "turn")
 
-        if transcript:
-            print(f"📝 STT RESULT: {transcript}")
-        else:
-            print("📝 STT RESULT: <empty>")
-
-        return transcript
-
-    # --------------------------------------------------
-
-    async def run(self):
-        print("=" * 60)
-        print("🚚 Last-Mile Delivery Voice Agent (Outbound)")
-        print("=" * 60)
-
-        # Initial outbound greeting
-        await self.speak(
-            f"Hello, am I speaking with {self.order['customer_name']}?"
-        )
-
-        # Conversation loop
-        while True:
-            user_text = await self.listen_and_transcribe()
-
-            # ------------------------
-            # NO RESPONSE HANDLING
-            # ------------------------
-            if not user_text:
-                self.no_response_count += 1
-
-                if self.no_response_count == 1:
-                    await self.speak("Hello, can you hear me?")
-                    continue
+# Let the customer interrupt the agent (needs a headset or echo
+# cancellation when running on the local sound card)
+BARGE_IN = os.getenv("BARGE_IN", "0") == "1"
 
-                if self.no_response_count == 2:
-                    await self.speak(
-                        "It seems now is not a good time. "
-                        "We will try again later."
-                    )
-                    break
+# Finished-call records (transcript, states, timings) go here as JSONL
+CALL_EXPORT_DIR = os.getenv("CALL_EXPORT_DIR")
 
-                break
+# Log where each call's time went, stage by stage
+VOICE_TRACE = os.getenv("VOICE_TRACE", "0") == "1"
 
-            # ------------------------
-            # USER SPOKE
-            # ------------------------
-            self.no_response_count = 0
-            print(f"\n👤 HUMAN: {user_text}")
+# Start synthesizing the reply while the end-of-speech timer runs
+SPECULATIVE = os.getenv("SPECULATIVE", "0") == "1"
 
-            response = self.agent.handle_input(user_text)
-            await self.speak(response)
+# Send answers the phrase rules can't settle to an LLM (OpenAI-compatible
+# endpoint, Groq by default), waiting at most INTENT_LLM_BUDGET_MS
+INTENT_LLM = os.getenv("INTENT_LLM", "0") == "1"
+INTENT_LLM_URL = os.getenv("INTENT_LLM_URL", "https://api.groq.com/openai/v1")
+INTENT_LLM_MODEL = os.getenv("INTENT_LLM_MODEL", "llama-3.1-8b-instant")
+INTENT_LLM_BUDGET_MS = int(os.getenv("INTENT_LLM_BUDGET_MS", "350"))
 
-            # Stop if agent closed the conversation
-            if self.agent.state.name == "CLOSE":
-                break
+# Queue LLM lookups: batch those within INTENT_LLM_BATCH_MS into one
+# request, at most INTENT_LLM_RATE requests/sec (0: send directly)
+INTENT_LLM_BATCH_MS = float(os.getenv("INTENT_LLM_BATCH_MS", "0"))
+INTENT_LLM_RATE = float(os.getenv("INTENT_LLM_RATE", "0"))
 
 
 # --------------------------------------------------
 # ENTRYPOINT
 # --------------------------------------------------
 
+async def run_call(agent, llm_client=None):
+    try:
+        await agent.run()
+    finally:
+        if agent.intent_classifier is not None:
+            await agent.intent_classifier.aclose()
+        if llm_client is not None:
+            await llm_client.aclose()
+
+
 if __name__ == "__main__":
+    from backends.registry import STREAMING_STT_BACKENDS, STT_BACKENDS, TTS_BACKENDS
+    from tts.splice import TemplateTTS
+
+    exporter = None
     try:
         # Simulate outbound dialer providing phone number
         CUSTOMER_PHONE = "9876543210"
 
-        asyncio.run(
-            LastMileDeliveryVoiceAgent(CUSTOMER_PHONE).run()
+        stt = streaming_stt = None
+        if STT_MODE == "streaming":
+            streaming_stt = STREAMING_STT_BACKENDS.create(STT_BACKEND)
+        else:
+            stt = STT_BACKENDS.create_hedged(STT_BACKEND, STT_HEDGE, quantile=HEDGE_QUANTILE)
+        tts = TemplateTTS(
+            TTS_BACKENDS.create_hedged(TTS_BACKEND, TTS_HEDGE, quantile=HEDGE_QUANTILE)
+        )
+
+        if CALL_EXPORT_DIR:
+            from last_mile_delivery.export import CallExporter, JSONLWriter
+            exporter = CallExporter(JSONLWriter(CALL_EXPORT_DIR))
+
+        tracer = None
+        if VOICE_TRACE:
+            from telemetry.exporters import LogExporter
+            from telemetry.tracing import Tracer
+            tracer = Tracer([LogExporter()])
+
+        llm_client = intent_classifier = None
+        if INTENT_LLM:
+            from llm.chat_client import ChatClient
+            from last_mile_delivery.intent_llm import (
+                HybridIntentClassifier,
+                LLMIntentClassifier,
+            )
+            llm_key = os.getenv("GROQ_API_KEY")
+            if not llm_key:
+                raise RuntimeError("GROQ_API_KEY not set (INTENT_LLM=1)")
+            llm_client = ChatClient(
+                llm_key,
+                base_url=INTENT_LLM_URL,
+                model=INTENT_LLM_MODEL,
+            )
+            scheduler = None
+            if INTENT_LLM_BATCH_MS or INTENT_LLM_RATE:
+                scheduler = {
+                    "batch_window": INTENT_LLM_BATCH_MS / 1000,
+                    "rate": INTENT_LLM_RATE or None,
+                }
+            intent_classifier = HybridIntentClassifier(
+                LLMIntentClassifier(llm_client, scheduler=scheduler),
+                budget=INTENT_LLM_BUDGET_MS / 1000,
+            )
+
+        agent = LastMileDeliveryVoiceAgent(
+            CUSTOMER_PHONE,
+            stt=stt,
+            tts=tts,
+            streaming_stt=streaming_stt,
+            barge_in=BARGE_IN,
+            exporter=exporter,
+            tracer=tracer,
+            speculative=SPECULATIVE,
+            intent_classifier=intent_classifier,
         )
+        asyncio.run(run_call(agent, llm_client))
 
     except KeyboardInterrupt:
         print("\n👋 Call ended.")
+
+    finally:
+        close_repository()
+        if exporter is not None:
+            exporter.close()
@@ -2,34 +2,119 @@
 Conversation Memory
 Stores conversation turns per session.
 Compatible with agent code that expects list-like memory.
+
+Turns are compact __slots__ records (readable like the old
+{"role", "text"} dicts) in a rolling window of `max_turns` per
+session. Sessions are bounded too: end_session() drops a finished
+call (appending it to `archive_path` as a JSON line, if set), and
+once more than `max_sessions` are open the oldest is ended the same
+way.
 """
 
+import json
+import sys
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+
+
+class Message:
+    __slots__ = ("role", "text")
+
+    def __init__(self, role: str, text: str):
+        # Roles repeat on every turn; share one string object
+        self.role = sys.intern(role)
+        self.text = text
+
+    # ✅ dict-style access, as with the old {"role", "text"} entries
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {"role": self.role, "text": self.text}
+
+    def __eq__(self, other):
+        if isinstance(other, Message):
+            return self.role == other.role and self.text == other.text
+        if isinstance(other, dict):
+            return other == self.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.text!r})"
+
+
 class ConversationMemory:
-    def __init__(self):
-        self.sessions = {}
+    def __init__(
+        self,
+        max_turns: int = 50,
+        max_sessions: int = 10000,
+        archive_path: Path | str | None = None,
+    ):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.archive_path = Path(archive_path) if archive_path else None
+
+        self.sessions: OrderedDict[str, deque] = OrderedDict()
         self.current_session = None
+        self._lock = threading.Lock()
 
     def start_session(self, session_id: str):
-        self.sessions[session_id] = []
+        self.sessions[session_id] = deque(maxlen=self.max_turns)
+        self.sessions.move_to_end(session_id)
         self.current_session = session_id
 
+        while len(self.sessions) > self.max_sessions:
+            self.end_session(next(iter(self.sessions)))
+
+    def end_session(self, session_id: str | None = None):
+        """
+        Forget a finished session, archiving it first if configured.
+        """
+        session_id = session_id or self.current_session
+        turns = self.sessions.pop(session_id, None)
+        if session_id == self.current_session:
+            self.current_session = None
+
+        if turns is not None and self.archive_path is not None:
+            self._archive(session_id, turns)
+
+    def _archive(self, session_id: str, turns: deque):
+        line = json.dumps({
+            "session_id": session_id,
+            "turns": [[m.role, m.text] for m in turns],
+        })
+        with self._lock, open(self.archive_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
     def add_message(self, role: str, text: str):
         if not self.current_session:
             raise RuntimeError("No active session")
 
-        self.sessions[self.current_session].append({
-            "role": role,
-            "text": text
-        })
+        self.sessions[self.current_session].append(Message(role, text))
 
     # ✅ CRITICAL: compatibility with agent.memory.append(...)
     def append(self, item):
         if not self.current_session:
             raise RuntimeError("No active session")
 
+        if not isinstance(item, Message):
+            item = Message(item.get("role", ""), item.get("text", ""))
         self.sessions[self.current_session].append(item)
 
     def get_conversation(self):
         if not self.current_session:
             return []
-        return self.sessions[self.current_session]
+        return list(self.sessions[self.current_session])
@@ -1,29 +1,146 @@
 """
-Deepgram Speech-to-Text (Turn-based)
+Deepgram Speech-to-Text (Real-time streaming)
+Microphone frames go up a websocket as they are captured; interim
+and final transcripts come back while the caller is still talking.
+End of turn comes from Deepgram's endpointing (speech_final /
+UtteranceEnd) instead of a local silence timer.
+
+Deepgram takes telephony audio as is: open the stream with the line's
+format (audio.codec.negotiate(line, DeepgramStreamingSTT.formats))
+and RTP payloads go up without transcoding.
 """
 
-from deepgram import DeepgramClient, PrerecordedOptions
+import asyncio
+import json
+from urllib.parse import urlencode
 
+import websockets
 
-class DeepgramSTT:
-    def __init__(self, api_key: str):
-        self.client = DeepgramClient(api_key)
+from audio.codec import ALAW_8K, LINEAR16_8K, LINEAR16_16K, LINEAR16_24K, MULAW_8K, AudioFormat
 
-    def transcribe(self, audio_bytes: bytes) -> str:
-        options = PrerecordedOptions(
-            model="nova-2",
-            smart_format=True,
-            language="en",
-        )
+LISTEN_URL = "wss://api.deepgram.com/v1/listen"
+
+
+def _connect(url: str, headers: dict):
+    # websockets 14 renamed extra_headers -> additional_headers
+    if int(websockets.__version__.split(".")[0]) >= 14:
+        return websockets.connect(url, additional_headers=headers)
+    return websockets.connect(url, extra_headers=headers)
+
+
+class DeepgramStreamingSTT:
+    # Input formats, preferred first
+    formats = (LINEAR16_16K, MULAW_8K, ALAW_8K, LINEAR16_8K, LINEAR16_24K)
+
+    def __init__(
+        self,
+        api_key: str,
+        sample_rate: int = 16000,
+        encoding: str = "linear16",
+        language: str = "en",
+        model: str = "nova-2",
+        endpointing_ms: int = 300,
+        utterance_end_ms: int = 1000,
+        url: str = LISTEN_URL,
+    ):
+        self.api_key = api_key
+        self.params = {
+            "model": model,
+            "language": language,
+            "encoding": encoding,
+            "sample_rate": sample_rate,
+            "channels": 1,
+            "smart_format": "true",
+            "interim_results": "true",
+            "endpointing": endpointing_ms,
+            "utterance_end_ms": utterance_end_ms,
+            "vad_events": "true",
+        }
+        self.url = url
+        self.format = AudioFormat(encoding, sample_rate)
+
+        self._ws = None
+        self._receiver = None
+        self._on_result = None
+        # Set once we end the stream; any other close is a failure
+        self._closing = False
+
+    # --------------------------------------------------
 
-        response = self.client.listen.prerecorded.v("1").transcribe_file(
-            {
-                "buffer": audio_bytes,
-                "mimetype": "audio/wav",
-            },
-            options,
+    async def start(self, on_result):
+        """
+        Open the stream. `on_result(transcript, is_final, speech_final)`
+        is called for every transcript Deepgram sends back.
+        """
+        self._on_result = on_result
+        self._closing = False
+        self._ws = await _connect(
+            f"{self.url}?{urlencode(self.params)}",
+            {"Authorization": f"Token {self.api_key}"},
         )
+        self._receiver = asyncio.create_task(self._receive())
+
+    @property
+    def receiver(self) -> asyncio.Task | None:
+        """
+        The task reading results; it fails with ConnectionError when
+        the stream closes without finish() / close().
+        """
+        return self._receiver
+
+    async def send(self, frame: bytes):
+        await self._ws.send(frame)
+
+    async def finish(self):
+        """
+        Flush pending audio, wait for the last transcripts, close.
+        """
+        if self._ws is None:
+            return
+
+        self._closing = True
+        try:
+            await self._ws.send(json.dumps({"type": "CloseStream"}))
+            await self._receiver
+        finally:
+            await self._ws.close()
+            self._ws = None
+
+    async def close(self):
+        self._closing = True
+        if self._receiver:
+            self._receiver.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    # --------------------------------------------------
+
+    async def _receive(self):
+        try:
+            async for message in self._ws:
+                if isinstance(message, bytes):
+                    continue
+                self._dispatch(json.loads(message))
+        except websockets.ConnectionClosed as e:
+            if not self._closing:
+                raise ConnectionError(f"Deepgram stream closed: {e}") from e
+            return
+        if not self._closing:
+            raise ConnectionError("Deepgram closed the stream")
+
+    def _dispatch(self, message: dict):
+        kind = message.get("type")
+
+        if kind == "Results":
+            alternatives = message["channel"]["alternatives"]
+            transcript = alternatives[0]["transcript"] if alternatives else ""
+            self._on_result(
+                transcript,
+                bool(message.get("is_final")),
+                bool(message.get("speech_final")),
+            )
 
-        return (
-            response["results"]["channels"][0]["alternatives"][0]["transcript"]
-        )
\ No newline at end of file
+        elif kind == "UtteranceEnd":
+            # Endpoint without a speech_final result (e.g. noisy line)
+            self._on_result("", True, True)
@@ -3,6 +3,9 @@ Deepgram Speech-to-Text (Turn-based, non-streaming)
 Compatible with current Deepgram SDK
 """
 
+import asyncio
+from concurrent.futures import Executor
+
 from deepgram import DeepgramClient, PrerecordedOptions
 
 
@@ -31,4 +34,25 @@ class DeepgramSTT:
 
         return (
             response["results"]["channels"][0]["alternatives"][0]["transcript"]
-        )
\ No newline at end of file
+        )
+
+
+class AsyncDeepgramSTT(DeepgramSTT):
+    """
+    Non-blocking DeepgramSTT.
+    The SDK call runs in `executor` (the loop's default if None).
+    Cancelling the awaiting task returns at once; the request
+    finishes in the background and its result is dropped.
+    """
+
+    def __init__(self, api_key: str, executor: Executor | None = None):
+        super().__init__(api_key)
+        self.executor = executor
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            super().transcribe,
+            audio_bytes,
+        )
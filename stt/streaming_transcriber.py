@@ -0,0 +1,111 @@
+"""
+Streaming Transcriber
+Keeps one streaming STT session open for the whole call and hands
+the voice loop one FinalTranscript per caller turn.
+
+If the audio pump or the STT client's receiver dies (failed send,
+connection lost), next_turn() raises ConnectionError instead of
+timing out, so the call ends as dropped rather than unanswered.
+"""
+
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+from stt.stt_adapter import STTAdapter
+from stt.streaming_events import PartialTranscript, FinalTranscript
+
+
+class StreamingTranscriber:
+    def __init__(
+        self,
+        stt_client,
+        frames: AsyncIterator[bytes],
+        on_partial: Callable[[PartialTranscript], None] | None = None,
+        language: str = "en",
+    ):
+        self.stt_client = stt_client
+        self.frames = frames
+        self.on_partial = on_partial
+        self.adapter = STTAdapter(
+            stt_client,
+            on_transcript=self._on_final,
+            on_partial=self._on_partial,
+            language=language,
+        )
+
+        # Interim text of the turn after the last final, if any
+        self.partial: str | None = None
+
+        # FinalTranscripts, or the ConnectionError that ended the stream
+        self._finals: asyncio.Queue = asyncio.Queue()
+        self._speech = asyncio.Event()
+        self._pump = None
+
+    # --------------------------------------------------
+
+    def _on_partial(self, event: PartialTranscript):
+        self.partial = event.text
+        self._speech.set()
+        if self.on_partial:
+            self.on_partial(event)
+
+    def _on_final(self, event: FinalTranscript):
+        self.partial = None
+        self._speech.set()
+        self._finals.put_nowait(event)
+
+    async def _send_frames(self):
+        async with aclosing(self.frames) as frames:
+            async for frame in frames:
+                await self.stt_client.send(frame)
+
+    def _watch(self, task: asyncio.Task, name: str):
+        def failed(task: asyncio.Task):
+            if task.cancelled() or task.exception() is None:
+                return
+            error = ConnectionError(f"Streaming STT {name} failed: {task.exception()!r}")
+            error.__cause__ = task.exception()
+            self._finals.put_nowait(error)
+            self._speech.set()
+        task.add_done_callback(failed)
+
+    # --------------------------------------------------
+
+    async def start(self):
+        await self.adapter.start()
+        self._pump = asyncio.create_task(self._send_frames())
+        self._watch(self._pump, "audio pump")
+        receiver = getattr(self.stt_client, "receiver", None)
+        if receiver is not None:
+            self._watch(receiver, "receiver")
+
+    async def next_turn(self, timeout: float | None = None) -> FinalTranscript | None:
+        """
+        Wait for the caller's next endpointed utterance.
+        Returns None if nothing was said within `timeout` seconds;
+        raises ConnectionError once the stream has failed.
+        """
+        try:
+            event = await asyncio.wait_for(self._finals.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if isinstance(event, ConnectionError):
+            self._finals.put_nowait(event)   # and on every later turn
+            raise event
+        return event
+
+    async def wait_for_speech(self):
+        """
+        Resolve on the next recognised words (barge-in). Words that
+        arrive are kept and still returned by next_turn().
+        """
+        if not self._finals.empty():
+            return
+        self._speech.clear()
+        await self._speech.wait()
+
+    async def close(self):
+        if self._pump:
+            self._pump.cancel()
+        await self.stt_client.close()
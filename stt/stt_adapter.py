@@ -3,10 +3,25 @@ STT Adapter
 Ensures only FINAL transcripts reach the agent
 """
 
+from stt.streaming_events import PartialTranscript, FinalTranscript
+
+
 class STTAdapter:
-    def __init__(self, stt_client, on_transcript):
+    """
+    Turns raw streaming results into transcript events.
+
+    Final segments are collected until the STT client reports an
+    endpoint (speech_final), then the whole turn is delivered as one
+    FinalTranscript. Everything heard so far in the turn is offered
+    as a PartialTranscript whenever an interim result arrives.
+    """
+
+    def __init__(self, stt_client, on_transcript, on_partial=None, language: str = "en"):
         self.stt_client = stt_client
         self.on_transcript = on_transcript
+        self.on_partial = on_partial
+        self.language = language
+        self._segments: list[str] = []
 
     # -------------------------------
 
@@ -18,6 +33,21 @@ class STTAdapter:
 
     # -------------------------------
 
-    def _handle_result(self, transcript: str, is_final: bool):
-        if is_final and transcript.strip():
-            self.on_transcript(transcript)
\ No newline at end of file
+    def _handle_result(self, transcript: str, is_final: bool, speech_final: bool | None = None):
+        # Clients without endpointing: every final ends the turn
+        if speech_final is None:
+            speech_final = is_final
+
+        if not is_final:
+            if self.on_partial and transcript.strip():
+                text = " ".join(self._segments + [transcript.strip()])
+                self.on_partial(PartialTranscript(text=text))
+            return
+
+        if transcript.strip():
+            self._segments.append(transcript.strip())
+
+        if speech_final and self._segments:
+            text = " ".join(self._segments)
+            self._segments = []
+            self.on_transcript(FinalTranscript(text=text, language=self.language))
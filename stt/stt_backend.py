@@ -0,0 +1,31 @@
+"""
+STT Backend - Abstract interface for speech-to-text services
+(the counterpart of tts/tts_adapter.py)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Awaitable, Protocol
+
+
+class SpeechToText(Protocol):
+    """
+    What the voice loop calls on a turn-based STT: providers need not
+    inherit from anything. transcribe() may be sync (run in a worker
+    thread) or async.
+    """
+
+    def transcribe(self, audio_bytes: bytes) -> str | Awaitable[str]:
+        ...
+
+
+class STTBackend(ABC):
+    """
+    Base class for STT backends written against this interface.
+    """
+
+    @abstractmethod
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        """
+        Transcribe one turn of audio (16 kHz mono WAV / linear16).
+        """
+        raise NotImplementedError
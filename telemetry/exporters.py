@@ -0,0 +1,117 @@
+"""
+Trace Exporters
+---------------
+
+Called with each CallTrace as the call ends (see tracing.py).
+
+  LogExporter          one summary line per call
+  PrometheusExporter   text exposition of the tracer's histograms
+                       (and of any extra gauges, e.g. the intent
+                       LLM queue), optionally served over HTTP
+                       (/metrics)
+  MemoryCollector      keeps every trace, for tests and benchmarks
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from telemetry.tracing import STAGES
+
+
+class LogExporter:
+    def __init__(self, log=print):
+        self.log = log
+
+    def export(self, trace):
+        parts = []
+        for stage in STAGES:
+            h = trace.stages.get(stage)
+            if h is not None:
+                parts.append(f"{stage}={h.mean * 1000:.0f}ms")
+        self.log(f"⏱️ {trace.call_id} {trace.duration:.2f}s | " + " ".join(parts))
+
+
+class MemoryCollector:
+    def __init__(self):
+        self.traces = []
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def samples(self, stage: str) -> list[float]:
+        with self._lock:
+            return [s for t in self.traces for name, s in t.spans if name == stage]
+
+
+class PrometheusExporter:
+    """
+    Renders the tracer's cumulative histograms; nothing to do per call.
+    """
+
+    METRIC = "voice_stage_seconds"
+
+    def __init__(self, tracer, gauges: dict[str, Callable[[], dict]] | None = None):
+        """
+        gauges   prefix -> callable returning {name: number}, rendered
+                 as `<prefix>_<name>` gauges on every scrape
+        """
+        self.tracer = tracer
+        self.gauges = gauges or {}
+        self._server = None
+
+    def export(self, trace):
+        pass
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.METRIC} Time spent per voice loop stage.",
+            f"# TYPE {self.METRIC} histogram",
+        ]
+        for stage, h in sorted(self.tracer.histograms().items()):
+            for bound, count in h.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.METRIC}_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'{self.METRIC}_sum{{stage="{stage}"}} {h.sum}')
+            lines.append(f'{self.METRIC}_count{{stage="{stage}"}} {h.count}')
+        lines.append("# TYPE voice_calls_total counter")
+        lines.append(f"voice_calls_total {self.tracer.calls}")
+        for prefix, read in sorted(self.gauges.items()):
+            for name, value in read().items():
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> int:
+        """
+        Serve /metrics from a background thread. Returns the port
+        (pass 0 to pick a free one).
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,143 @@
+"""
+Startup Profile
+---------------
+
+Import cost of a worker's entry point, per module, from Python's own
+`-X importtime` report, measured in a fresh interpreter (a cold start,
+as when the dialer scales out):
+
+    python -m telemetry.startup main --budget-ms 150
+    python -m telemetry.startup last_mile_delivery.voice_agent \\
+        --backends stt=deepgram,tts=deepgram
+
+Interpreter startup itself (site, encodings) is left out of the total.
+Exits with status 1 when the total is over the budget.
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int           # 0: imported by the profiled code itself
+
+
+def parse_importtime(report: str) -> list[ImportTime]:
+    """
+    Records from `-X importtime` stderr, in the order printed
+    (a module's line comes after those of everything it imported).
+    """
+    records = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        records.append(ImportTime(
+            module=stripped,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return records
+
+
+def _importtime(code: str, python: str) -> list[ImportTime]:
+    done = subprocess.run(
+        [python, "-X", "importtime", "-c", code], capture_output=True, text=True
+    )
+    if done.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{done.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(done.stderr)
+
+
+class StartupProfile:
+    def __init__(self, modules: list[str], python: str = sys.executable):
+        self.modules = modules
+        baseline = {r.module for r in _importtime("pass", python)}
+        # Everything the interpreter imports anyway doesn't count
+        self.records = [
+            r for r in _importtime("; ".join(f"import {m}" for m in modules), python)
+            if r.module not in baseline
+        ]
+
+    @property
+    def total_ms(self) -> float:
+        return sum(r.cumulative_us for r in self.records if r.depth == 0) / 1000
+
+    def by_package(self) -> dict[str, float]:
+        """
+        Self time (ms) per top-level package.
+        """
+        packages = defaultdict(float)
+        for r in self.records:
+            packages[r.module.partition(".")[0]] += r.self_us / 1000
+        return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+    def slowest(self, count: int = 15) -> list[ImportTime]:
+        return sorted(self.records, key=lambda r: -r.self_us)[:count]
+
+    def report(self, budget_ms: float | None = None, count: int = 15) -> str:
+        status = ""
+        if budget_ms is not None:
+            status = f" (budget {budget_ms:.0f} ms) " + ("✅" if self.total_ms <= budget_ms else "❌")
+        lines = [
+            f"⏱️ Startup imports for {', '.join(self.modules)}: "
+            f"{self.total_ms:.1f} ms, {len(self.records)} modules{status}",
+            f"  {'package':<28}{'self ms':>9}",
+        ]
+        for package, ms in list(self.by_package().items())[:count]:
+            lines.append(f"  {package:<28}{ms:>9.1f}")
+        lines.append(f"  {'slowest modules':<40}{'self ms':>9}{'cum ms':>9}")
+        for r in self.slowest(count):
+            lines.append(
+                f"  {r.module:<40}{r.self_us / 1000:>9.1f}{r.cumulative_us / 1000:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+# --------------------------------------------------
+# ENTRYPOINT
+# --------------------------------------------------
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile of an entry point")
+    parser.add_argument("modules", nargs="*", default=["main"],
+                        help="modules to import (default: main)")
+    parser.add_argument("--backends", metavar="KIND=NAME,...",
+                        help="also import these registry backends, e.g. stt=deepgram,tts=deepgram")
+    parser.add_argument("--budget-ms", type=float,
+                        help="exit with status 1 if imports take longer")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    modules = list(args.modules)
+    if args.backends:
+        from backends.registry import backend_modules
+
+        config = dict(item.split("=", 1) for item in args.backends.split(","))
+        modules += backend_modules(config)
+
+    try:
+        profile = StartupProfile(modules)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 2
+    print(profile.report(args.budget_ms, args.top))
+    if args.budget_ms is not None and profile.total_ms > args.budget_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
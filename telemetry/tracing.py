@@ -0,0 +1,277 @@
+"""
+Voice Loop Tracing
+------------------
+
+Where a turn's time goes, stage by stage:
+
+    vad_wait         listening -> caller starts speaking
+    end_of_speech    caller stops speaking -> recording ends
+    listen           whole record() call (streaming mode: next_turn)
+    stt              transcription request
+    intent           hybrid intent classification (LLM escalations)
+    handle_input     agent / dialog engine
+    tts_first_byte   synthesis request -> first audio
+    tts_total        synthesis request -> last audio
+    playback         agent audio start -> playback finished
+    turn             caller audio captured -> agent audio starts
+
+    tracer = Tracer([LogExporter()])
+    trace = tracer.call("order_101")
+    with trace.span(STT):
+        ...
+    trace.record(TTS_FIRST_BYTE, 0.21)
+    trace.end()                   # merge into tracer totals, export
+
+Each CallTrace keeps its own per-stage histograms; end() merges them
+into the tracer's. With tracing off, NULL_TRACER hands out a shared
+do-nothing trace, so instrumented code pays one method call per stage.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+VAD_WAIT = "vad_wait"
+END_OF_SPEECH = "end_of_speech"
+LISTEN = "listen"
+STT = "stt"
+INTENT = "intent"
+HANDLE_INPUT = "handle_input"
+TTS_FIRST_BYTE = "tts_first_byte"
+TTS_TOTAL = "tts_total"
+PLAYBACK = "playback"
+TURN = "turn"
+
+STAGES = (
+    VAD_WAIT, END_OF_SPEECH, LISTEN, STT, INTENT, HANDLE_INPUT,
+    TTS_FIRST_BYTE, TTS_TOTAL, PLAYBACK, TURN,
+)
+
+# Bucket upper bounds in seconds (the last bucket is +Inf)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5,
+    0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0,
+)
+
+
+# --------------------------------------------------
+# HISTOGRAM
+# --------------------------------------------------
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different buckets")
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate, interpolating inside the bucket (narrowed to the
+        observed min / max). 0.0 when empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = max(self.bounds[i - 1] if i else 0.0, self.min)
+                upper = min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def cumulative(self):
+        """
+        (upper bound, count <= bound) pairs, Prometheus style.
+        """
+        total = 0
+        for i, n in enumerate(self.counts):
+            total += n
+            yield (self.bounds[i] if i < len(self.bounds) else float("inf")), total
+
+
+# --------------------------------------------------
+# TRACES
+# --------------------------------------------------
+
+class _Span:
+    __slots__ = ("trace", "stage", "start")
+
+    def __init__(self, trace, stage: str):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.record(self.stage, time.perf_counter() - self.start)
+
+
+class CallTrace:
+    """
+    Stage timings for one call.
+    """
+
+    enabled = True
+
+    def __init__(self, tracer: "Tracer", call_id: str):
+        self.tracer = tracer
+        self.call_id = call_id
+        self.stages: dict[str, Histogram] = {}
+        self.spans: list[tuple[str, float]] = []   # in order, seconds
+        self.started = time.perf_counter()
+        self.duration = 0.0
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def record(self, stage: str, seconds: float):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram(self.tracer.buckets)
+        histogram.observe(seconds)
+        self.spans.append((stage, seconds))
+
+    def end(self):
+        self.duration = time.perf_counter() - self.started
+        self.tracer._finish(self)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+class _NullTrace:
+    __slots__ = ()
+
+    enabled = False
+    call_id = ""
+
+    def span(self, stage: str):
+        return _NULL_SPAN
+
+    def record(self, stage: str, seconds: float):
+        pass
+
+    def end(self):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+NULL_TRACE = _NullTrace()
+
+
+# --------------------------------------------------
+# TRACERS
+# --------------------------------------------------
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, exporters=(), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.exporters = list(exporters)
+        self.buckets = buckets
+        self.stages: dict[str, Histogram] = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, call_id: str) -> CallTrace:
+        return CallTrace(self, call_id)
+
+    def _finish(self, trace: CallTrace):
+        with self._lock:
+            self.calls += 1
+            for stage, histogram in trace.stages.items():
+                total = self.stages.get(stage)
+                if total is None:
+                    total = self.stages[stage] = Histogram(self.buckets)
+                total.merge(histogram)
+
+        for exporter in self.exporters:
+            exporter.export(trace)
+
+    def histograms(self) -> dict[str, Histogram]:
+        """
+        Copy of the per-stage totals.
+        """
+        with self._lock:
+            copies = {}
+            for stage, histogram in self.stages.items():
+                copies[stage] = Histogram(self.buckets)
+                copies[stage].merge(histogram)
+            return copies
+
+    def report(self) -> str:
+        """
+        Stage table across all finished calls, slowest p95 first.
+        """
+        rows = sorted(
+            self.histograms().items(), key=lambda item: item[1].quantile(0.95), reverse=True
+        )
+        lines = [
+            f"{'stage':<16} {'count':>7} {'mean ms':>9} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+            "-" * 70,
+        ]
+        for stage, h in rows:
+            lines.append(
+                f"{stage:<16} {h.count:>7} {h.mean * 1000:>9.1f} "
+                f"{h.quantile(0.5) * 1000:>8.1f} {h.quantile(0.95) * 1000:>8.1f} "
+                f"{h.quantile(0.99) * 1000:>8.1f} {h.max * 1000:>8.1f}"
+            )
+        return "\n".join(lines)
+
+
+class NullTracer:
+    """
+    Tracing off: every call gets the shared no-op trace.
+    """
+
+    enabled = False
+    calls = 0
+
+    def call(self, call_id: str) -> _NullTrace:
+        return NULL_TRACE
+
+    def report(self) -> str:
+        return "tracing disabled"
+
+
+NULL_TRACER = NullTracer()
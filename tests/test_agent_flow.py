@@ -0,0 +1,81 @@
+import pytest
+
+from last_mile_delivery.agent import ConversationState, LastMileDeliveryAgent
+from memory.memory import ConversationMemory
+
+ORDER = {
+    "order_id": "101",
+    "customer_name": "Raj Kumar",
+    "phone": "9876543210",
+    "available_dates": "Jan 25|Jan 28|Jan 30",
+}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    for name in ("mark_scheduled", "mark_neighbor_delivery", "cancel_delivery"):
+        monkeypatch.setattr(
+            f"last_mile_delivery.agent.{name}",
+            lambda *args, name=name: calls.append((name, *args)),
+        )
+    return calls
+
+
+def _agent():
+    memory = ConversationMemory()
+    memory.start_session("test")
+    return LastMileDeliveryAgent(memory, ORDER)
+
+
+def test_schedule_flow(calls):
+    agent = _agent()
+    assert agent.start() == "Hello, am I speaking with Raj Kumar?"
+    assert agent.state == ConversationState.VERIFY_PERSON
+
+    reply = agent.handle_input("yes speaking")
+    assert "Jan 25, Jan 28, Jan 30" in reply
+
+    assert agent.handle_input("the 28th") == (
+        "Just to confirm, should we deliver the parcel on Jan 28?"
+    )
+    assert agent.handle_input("yes").startswith("Your delivery has been scheduled for Jan 28")
+    assert agent.state == ConversationState.CLOSE
+    assert calls == [("mark_scheduled", "101", "Jan 28")]
+    assert len(agent.memory.get_conversation()) == 7
+
+
+def test_neighbor_flow(calls):
+    agent = _agent()
+    agent.start()
+    agent.handle_input("yes")
+    agent.handle_input("I won't be available")
+    assert agent.state == ConversationState.OFFER_NEIGHBOR
+
+    agent.handle_input("okay")
+    agent.handle_input("x")
+    assert agent.state == ConversationState.COLLECT_NEIGHBOR_NAME
+
+    assert "Ramesh" in agent.handle_input("ramesh")
+    agent.handle_input("yes")
+    assert calls == [("mark_neighbor_delivery", "101", "Jan 25", "Ramesh")]
+
+
+def test_wrong_person_and_reprompts(calls):
+    agent = _agent()
+    agent.start()
+    assert agent.handle_input("hmm") == "Just to confirm, am I speaking with the correct person?"
+    agent.handle_input("no, wrong number")
+    assert agent.state == ConversationState.CLOSE
+    assert agent.handle_input("bye") == "Thank you for your time. Have a good day."
+    assert calls == []
+
+
+def test_cancel_flow(calls):
+    agent = _agent()
+    agent.start()
+    agent.handle_input("yes")
+    agent.handle_input("no")
+    agent.handle_input("no")
+    assert agent.state == ConversationState.CLOSE
+    assert calls == [("cancel_delivery", "101")]
@@ -0,0 +1,87 @@
+import numpy as np
+
+from audio.ring_buffer import RingBuffer
+
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(8)
+    out = np.zeros(5, dtype=np.int16)
+
+    assert ring.write(np.arange(6, dtype=np.int16)) == 6
+    assert ring.read_into(out) == 5
+    assert list(out) == [0, 1, 2, 3, 4]
+
+    # Write across the end of the backing array
+    assert ring.write(np.arange(10, 17, dtype=np.int16)) == 7
+    assert ring.available == 8
+    assert ring.free == 0
+
+    out = np.zeros(8, dtype=np.int16)
+    assert ring.read_into(out) == 8
+    assert list(out) == [5, 10, 11, 12, 13, 14, 15, 16]
+
+
+def test_ring_buffer_partial_write_and_read():
+    ring = RingBuffer(4)
+    assert ring.write(np.arange(6, dtype=np.int16)) == 4
+
+    out = np.full(6, -1, dtype=np.int16)
+    assert ring.read_into(out) == 4
+    assert list(out) == [0, 1, 2, 3, -1, -1]
+    assert ring.read_into(out) == 0
+
+
+# --------------------------------------------------
+# VAD
+# --------------------------------------------------
+
+from audio.vad import EnergyVAD
+
+FRAME = 320  # 20 ms at 16 kHz
+
+
+def _noise(level: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(-level, level, FRAME).astype(np.int16)
+
+
+def _tone(amplitude: int) -> np.ndarray:
+    t = np.arange(FRAME) / 16000
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def test_vad_energy_matches_float_math():
+    vad = EnergyVAD()
+    frame = np.full(FRAME, -32768, dtype=np.int16)
+    assert vad.energy(frame) == FRAME * 32768 ** 2
+
+    frame = _noise(5000)
+    assert vad.energy(frame) == int(np.sum(frame.astype(np.float64) ** 2))
+
+
+def test_vad_onset_and_hangover():
+    vad = EnergyVAD(onset_ms=40, hangover_ms=100)
+
+    assert not any(vad.is_speech(_noise(50, i)) for i in range(10))
+
+    # A single click does not start speech
+    assert not vad.is_speech(_tone(8000))
+    assert not vad.is_speech(_noise(50))
+
+    assert not vad.is_speech(_tone(8000))
+    assert vad.is_speech(_tone(8000))
+
+    # Short pause is bridged, a longer one ends speech
+    decisions = [vad.is_speech(_noise(50, i)) for i in range(8)]
+    assert decisions[:5] == [True] * 5
+    assert not decisions[-1]
+
+
+def test_vad_adapts_to_noise_floor():
+    vad = EnergyVAD(threshold=350)
+
+    # Loud background hum above the absolute threshold
+    hum = [vad.is_speech(_noise(2000, i)) for i in range(50)]
+    assert not any(hum)
+
+    assert [vad.is_speech(_tone(12000)) for _ in range(3)][-1]
@@ -0,0 +1,434 @@
+import asyncio
+import io
+import sys
+import threading
+import time
+import types
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+
+class CallbackStop(Exception):
+    pass
+
+
+class FakeInputStream:
+    """
+    Delivers `device.source` block by block from a driver thread,
+    then line noise until closed.
+    """
+
+    def __init__(self, device, samplerate, channels, dtype, blocksize, callback=None):
+        self.device = device
+        self.channels = channels
+        self.blocksize = blocksize
+        self.callback = callback
+        self.closed = False
+        self._position = 0
+        self._thread = None
+        device.streams.append(self)
+
+    def _block(self) -> np.ndarray:
+        source = self.device.source
+        block = source[self._position:self._position + self.blocksize]
+        self._position += self.blocksize
+        if len(block) < self.blocksize:
+            noise = self.device.rng.normal(0, 30, self.blocksize - len(block))
+            block = np.concatenate([block, noise.astype(np.int16)])
+        return np.repeat(block[:, None], self.channels, axis=1)
+
+    def _run(self):
+        while not self.closed:
+            self.device.callback_threads.add(threading.get_ident())
+            self.callback(self._block(), self.blocksize, None, None)
+            time.sleep(self.device.block_delay)
+
+    def read(self, frames):
+        return self._block(), False
+
+    def __enter__(self):
+        if self.callback is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+        if self._thread is not None:
+            self._thread.join()
+
+
+class FakeOutputStream:
+    def __init__(self, device, samplerate, channels, dtype, callback, finished_callback, blocksize=240):
+        self.device = device
+        self.channels = channels
+        self.callback = callback
+        self.finished_callback = finished_callback
+        self.blocksize = blocksize
+        self.aborted = self.closed = False
+        self.played = []
+        self._thread = None
+        device.streams.append(self)
+
+    def _run(self):
+        try:
+            while not (self.aborted or self.closed):
+                outdata = np.zeros((self.blocksize, self.channels), dtype=np.int16)
+                try:
+                    self.callback(outdata, self.blocksize, None, None)
+                except CallbackStop:
+                    self.played.append(outdata[:, 0].copy())
+                    break
+                self.played.append(outdata[:, 0].copy())
+                time.sleep(self.device.block_delay)
+        finally:
+            self.finished_callback()
+
+    def abort(self):
+        self.aborted = True
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+        self._thread.join()
+
+
+def _fake_sounddevice(source=None, block_delay=0.001):
+    device = types.ModuleType("sounddevice")
+    device.source = np.zeros(0, dtype=np.int16) if source is None else source
+    device.block_delay = block_delay
+    device.rng = np.random.default_rng(0)
+    device.streams = []
+    device.callback_threads = set()
+    device.CallbackStop = CallbackStop
+    device.InputStream = lambda **kw: FakeInputStream(device, **kw)
+    device.OutputStream = lambda **kw: FakeOutputStream(device, **kw)
+    return device
+
+
+@pytest.fixture
+def sounddevice(monkeypatch):
+    """
+    Installs a fake sounddevice module; returns a function that
+    configures it (caller audio, driver block delay).
+    """
+    device = _fake_sounddevice()
+    monkeypatch.setitem(sys.modules, "sounddevice", device)
+
+    import audio.playback
+    import audio.recorder
+
+    def install(source=None, block_delay=0.001):
+        fake = _fake_sounddevice(source, block_delay)
+        monkeypatch.setattr(audio.recorder, "sd", fake)
+        monkeypatch.setattr(audio.playback, "sd", fake)
+        return fake
+
+    return install
+
+
+def _hiss(ms: int, rate: int = 16000) -> np.ndarray:
+    return np.random.default_rng(1).normal(0, 30, rate * ms // 1000).astype(np.int16)
+
+
+def _tone(ms: int, rate: int = 16000, amplitude: int = 6000) -> np.ndarray:
+    t = np.arange(rate * ms // 1000) / rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def _seconds(wav: bytes) -> float:
+    with wave.open(io.BytesIO(wav)) as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+# --------------------------------------------------
+# RECORDER
+# --------------------------------------------------
+
+def test_recorder_hands_driver_frames_to_the_loop(sounddevice):
+    from audio.recorder import AsyncSilenceRecorder
+
+    device = sounddevice(np.concatenate([_hiss(200), _tone(400), _hiss(2000)]))
+    recorder = AsyncSilenceRecorder(silence_duration_ms=300)
+
+    async def run():
+        return threading.get_ident(), await recorder.record()
+
+    loop_thread, wav = asyncio.run(run())
+    assert device.callback_threads and loop_thread not in device.callback_threads
+    assert device.streams[0].closed
+    assert recorder.speech_started is not None
+
+    # Lead-in + speech + VAD hangover + silence timer
+    assert 0.9 <= _seconds(wav) <= 1.2
+
+
+def test_recorder_start_timeout(sounddevice):
+    from audio.recorder import AsyncSilenceRecorder
+
+    device = sounddevice()
+    recorder = AsyncSilenceRecorder(start_timeout_ms=200)
+    wav = asyncio.run(recorder.record())
+
+    assert recorder.speech_started is None
+    assert _seconds(wav) == pytest.approx(0.2)
+    assert device.streams[0].closed
+
+
+def test_recorder_ends_on_silence_with_preroll(sounddevice):
+    from audio.recorder import AsyncSilenceRecorder
+
+    sounddevice(np.concatenate([_hiss(100), _tone(200), _hiss(2000)]))
+    recorder = AsyncSilenceRecorder(silence_duration_ms=300)
+    wav = asyncio.run(recorder.record(preroll=_tone(100)))
+
+    # Preroll + gap + speech + hangover + silence timer
+    assert 0.85 <= _seconds(wav) <= 0.95
+
+
+def test_cancelling_record_closes_the_stream(sounddevice):
+    from audio.recorder import AsyncSilenceRecorder
+
+    device = sounddevice(_tone(60000))
+    recorder = AsyncSilenceRecorder(max_record_ms=60000)
+
+    async def run():
+        task = asyncio.create_task(recorder.record())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert device.streams[0].closed
+
+
+def test_sync_recorder_reads_blocking_stream(sounddevice):
+    from audio.recorder import SilenceRecorder
+
+    sounddevice(np.concatenate([_hiss(200), _tone(300), _hiss(2000)]))
+    wav = SilenceRecorder(silence_duration_ms=300).record()
+    assert 0.95 <= _seconds(wav) <= 1.05
+
+
+def test_barge_in_ignores_clicks(sounddevice):
+    from audio.recorder import AsyncSilenceRecorder
+
+    # A 20 ms click, then the caller really talks over the agent
+    sounddevice(np.concatenate([
+        _hiss(200), _tone(20, amplitude=9000), _hiss(400), _tone(500, amplitude=9000),
+    ]))
+    recorder = AsyncSilenceRecorder(preroll_ms=0)
+    heard = asyncio.run(recorder.wait_for_speech(min_speech_ms=200))
+
+    # Only the 200 ms of real speech, not the click and its aftermath
+    assert len(heard) == 16000 * 200 // 1000
+    rms = np.sqrt(np.mean(heard.reshape(-1, 320).astype(float) ** 2, axis=1))
+    assert (rms > 3000).all()
+
+
+# --------------------------------------------------
+# PLAYER
+# --------------------------------------------------
+
+def test_player_plays_everything_then_finishes(sounddevice):
+    from audio.playback import AsyncAudioPlayer
+
+    device = sounddevice()
+    audio = _tone(100, rate=24000)
+    asyncio.run(AsyncAudioPlayer().play(audio.tobytes()))
+
+    stream = device.streams[0]
+    played = np.concatenate(stream.played)
+    np.testing.assert_array_equal(played[:len(audio)], audio)
+    assert not played[len(audio):].any() and not stream.aborted
+
+
+def test_player_stream_joins_split_samples(sounddevice):
+    from audio.playback import AsyncAudioPlayer
+
+    device = sounddevice()
+    audio = _tone(100, rate=24000).tobytes()
+
+    async def chunks():
+        for start in range(0, len(audio), 999):
+            yield audio[start:start + 999]
+
+    asyncio.run(AsyncAudioPlayer().play_stream(chunks()))
+    # Underruns (before the first chunk lands) play as silence
+    played = np.concatenate(device.streams[0].played)
+    expected = np.frombuffer(audio, dtype=np.int16)
+    np.testing.assert_array_equal(played[played != 0], expected[expected != 0])
+
+
+def test_cancelling_playback_aborts_the_stream(sounddevice):
+    from audio.playback import AsyncAudioPlayer
+
+    device = sounddevice(block_delay=0.01)
+
+    async def run():
+        task = asyncio.create_task(AsyncAudioPlayer().play(_tone(5000, rate=24000).tobytes()))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        started = time.perf_counter()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.5
+    assert device.streams[0].aborted
+
+
+# --------------------------------------------------
+# DEEPGRAM (fake SDK)
+# --------------------------------------------------
+
+class FakeDeepgramClient:
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.listen = types.SimpleNamespace(
+            prerecorded=types.SimpleNamespace(v=lambda version: self)
+        )
+        self.speak = types.SimpleNamespace(v=lambda version: self)
+        self.threads = set()
+
+    def transcribe_file(self, source, options):
+        self.threads.add(threading.get_ident())
+        assert source["mimetype"] == "audio/wav"
+        text = source["buffer"].decode()
+        return {"results": {"channels": [{"alternatives": [{"transcript": text}]}]}}
+
+    def stream(self, source, options):
+        self.threads.add(threading.get_ident())
+        self.options = options
+        return types.SimpleNamespace(stream=[source["text"].encode(), b"", b"!"])
+
+
+class FakeResponse:
+    def __init__(self, chunks, gate=None):
+        self.chunks = chunks
+        self.gate = gate
+        self.read = 0
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i, chunk in enumerate(self.chunks):
+            # Everything after the first chunk waits for the gate
+            if i and self.gate is not None:
+                self.gate.wait()
+            self.read += 1
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def deepgram(monkeypatch):
+    sdk = types.ModuleType("deepgram")
+    sdk.DeepgramClient = FakeDeepgramClient
+    sdk.PrerecordedOptions = sdk.SpeakOptions = lambda **kw: kw
+    monkeypatch.setitem(sys.modules, "deepgram", sdk)
+
+    http = types.ModuleType("requests")
+    http.post = None
+    monkeypatch.setitem(sys.modules, "requests", http)
+
+    import stt.deepgram_stt
+    import tts.deepgram_tts
+
+    for module in (stt.deepgram_stt, tts.deepgram_tts):
+        monkeypatch.setattr(module, "DeepgramClient", FakeDeepgramClient)
+    monkeypatch.setattr(tts.deepgram_tts, "SpeakOptions", lambda **kw: kw)
+    monkeypatch.setattr(stt.deepgram_stt, "PrerecordedOptions", lambda **kw: kw)
+    return types.SimpleNamespace(stt=stt.deepgram_stt, tts=tts.deepgram_tts)
+
+
+def test_deepgram_stt_runs_in_the_executor(deepgram):
+    executor = CountingExecutor()
+    stt = deepgram.stt.AsyncDeepgramSTT("key", executor=executor)
+
+    async def run():
+        return threading.get_ident(), await stt.transcribe(b"yes please")
+
+    loop_thread, text = asyncio.run(run())
+    executor.shutdown()
+    assert text == "yes please"
+    assert executor.submitted == 1 and loop_thread not in stt.client.threads
+
+
+def test_deepgram_tts_synthesize_runs_in_the_executor(deepgram):
+    executor = CountingExecutor()
+    tts = deepgram.tts.AsyncDeepgramTTS("key", executor=executor)
+
+    audio = asyncio.run(tts.synthesize("hi"))
+    executor.shutdown()
+    assert audio == b"hi!"
+    assert executor.submitted == 1
+    assert tts.client.options["encoding"] == "linear16"
+
+
+def test_deepgram_tts_stream_hands_chunks_to_the_loop(deepgram, monkeypatch):
+    response = FakeResponse([b"a", b"", b"b", b"c"])
+    monkeypatch.setattr(deepgram.tts.requests, "post", lambda *a, **kw: response, raising=False)
+    executor = CountingExecutor()
+    tts = deepgram.tts.AsyncDeepgramTTS("key", executor=executor)
+
+    async def run():
+        return [chunk async for chunk in tts.stream("hello")]
+
+    assert asyncio.run(run()) == [b"a", b"b", b"c"]
+    executor.shutdown()
+    assert executor.submitted == 1
+
+
+def test_closing_deepgram_tts_stream_stops_the_read(deepgram, monkeypatch):
+    gate = threading.Event()
+    response = FakeResponse([b"a"] + [b"x"] * 100, gate=gate)
+    monkeypatch.setattr(deepgram.tts.requests, "post", lambda *a, **kw: response, raising=False)
+    executor = CountingExecutor()
+    tts = deepgram.tts.AsyncDeepgramTTS("key", executor=executor)
+
+    async def run():
+        stream = tts.stream("hello")
+        first = await anext(stream)
+        await stream.aclose()
+        gate.set()
+        return first
+
+    assert asyncio.run(run()) == b"a"
+    executor.shutdown(wait=True)
+    assert response.read < 100
+
+
+def test_deepgram_tts_empty_stream_raises(deepgram, monkeypatch):
+    monkeypatch.setattr(deepgram.tts.requests, "post", lambda *a, **kw: FakeResponse([]), raising=False)
+    tts = deepgram.tts.AsyncDeepgramTTS("key")
+
+    async def run():
+        return [chunk async for chunk in tts.stream("hello")]
+
+    with pytest.raises(RuntimeError, match="empty audio stream"):
+        asyncio.run(run())
@@ -0,0 +1,111 @@
+import subprocess
+import sys
+
+import pytest
+
+from audio.codec import ALAW_8K, MULAW_8K, AudioFormat
+from backends.registry import (
+    STT_BACKENDS,
+    TTS_BACKENDS,
+    Backend,
+    BackendError,
+    BackendRegistry,
+    backend_modules,
+)
+
+
+def _imports_after(code: str) -> set[str]:
+    done = subprocess.run(
+        [sys.executable, "-c", f"{code}; import sys; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True,
+        env={"PATH": "", "PYTHONPATH": "."},
+    )
+    return set(done.stdout.split())
+
+
+def test_create_passes_options_and_caches_factory():
+    registry = BackendRegistry("TTS", {"silent": Backend("campaign.simulated:SilentTTS")})
+    tts = registry.create("silent", time_scale=0.5)
+    assert tts.time_scale == 0.5
+    assert registry.load("silent") is type(tts)
+    assert "silent" in registry and registry.names() == ["silent"]
+
+
+def test_api_key_read_on_create(monkeypatch):
+    registry = BackendRegistry("STT")
+    registry.register("fake", "types:SimpleNamespace", key_env="FAKE_STT_KEY")
+
+    monkeypatch.delenv("FAKE_STT_KEY", raising=False)
+    with pytest.raises(BackendError, match="FAKE_STT_KEY not set"):
+        registry.create("fake")
+    assert registry.create("fake", api_key="explicit").api_key == "explicit"
+
+    monkeypatch.setenv("FAKE_STT_KEY", "from-env")
+    assert registry.create("fake").api_key == "from-env"
+
+
+def test_unknown_and_missing_backends():
+    registry = BackendRegistry("TTS")
+    registry.register("gone", "no_such_module_anywhere:TTS")
+    registry.register("typo", "json:no_such_attribute")
+
+    with pytest.raises(BackendError, match="choose from: gone, typo"):
+        registry.get("other")
+    with pytest.raises(BackendError, match="not installed"):
+        registry.load("gone")
+    with pytest.raises(BackendError, match="no json:no_such_attribute"):
+        registry.load("typo")
+    with pytest.raises(ValueError):
+        registry.register("bad", "json.dumps")
+
+
+class LineTTS:
+    # Deepgram-like, mu-law but no alaw
+    formats = (
+        AudioFormat("linear16", 24000), AudioFormat("mulaw", 8000), AudioFormat("linear16", 8000),
+    )
+
+    def __init__(self, encoding: str = "linear16", sample_rate: int = 24000):
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+
+    async def synthesize(self, text: str) -> bytes:
+        return b""
+
+
+def test_create_negotiates_the_line_format():
+    registry = BackendRegistry("TTS", {"line": Backend("tests.test_backends:LineTTS")})
+
+    tts = registry.create("line", line=MULAW_8K)
+    assert (tts.encoding, tts.sample_rate) == ("mulaw", 8000)
+    tts = registry.create("line", line=ALAW_8K)
+    assert (tts.encoding, tts.sample_rate) == ("linear16", 8000)
+    # Explicit options win; no line, no negotiation
+    assert registry.create("line", line=MULAW_8K, encoding="linear16").encoding == "linear16"
+    assert registry.create("line").sample_rate == 24000
+
+
+def test_builtin_backends():
+    assert {"deepgram", "scripted"} <= set(STT_BACKENDS.names())
+    assert {"deepgram", "silent"} <= set(TTS_BACKENDS.names())
+    assert backend_modules({"stt": "deepgram", "tts": "silent", "llm": ""}) == [
+        "stt.deepgram_stt", "campaign.simulated",
+    ]
+
+
+def test_entry_points_import_without_keys_or_providers():
+    loaded = _imports_after("import main, llm.groq_client, tts.tts_adapter")
+    assert "main" in loaded
+    # Providers, audio and HTTP stacks load only when a backend is created
+    for heavy in ("numpy", "sounddevice", "deepgram", "groq", "httpx"):
+        assert heavy not in loaded
+
+
+def test_groq_llm_checks_key_on_construction(monkeypatch):
+    from llm.errors import LLMError
+    from llm.groq_client import GroqLLM
+
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    with pytest.raises(LLMError, match="GROQ_API_KEY"):
+        GroqLLM()
+    assert GroqLLM(api_key="k").api_key == "k"
@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+
+from campaign.runner import CampaignRunner, percentile, _simulated_orders
+from campaign.simulated import (
+    Latency,
+    ReplaySTT,
+    ScriptedSTT,
+    SilentTTS,
+    SimulatedChannel,
+    WavCallerChannel,
+    load_wav_scripts,
+    script_for,
+    write_wav_scripts,
+)
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+
+
+TIME_SCALE = 0.001
+
+
+def _factory(script_name, time_scale=TIME_SCALE):
+    def factory(order):
+        return LastMileDeliveryVoiceAgent(
+            order["phone"],
+            order=order,
+            channel=SimulatedChannel(script_for(order, script_name), time_scale=time_scale),
+            stt=ScriptedSTT(time_scale=time_scale),
+            tts=SilentTTS(time_scale=time_scale),
+            verbose=False,
+        )
+    return factory
+
+
+def test_percentile():
+    values = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 95) == 1.0
+    assert percentile([], 50) == 0.0
+
+
+def test_simulated_campaign_completes_calls(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        "last_mile_delivery.agent.mark_scheduled",
+        lambda order_id, date: scheduled.append((order_id, date)),
+    )
+
+    runner = CampaignRunner(_factory("schedule"), concurrency=20)
+    stats = asyncio.run(runner.run(_simulated_orders(50)))
+
+    assert stats.count("completed") == 50
+    assert all(r.final_state == "CLOSE" for r in stats.results)
+    assert len(scheduled) == 50
+    assert ("SIM-0", "Jan 25") in scheduled
+    assert len(stats.turn_latencies) == 150
+    assert stats.calls_per_minute > 0
+
+
+def test_call_timeout():
+    runner = CampaignRunner(_factory("schedule", time_scale=1.0), call_timeout=0.05)
+    stats = asyncio.run(runner.run(_simulated_orders(3)))
+
+    assert stats.count("timeout") == 3
+
+
+def test_order_source_is_not_read_ahead():
+    consumed = []
+
+    def orders():
+        for order in _simulated_orders(100):
+            consumed.append(order["order_id"])
+            yield order
+
+    runner = CampaignRunner(_factory("no_answer", time_scale=0.01), concurrency=5, queue_size=5)
+
+    async def probe():
+        task = asyncio.create_task(runner.run(orders()))
+        await asyncio.sleep(0.02)
+        read_ahead = len(consumed)
+        task.cancel()
+        return read_ahead
+
+    # Five calls in flight + five queued (+ one waiting on put)
+    assert asyncio.run(probe()) <= 11
+
+
+def test_barge_in_cuts_playback_and_keeps_the_turn(monkeypatch):
+    monkeypatch.setattr("last_mile_delivery.agent.mark_scheduled", lambda *args: None)
+    order = next(_simulated_orders(1))
+
+    def make(barge_in):
+        return LastMileDeliveryVoiceAgent(
+            order["phone"],
+            order=order,
+            channel=SimulatedChannel(
+                script_for(order, "schedule"),
+                time_scale=0.01,
+                interrupt_after=0.5 if barge_in else None,
+            ),
+            stt=ScriptedSTT(time_scale=0.01),
+            tts=SilentTTS(time_scale=0.01),
+            barge_in=barge_in,
+            verbose=False,
+        )
+
+    async def timed(agent):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await agent.run()
+        return loop.time() - start
+
+    patient, impatient = make(False), make(True)
+    patient_time = asyncio.run(timed(patient))
+    impatient_time = asyncio.run(timed(impatient))
+
+    assert impatient.barge_in_count == 3
+    assert impatient.agent.state.name == "CLOSE"
+    assert impatient.agent.context["date"] == "Jan 25"
+    assert impatient_time < patient_time
+
+
+def test_latency_distributions():
+    assert Latency("0.3").sample() == 0.3
+    assert 0.2 <= Latency("uniform:0.2:0.4").sample() <= 0.4
+    assert Latency("normal:0.1:5").sample() >= 0.0
+    assert Latency("lognormal:0.3:0").sample() == pytest.approx(0.3)
+    for bad in ("gamma:1:2", "uniform:1", "fixed:x"):
+        with pytest.raises(ValueError):
+            Latency(bad)
+
+
+def test_wav_replay_campaign(tmp_path, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        "last_mile_delivery.agent.mark_scheduled",
+        lambda order_id, date: scheduled.append(date),
+    )
+    scripts = write_wav_scripts(tmp_path, next(_simulated_orders(1)))
+    assert load_wav_scripts(tmp_path)["schedule"][1][1] == "Jan 25 works for me"
+
+    transcripts = {}
+
+    def factory(order):
+        return LastMileDeliveryVoiceAgent(
+            order["phone"],
+            order=order,
+            channel=WavCallerChannel(scripts["schedule"], transcripts, time_scale=TIME_SCALE),
+            stt=ReplaySTT(transcripts, Latency("0.2"), time_scale=TIME_SCALE),
+            tts=SilentTTS(Latency("uniform:0.1:0.3"), time_scale=TIME_SCALE),
+            verbose=False,
+        )
+
+    stats = asyncio.run(CampaignRunner(factory, concurrency=5).run(_simulated_orders(5)))
+
+    assert stats.count("completed") == 5
+    assert scheduled == ["Jan 25"] * 5
+    assert len(stats.turn_latencies) == 15
+
+
+def test_intent_llm_needs_a_key(monkeypatch):
+    import argparse
+
+    from campaign.runner import _intent_classifier
+
+    monkeypatch.setattr("dotenv.load_dotenv", lambda *a, **kw: False)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    args = argparse.Namespace(
+        intent_llm=True, intent_llm_batch_ms=0.0, intent_llm_rate=0.0, intent_llm_budget_ms=350.0,
+    )
+    with pytest.raises(RuntimeError, match="GROQ_API_KEY not set"):
+        _intent_classifier(args)
+    assert _intent_classifier(argparse.Namespace(intent_llm=False)) == (None, None)
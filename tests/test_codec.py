@@ -0,0 +1,267 @@
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from audio.codec import (
+    ALAW_8K,
+    LINEAR16_8K,
+    LINEAR16_16K,
+    LINEAR16_24K,
+    MULAW_8K,
+    AudioFormat,
+    Resampler,
+    Transcoder,
+    decode,
+    encode,
+    negotiate,
+    resample,
+    to_wav,
+)
+from audio.rtp import PAYLOAD_TYPES, RTP_HEADER, RTPChannel, rtp_packet, rtp_payload
+
+
+def _tone(rate: int, ms: int, hz: float = 440.0, amplitude: int = 8000) -> np.ndarray:
+    t = np.arange(rate * ms // 1000) / rate
+    return (amplitude * np.sin(2 * np.pi * hz * t)).astype(np.int16)
+
+
+@pytest.mark.parametrize("encoding", ["mulaw", "alaw"])
+def test_g711_matches_reference(encoding):
+    audioop = pytest.importorskip("audioop")
+    pcm = np.arange(-32768, 32768, dtype=np.int32).astype("<i2")
+    codes = pcm.tobytes()
+
+    lin2x = audioop.lin2ulaw if encoding == "mulaw" else audioop.lin2alaw
+    x2lin = audioop.ulaw2lin if encoding == "mulaw" else audioop.alaw2lin
+    assert encode(pcm, encoding).tobytes() == lin2x(codes, 2)
+
+    every_code = bytes(range(256))
+    assert decode(every_code, encoding).tobytes() == x2lin(every_code, 2)
+
+
+@pytest.mark.parametrize("encoding", ["mulaw", "alaw"])
+def test_g711_round_trip_is_close(encoding):
+    pcm = _tone(8000, 100)
+    back = decode(encode(pcm, encoding), encoding)
+    # Logarithmic quantization: error grows with the amplitude
+    assert np.all(np.abs(back.astype(int) - pcm) <= np.abs(pcm.astype(int)) // 16 + 16)
+
+
+def test_decode_reads_memoryview_slices_without_copy():
+    packet = bytearray(b"\x00" * 12 + bytes(range(160)))
+    payload = memoryview(packet)[12:]
+    out = np.empty(160, dtype=np.int16)
+    assert decode(payload, "mulaw", out=out) is out
+
+    linear = bytearray(_tone(8000, 20).tobytes())
+    view = decode(memoryview(linear), "linear16")
+    linear[0:2] = b"\x01\x00"
+    assert view[0] == 1   # a view of the caller's buffer
+
+
+@pytest.mark.parametrize("src, dst", [(8000, 16000), (16000, 24000), (24000, 8000), (16000, 8000)])
+def test_resampler_chunks_match_one_shot(src, dst):
+    pcm = _tone(src, 1000)
+    frame = src // 50   # 20 ms
+
+    resampler = Resampler(src, dst)
+    chunks = [resampler.convert(pcm[i:i + frame]) for i in range(0, len(pcm), frame)]
+    assert all(len(chunk) == dst // 50 for chunk in chunks)
+    np.testing.assert_array_equal(np.concatenate(chunks), resample(pcm, src, dst))
+
+
+def test_resampler_keeps_the_tone():
+    out = resample(_tone(8000, 500, hz=300), 8000, 24000)
+    spectrum = np.abs(np.fft.rfft(out))
+    peak_hz = np.argmax(spectrum) * 24000 / len(out)
+    assert abs(peak_hz - 300) < 5
+
+
+def test_transcoder_passthrough_and_conversion():
+    same = Transcoder(MULAW_8K, MULAW_8K)
+    data = bytes(range(160))
+    assert same.passthrough and same.convert(data).obj is data
+
+    to_stt = Transcoder(MULAW_8K, LINEAR16_16K)
+    assert to_stt.convert(data).nbytes == LINEAR16_16K.frame_bytes(20)
+
+    to_line = Transcoder(LINEAR16_24K, MULAW_8K)
+    assert to_line.convert(_tone(24000, 20).tobytes()).nbytes == MULAW_8K.frame_bytes(20)
+
+
+def test_negotiate_prefers_the_line_format():
+    assert negotiate(MULAW_8K, [LINEAR16_16K, MULAW_8K]) == MULAW_8K
+    assert negotiate(ALAW_8K, [LINEAR16_16K, LINEAR16_8K]) == LINEAR16_8K
+    assert negotiate(MULAW_8K, [LINEAR16_24K]) == LINEAR16_24K
+    with pytest.raises(ValueError):
+        negotiate(MULAW_8K, [])
+    with pytest.raises(ValueError, match="Unknown audio encoding"):
+        AudioFormat("opus", 48000)
+
+
+def test_to_wav_is_a_valid_container():
+    pcm = _tone(16000, 100)
+    with wave.open(io.BytesIO(to_wav(pcm, 16000))) as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, 16000)
+        assert wf.readframes(wf.getnframes()) == pcm.tobytes()
+
+
+# --------------------------------------------------
+# RTP
+# --------------------------------------------------
+
+def test_rtp_packet_round_trip():
+    payload = bytes(range(160))
+    packet = rtp_packet(payload, seq=65535, timestamp=2**32 - 80, ssrc=7, payload_type=0, marker=True)
+    first, second, seq, timestamp, ssrc = RTP_HEADER.unpack_from(packet)
+    assert first >> 6 == 2 and second == 0x80 and (seq, ssrc) == (65535, 7)
+    assert rtp_payload(packet).tobytes() == payload
+
+    with pytest.raises(ValueError):
+        rtp_payload(b"\x00" * 20)
+
+
+def _hiss(ms: int, seed: int = 0) -> np.ndarray:
+    # Line noise; the VAD tracks its floor
+    return np.random.default_rng(seed).normal(0, 30, 8 * ms).astype(np.int16)
+
+
+def _line_packets(pcm: np.ndarray, encoding: str = "mulaw") -> list[bytes]:
+    codes = encode(pcm, encoding).tobytes()
+    return [
+        rtp_packet(codes[i:i + 160], i // 160, i, 1, PAYLOAD_TYPES[encoding])
+        for i in range(0, len(codes), 160)
+    ]
+
+
+def _feed(queue: asyncio.Queue, packets: list[bytes], hang_up: bool = True):
+    for packet in packets:
+        queue.put_nowait(packet)
+    if hang_up:
+        queue.put_nowait(None)
+
+
+def test_rtp_channel_records_a_turn():
+    caller = np.concatenate([
+        _hiss(300),
+        _tone(8000, 600, amplitude=6000),
+        _hiss(1000, seed=1),
+    ])
+
+    async def run():
+        inbound = asyncio.Queue()
+        _feed(inbound, _line_packets(caller), hang_up=False)
+        channel = RTPChannel(inbound, asyncio.Queue(), silence_duration_ms=300)
+        pauses = []
+        channel.on_pause = pauses.append
+        return channel, pauses, await channel.record()
+
+    channel, pauses, wav = asyncio.run(run())
+    with wave.open(io.BytesIO(wav)) as wf:
+        assert wf.getframerate() == 16000
+        # speech + hangover + silence timer, plus the lead-in
+        assert 0.9 < wf.getnframes() / 16000 <= 1.4
+    assert channel.speech_started is not None and channel.speech_ended >= channel.speech_started
+    assert len(pauses) == 1
+
+
+def test_rtp_channel_frames_pass_through_native_line():
+    packets = _line_packets(_tone(8000, 100))
+
+    async def collect(stt_format):
+        inbound = asyncio.Queue()
+        _feed(inbound, packets)
+        channel = RTPChannel(inbound, asyncio.Queue(), stt_format=stt_format)
+        return channel, [frame async for frame in channel.frames()]
+
+    channel, frames = asyncio.run(collect(MULAW_8K))
+    assert channel.transcoded_in == 0
+    assert [bytes(frame) for frame in frames] == [bytes(rtp_payload(p)) for p in packets]
+
+    channel, frames = asyncio.run(collect(LINEAR16_16K))
+    assert channel.transcoded_in == len(packets)
+    assert all(frame.nbytes == 640 for frame in frames)
+
+
+def test_rtp_channel_packetizes_tts_audio():
+    # 110 ms of 24 kHz audio in uneven chunks -> 6 line frames, padded
+    audio = _tone(24000, 110).tobytes()
+    sizes = [1000, 37, 2500, len(audio)]
+
+    async def chunks():
+        start = 0
+        for size in sizes:
+            yield audio[start:start + size]
+            start += size
+
+    async def run():
+        outbound = asyncio.Queue()
+        channel = RTPChannel(asyncio.Queue(), outbound, time_scale=0)
+        await channel.play_stream(chunks())
+        return [outbound.get_nowait() for _ in range(outbound.qsize())]
+
+    packets = asyncio.run(run())
+    assert len(packets) == 6
+    assert all(len(rtp_payload(p)) == 160 for p in packets)
+
+    headers = [RTP_HEADER.unpack_from(p) for p in packets]
+    assert headers[0][1] & 0x80 and not any(h[1] & 0x80 for h in headers[1:])
+    assert [(h[2] - headers[0][2]) & 0xFFFF for h in headers] == list(range(6))
+    assert [(h[3] - headers[0][3]) & 0xFFFFFFFF for h in headers] == [160 * i for i in range(6)]
+    assert bytes(rtp_payload(packets[-1]))[-40:] == b"\xff" * 40   # mu-law silence
+
+
+def test_rtp_channel_native_tts_is_not_transcoded():
+    audio = encode(_tone(8000, 40), "mulaw").tobytes()
+
+    async def run():
+        outbound = asyncio.Queue()
+        channel = RTPChannel(asyncio.Queue(), outbound, tts_format=MULAW_8K, time_scale=0)
+        await channel.play(audio)
+        return channel, [outbound.get_nowait() for _ in range(outbound.qsize())]
+
+    channel, packets = asyncio.run(run())
+    assert channel.transcoded_out == 0
+    assert b"".join(bytes(rtp_payload(p)) for p in packets) == audio
+
+
+def test_rtp_channel_barge_in_returns_preroll():
+    caller = np.concatenate([_hiss(100), _tone(8000, 400, amplitude=9000)])
+
+    async def run():
+        inbound = asyncio.Queue()
+        _feed(inbound, _line_packets(caller), hang_up=False)
+        channel = RTPChannel(inbound, asyncio.Queue())
+        return await channel.wait_for_speech(200)
+
+    preroll = asyncio.run(run())
+    assert preroll.dtype == np.int16 and len(preroll) == 8000 * 200 // 1000
+
+
+def test_rtp_channel_silent_turn_is_still_a_wav():
+    async def run():
+        inbound = asyncio.Queue()
+        _feed(inbound, _line_packets(_hiss(400)), hang_up=False)
+        channel = RTPChannel(inbound, asyncio.Queue(), start_timeout_ms=300)
+        return channel, await channel.record()
+
+    channel, wav = asyncio.run(run())
+    assert channel.speech_started is None
+    with wave.open(io.BytesIO(wav)) as wf:
+        assert wf.getframerate() == 16000 and wf.getnframes() == 16000 * 300 // 1000
+
+
+def test_rtp_channel_for_negotiated_backends():
+    class LineBackend:
+        format = MULAW_8K
+
+    channel = RTPChannel.for_backends(asyncio.Queue(), asyncio.Queue(), LineBackend(), LineBackend())
+    assert channel.stt_format == channel.tts_format == MULAW_8K
+
+    # Backends without a declared format get the linear16 defaults
+    channel = RTPChannel.for_backends(asyncio.Queue(), asyncio.Queue(), object(), line=ALAW_8K)
+    assert (channel.stt_format, channel.tts_format) == (LINEAR16_16K, LINEAR16_24K)
+    assert channel.line == ALAW_8K
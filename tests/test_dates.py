@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from last_mile_delivery.dates import DateResolver, parse_date
+from last_mile_delivery.intent import extract_date
+
+# Wednesday; Jan 25 2027 is a Monday, Jan 30 a Saturday
+TODAY = date(2027, 1, 20)
+DATES = ["Jan 25", "Jan 28", "Jan 30"]
+
+
+@pytest.fixture
+def resolver():
+    return DateResolver(DATES, today=TODAY)
+
+
+def test_parse_date_picks_nearest_year():
+    assert parse_date("Jan 25", date(2026, 12, 20)) == date(2027, 1, 25)
+    assert parse_date("Dec 30", date(2027, 1, 2)) == date(2026, 12, 30)
+    assert parse_date("someday", TODAY) is None
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Jan 25 is fine", "Jan 25"),
+    ("the 28th please", "Jan 28"),
+    ("28", "Jan 28"),
+    ("30th of january", "Jan 30"),
+    ("28 jan", "Jan 28"),
+    ("January twenty eighth", "Jan 28"),
+    ("Monday works", "Jan 25"),
+    ("next saturday", "Jan 30"),
+    ("the first one", "Jan 25"),
+    ("the second", "Jan 28"),
+    ("the last option", "Jan 30"),
+    ("not the 25th, the 28th", "Jan 28"),
+    ("25th... actually make it the 30th", "Jan 30"),
+    ("jan 25 no jan 28", "Jan 28"),
+])
+def test_resolves_spoken_dates(resolver, text, expected):
+    assert resolver.resolve(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "the 5th",          # used to match "Jan 25"
+    "I'll be home at 2",
+    "February 25",
+    "hmm",
+    "",
+])
+def test_unknown_dates_do_not_match(resolver, text):
+    assert resolver.resolve(text) is None
+
+
+def test_relative_days():
+    resolver = DateResolver(DATES, today=date(2027, 1, 24))
+    assert resolver.resolve("tomorrow") == "Jan 25"
+    assert resolver.resolve("today") is None
+
+    resolver = DateResolver(DATES, today=date(2027, 1, 26))
+    assert resolver.resolve("day after tomorrow") == "Jan 28"
+
+
+def test_same_day_in_two_months_is_ambiguous():
+    resolver = DateResolver(["Jan 25", "Feb 25"], today=TODAY)
+    assert [label for label, _ in resolver.candidates("the 25th")] == ["Jan 25", "Feb 25"]
+    assert resolver.resolve("the 25th") is None
+    assert resolver.resolve("25th of feb") == "Feb 25"
+
+
+@pytest.mark.parametrize("text", [
+    "the 30th or 28th",
+    "jan 25 or jan 28",
+    "28th, or maybe the 25th",
+])
+def test_two_dates_without_a_correction_are_ambiguous(resolver, text):
+    assert resolver.resolve(text) is None
+    assert len(resolver.candidates(text)) == 2
+
+
+def test_extract_date_keeps_its_signature():
+    assert extract_date("jan 28 please", DATES) == "Jan 28"
+    assert extract_date("no idea", DATES) is None
@@ -0,0 +1,92 @@
+import pytest
+
+from last_mile_delivery.agent import DELIVERY_FLOW
+from last_mile_delivery.appointment import APPOINTMENT_FLOW, AppointmentAgent
+from last_mile_delivery.dialog import (
+    DialogEngine,
+    Flow,
+    FlowError,
+    Transition,
+    get_flow,
+)
+from last_mile_delivery.intent import Intent
+from memory.memory import ConversationMemory
+
+
+def test_shipped_flows_are_valid():
+    assert DELIVERY_FLOW.validate() == []
+    assert APPOINTMENT_FLOW.validate() == []
+    assert get_flow("delivery") is DELIVERY_FLOW
+    assert get_flow("appointment") is APPOINTMENT_FLOW
+
+
+def test_unknown_target_is_rejected():
+    with pytest.raises(FlowError):
+        Flow("bad", initial="a", states={"a": [Transition("hi", "nowhere")]})
+
+
+def test_validate_reports_unreachable_and_dead_end_states():
+    flow = Flow("f", initial="a", final=("done",), states={
+        "a": [Transition("hi", "b")],
+        "b": [Transition("stuck")],
+        "orphan": [Transition("?", "done")],
+        "done": [Transition("bye")],
+    })
+    problems = flow.validate()
+    assert "'orphan' is unreachable from 'a'" in problems
+    assert "'b' is a dead end" in problems
+
+
+def test_guards_slots_and_actions():
+    booked = []
+    flow = Flow("f", initial="ask", states={
+        "ask": [
+            Transition("Bye.", "close", when=Intent.NO),
+            Transition("Booking {item}.", "close", slot="item",
+                       extract=lambda t: t.text if len(t.text) > 2 else None,
+                       action=lambda t: booked.append(t.context["item"])),
+            Transition("What would you like?"),
+        ],
+        "close": [Transition("Bye.")],
+    })
+    engine = DialogEngine(flow, order={})
+
+    assert engine.handle("x") == "What would you like?"
+    assert engine.state == "ask"
+    assert engine.handle("Pizza") == "Booking pizza."
+    assert engine.finished
+    assert booked == ["pizza"]
+
+
+def test_preview_has_no_side_effects():
+    booked = []
+    flow = Flow("f", initial="ask", states={
+        "ask": [Transition("Ok {item}", "close", slot="item",
+                           extract=lambda t: t.text, action=booked.append)],
+        "close": [Transition("Bye.")],
+    })
+    engine = DialogEngine(flow, order={})
+
+    resolution = engine.preview("tea")
+    assert (resolution.target, resolution.response) == ("close", "Ok tea")
+    assert engine.state == "ask" and engine.context == {} and booked == []
+
+
+def test_appointment_flow_runs_on_the_same_engine(monkeypatch):
+    saved = []
+    monkeypatch.setattr("last_mile_delivery.appointment.save_appointment", saved.append)
+
+    memory = ConversationMemory()
+    memory.start_session("appt")
+    agent = AppointmentAgent(memory, {"patient_name": "Neha"})
+
+    assert "appointment desk" in agent.start()
+    agent.handle_input("yes")
+    assert "Cardiology" in agent.handle_input("cardiology please")
+    agent.handle_input("Monday")
+    assert "Is that correct?" in agent.handle_input("morning")
+    agent.handle_input("yes")
+
+    assert agent.state.value == "close"
+    assert saved[0]["department"] == "Cardiology"
+    assert (saved[0]["date"], saved[0]["time"]) == ("Monday", "morning")
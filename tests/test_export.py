@@ -0,0 +1,114 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from campaign.runner import _simulated_orders
+from campaign.simulated import ScriptedSTT, SilentTTS, SimulatedChannel, script_for
+from last_mile_delivery.export import CallExporter, CallRecord, ColumnarWriter, JSONLWriter
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+
+
+def _record(i: int) -> CallRecord:
+    return CallRecord(
+        call_id=f"order_{i}",
+        order_id=str(i),
+        flow="delivery",
+        outcome="completed",
+        final_state="close",
+        state_path=["verify_person", "close"],
+        turns=[("agent", "Hello"), ("user", "no")],
+        turn_latencies=[0.2],
+    )
+
+
+class ListWriter:
+    def __init__(self):
+        self.batches = []
+        self.written = threading.Event()
+
+    def write(self, records):
+        self.batches.append(list(records))
+        self.written.set()
+
+
+def test_flushes_when_batch_is_full():
+    writer = ListWriter()
+    exporter = CallExporter(writer, batch_size=3, flush_interval=60)
+    for i in range(3):
+        exporter.submit(_record(i))
+
+    assert writer.written.wait(5)
+    exporter.close()
+    assert [len(b) for b in writer.batches] == [3]
+    assert exporter.exported == 3
+
+
+def test_flushes_on_interval():
+    writer = ListWriter()
+    exporter = CallExporter(writer, batch_size=100, flush_interval=0.05)
+    exporter.submit(_record(1))
+
+    assert writer.written.wait(5)
+    exporter.close()
+    assert writer.batches == [[_record(1)]]
+
+
+def test_close_writes_remainder_and_rejects_more():
+    writer = ListWriter()
+    exporter = CallExporter(writer, batch_size=100, flush_interval=60)
+    for i in range(5):
+        exporter.submit(_record(i))
+    exporter.close()
+
+    assert sum(len(b) for b in writer.batches) == 5
+    with pytest.raises(RuntimeError):
+        exporter.submit(_record(6))
+
+
+def test_jsonl_rotates_by_size(tmp_path):
+    writer = JSONLWriter(tmp_path, max_bytes=1)
+    writer.write([_record(1), _record(2)])
+    writer.write([_record(3)])
+
+    files = sorted(tmp_path.glob("*.jsonl"))
+    assert len(files) == 2
+    rows = [json.loads(line) for f in files for line in f.read_text().splitlines()]
+    assert [r["order_id"] for r in rows] == ["1", "2", "3"]
+    assert rows[0]["turns"] == [["agent", "Hello"], ["user", "no"]]
+
+
+def test_columnar_json_fallback(tmp_path):
+    ColumnarWriter(tmp_path, parquet=False).write([_record(1), _record(2)])
+
+    (path,) = tmp_path.glob("*.columns.json")
+    data = json.loads(path.read_text())
+    assert data["rows"] == 2
+    assert data["columns"]["order_id"] == ["1", "2"]
+    assert data["columns"]["final_state"] == ["close", "close"]
+
+
+def test_voice_agent_exports_finished_call():
+    order = next(_simulated_orders(1))
+    writer = ListWriter()
+    exporter = CallExporter(writer, batch_size=1)
+
+    voice = LastMileDeliveryVoiceAgent(
+        order["phone"],
+        order=order,
+        channel=SimulatedChannel(script_for(order, "wrong_person"), time_scale=0.001),
+        stt=ScriptedSTT(time_scale=0.001),
+        tts=SilentTTS(time_scale=0.001),
+        exporter=exporter,
+        verbose=False,
+    )
+    asyncio.run(voice.run())
+    exporter.close()
+
+    (record,) = writer.batches[0]
+    assert record.outcome == "completed"
+    assert record.state_path == ["verify_person", "close"]
+    assert [role for role, _ in record.turns] == ["agent", "user", "agent"]
+    assert len(record.turn_latencies) == 1
+    assert voice.memory.sessions == {}
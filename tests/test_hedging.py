@@ -0,0 +1,248 @@
+import asyncio
+import time
+
+import pytest
+
+from backends.hedging import HedgedSTT, HedgedTTS, LatencyWindow
+from backends.registry import (
+    LLM_BACKENDS,
+    STT_BACKENDS,
+    BackendError,
+    BackendRegistry,
+    implements,
+)
+from campaign.simulated import ScriptedSTT, SilentTTS
+from stt.stt_backend import SpeechToText
+from tts.cache import CachedTTS
+from tts.tts_adapter import TextToSpeech
+
+
+class FakeSTT:
+    """
+    Answers its own name after the next delay in `delays` (cycled).
+    """
+
+    def __init__(self, name, *delays, error=None):
+        self.name = name
+        self.delays = delays or (0.0,)
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        delay = self.delays[self.calls % len(self.delays)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return self.name
+
+
+class FakeTTS:
+    def __init__(self, name, delay):
+        self.name = name
+        self.delay = delay
+        self.closed = False
+
+    async def synthesize(self, text: str) -> bytes:
+        await asyncio.sleep(self.delay)
+        return self.name.encode()
+
+    async def stream(self, text: str):
+        try:
+            await asyncio.sleep(self.delay)
+            for part in ("1", "2", "3"):
+                yield f"{self.name}{part}".encode()
+        finally:
+            self.closed = True
+
+
+def _timed(coro):
+    started = time.perf_counter()
+    result = asyncio.run(coro)
+    return result, time.perf_counter() - started
+
+
+def test_fast_primary_is_not_hedged():
+    secondary = FakeSTT("secondary")
+    stt = HedgedSTT(FakeSTT("primary", 0.0), secondary, initial_delay=0.2)
+    assert asyncio.run(stt.transcribe(b"")) == "primary"
+    assert stt.hedged == 0 and secondary.calls == 0
+    assert len(stt.latency) == 1
+
+
+def test_slow_primary_loses_to_secondary():
+    primary = FakeSTT("primary", 1.0)
+    stt = HedgedSTT(primary, FakeSTT("secondary", 0.01), initial_delay=0.05)
+
+    async def run():
+        text = await stt.transcribe(b"")
+        await asyncio.sleep(0)   # let the cancellation land
+        return text
+
+    text, elapsed = _timed(run())
+    assert text == "secondary" and elapsed < 0.5
+    assert stt.hedged == 1 and stt.secondary_wins == 1
+    assert primary.cancelled == 1
+    assert stt.latency.samples[0] >= 0.05
+
+
+def test_primary_error_fails_over_immediately():
+    stt = HedgedSTT(
+        FakeSTT("primary", 0.0, error=RuntimeError("503")),
+        FakeSTT("secondary", 0.0),
+        initial_delay=5.0,
+    )
+    text, elapsed = _timed(stt.transcribe(b""))
+    assert text == "secondary" and elapsed < 1.0
+
+
+def test_both_failing_raises():
+    stt = HedgedSTT(
+        FakeSTT("primary", 0.0, error=RuntimeError("primary down")),
+        FakeSTT("secondary", 0.01, error=RuntimeError("secondary down")),
+    )
+    with pytest.raises(RuntimeError, match="secondary down"):
+        asyncio.run(stt.transcribe(b""))
+
+
+def test_hedge_delay_follows_primary_p90():
+    window = LatencyWindow(size=10)
+    for ms in range(1, 21):
+        window.add(ms / 1000)
+    assert len(window) == 10 and window.quantile(0.9) == 0.020
+
+    stt = HedgedSTT(FakeSTT("a"), FakeSTT("b"), initial_delay=0.3, min_samples=5)
+    assert stt.delay == 0.3
+    for ms in (10, 10, 10, 10, 10, 10, 10, 10, 10, 80):
+        stt.latency.add(ms / 1000)
+    assert stt.delay == 0.080
+    stt.quantile = 0.5
+    assert stt.delay == 0.020   # min_delay
+
+
+def test_hedging_cuts_the_tail():
+    # One request in ten takes 300 ms; the secondary always takes 10 ms
+    stt = HedgedSTT(
+        FakeSTT("primary", *([0.005] * 9 + [0.3])),
+        FakeSTT("secondary", 0.01),
+        initial_delay=0.05,
+        min_samples=10,
+    )
+
+    async def run():
+        worst = 0.0
+        for _ in range(40):
+            started = time.perf_counter()
+            await stt.transcribe(b"")
+            worst = max(worst, time.perf_counter() - started)
+        return worst
+
+    assert asyncio.run(run()) < 0.15
+    assert stt.hedged >= 3 and stt.secondary_wins >= 3
+
+
+def test_sync_backends_run_in_threads():
+    class BlockingSTT:
+        def transcribe(self, audio_bytes):
+            time.sleep(0.01)
+            return "blocking"
+
+    stt = HedgedSTT(BlockingSTT(), FakeSTT("secondary", 1.0), initial_delay=0.5)
+    assert asyncio.run(stt.transcribe(b"")) == "blocking"
+
+
+def test_tts_stream_hedges_on_first_audio():
+    primary, secondary = FakeTTS("p", 1.0), FakeTTS("s", 0.01)
+    tts = HedgedTTS(primary, secondary, initial_delay=0.05)
+
+    async def run():
+        chunks = [chunk async for chunk in tts.stream("hello")]
+        await asyncio.sleep(0.01)
+        return chunks, await tts.synthesize("hello")
+
+    (chunks, audio), elapsed = _timed(run())
+    assert chunks == [b"s1", b"s2", b"s3"]
+    assert audio == b"s" and elapsed < 0.5
+    assert secondary.closed and tts.secondary_wins == 2
+
+
+def test_tts_stream_falls_back_to_synthesize():
+    class WholeTTS:
+        async def synthesize(self, text):
+            return b"whole"
+
+    tts = HedgedTTS(WholeTTS(), FakeTTS("s", 1.0))
+
+    async def run():
+        return [chunk async for chunk in tts.stream("hello")]
+
+    assert asyncio.run(run()) == [b"whole"]
+
+
+def test_interfaces_and_registry():
+    assert implements(ScriptedSTT(), SpeechToText)
+    assert implements(SilentTTS(), TextToSpeech)
+    assert implements(HedgedTTS(SilentTTS(), SilentTTS()), TextToSpeech)
+    assert not implements(object(), SpeechToText)
+
+    # The voice loop calls synthesize(text) and awaits or returns it
+    class TwoArgTTS:
+        def synthesize(self, text, voice):
+            return b""
+
+    class GeneratorTTS:
+        async def synthesize(self, text):
+            yield b""
+
+    assert not implements(TwoArgTTS(), TextToSpeech)
+    assert not implements(GeneratorTTS(), TextToSpeech)
+
+    hedged = STT_BACKENDS.create_hedged("scripted", "scripted", quantile=0.95)
+    assert isinstance(hedged, HedgedSTT) and hedged.quantile == 0.95
+    assert isinstance(STT_BACKENDS.create_hedged("scripted"), ScriptedSTT)
+
+    with pytest.raises(BackendError, match="can't be hedged"):
+        LLM_BACKENDS.create_hedged("openai", "openai")
+
+    registry = BackendRegistry("TTS", interface=TextToSpeech)
+    registry.register("wrong", "campaign.simulated:ScriptedSTT")
+    with pytest.raises(BackendError, match="does not implement TextToSpeech"):
+        registry.create("wrong")
+
+
+def test_hedged_tts_audio_identity():
+    primary, secondary = SilentTTS(), SilentTTS()
+    primary.model, secondary.model = "aura-asteria-en", "aura-luna-en"
+    tts = HedgedTTS(primary, secondary)
+    assert tts.sample_rate == 24000
+    # Cache keys cover both voices, never either one alone
+    assert tts.model == "aura-asteria-en+aura-luna-en"
+    assert CachedTTS(tts).key("hi") != CachedTTS(primary).key("hi")
+
+    secondary.model = primary.model
+    assert HedgedTTS(primary, secondary).model == "aura-asteria-en"
+
+
+def test_hedging_rejects_mismatched_audio():
+    with pytest.raises(ValueError, match="sample_rate"):
+        HedgedTTS(SilentTTS(sample_rate=24000), SilentTTS(sample_rate=16000))
+
+    a, b = FakeSTT("a"), FakeSTT("b")
+    a.format, b.format = "mulaw/8000", "linear16/16000"
+    with pytest.raises(ValueError, match="format"):
+        HedgedSTT(a, b)
+
+    registry = BackendRegistry("TTS", interface=TextToSpeech)
+    registry.register("fast", "campaign.simulated:SilentTTS")
+    registry.register("narrow", "tests.test_hedging:NarrowbandTTS")
+    with pytest.raises(BackendError, match="differ in sample_rate"):
+        registry.create_hedged("fast", "narrow")
+
+
+def NarrowbandTTS():
+    return SilentTTS(sample_rate=8000)
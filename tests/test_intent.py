@@ -0,0 +1,98 @@
+import pytest
+
+from last_mile_delivery.intent import (
+    Intent,
+    IntentMatcher,
+    classify,
+    is_no,
+    is_unavailable,
+    is_yes,
+)
+
+YES, NO, UNCERTAIN = Intent.YES, Intent.NO, Intent.UNCERTAIN
+
+# (utterance, expected polarity, unavailable?)
+CORPUS = [
+    ("yes", YES, False),
+    ("Yeah, that's me", YES, False),
+    ("yep speaking", YES, False),
+    ("Okay", YES, False),
+    ("ok sure", YES, False),
+    ("That's correct.", YES, False),
+    ("Sure, go ahead", YES, False),
+    ("No problem at all", YES, False),
+    ("I don’t mind, deliver it to the guard", YES, False),
+    ("no i dont mind", YES, False),
+    ("i wont be home", NO, True),
+    ("sounds good", YES, False),
+    ("of course", YES, False),
+    ("no, yes that's fine", YES, False),
+    ("yes please bring it right away", YES, False),
+    ("that is not a problem", YES, False),
+    ("no I am not busy", YES, False),
+    ("I'm not busy that day", YES, False),
+    ("no", NO, False),
+    ("No, this is his wife", NO, False),
+    ("nope", NO, False),
+    ("nah", NO, False),
+    ("I don't think so", NO, False),
+    ("Please don't", NO, False),
+    ("not okay", NO, False),
+    ("okay, not really", NO, False),
+    ("that's not correct", NO, False),
+    ("Sorry, wrong number", NO, False),
+    ("I'm not available on any of these days", NO, True),
+    ("I won't be available", NO, True),
+    ("busy all week", NO, True),
+    ("I'm out of town", NO, True),
+    ("none of these dates work", NO, True),
+    ("sure, but I'm busy that day", NO, True),
+    ("I'll be away that day", NO, True),
+    ("maybe", UNCERTAIN, False),
+    ("I'm not sure", UNCERTAIN, False),
+    ("I don't know", UNCERTAIN, False),
+    ("let me check with my family", UNCERTAIN, False),
+    # Substrings that used to match
+    ("I know the address", None, False),
+    ("nothing else", None, False),
+    ("notice me", None, False),
+    ("Jan 25", None, False),
+    ("my neighbor Noah", None, False),
+    ("hmm", None, False),
+    ("", None, False),
+]
+
+
+@pytest.mark.parametrize("text,polarity,unavailable", CORPUS)
+def test_intent_corpus(text, polarity, unavailable):
+    result = classify(text)
+    assert result.polarity is polarity
+    assert (Intent.UNAVAILABLE in result) is unavailable
+
+
+def test_wrappers_follow_polarity():
+    assert is_yes("yes please") and not is_no("yes please")
+    assert is_no("okay, not really") and not is_yes("okay, not really")
+    assert is_no("not available") and is_unavailable("not available")
+    assert not is_yes("I'm not sure") and not is_no("I'm not sure")
+
+
+def test_all_intents_returned_in_one_pass():
+    result = classify("yes but I'm busy")
+    assert result.intents == {Intent.YES, Intent.UNAVAILABLE}
+
+
+def test_negation_scope_stops_at_punctuation():
+    assert classify("not me. okay").polarity is YES
+    assert classify("not really okay").polarity is NO
+    assert classify("I did not say that was okay").polarity is YES
+
+
+def test_custom_phrase_table():
+    matcher = IntentMatcher(
+        {Intent.YES: ("haan", "theek hai"), Intent.NO: ("nahi",)},
+        negators=("nahi",),
+    )
+    assert matcher.classify("haan ji").polarity is YES
+    assert matcher.classify("Theek  hai").polarity is YES
+    assert matcher.classify("nahi").polarity is NO
@@ -0,0 +1,298 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from last_mile_delivery.intent import Intent, classify
+from last_mile_delivery.intent_llm import (
+    HybridIntentClassifier,
+    LLMIntentClassifier,
+    TTLCache,
+    is_ambiguous,
+    normalize,
+    parse_intent,
+    parse_intents,
+)
+from llm.chat_client import ChatClient, LLMError
+
+
+class StubLLM:
+    """
+    Local OpenAI-compatible /chat/completions; replies from `answers`
+    (normalized user text -> reply content) after `delay` seconds.
+    """
+
+    def __init__(self):
+        self.answers = {}
+        self.delay = 0.0
+        self.requests = []
+        self.connections = set()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append((self.path, self.headers.get("Authorization"), body))
+                stub.connections.add(self.client_address)
+                time.sleep(stub.delay)
+
+                if self.path != "/v1/chat/completions":
+                    self.send_error(404)
+                    return
+                content = stub.answers.get(body["messages"][-1]["content"], '{"intent": "unknown"}')
+                data = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubLLM()
+    yield server
+    server.close()
+
+
+def _run(stub, test, budget=2.0):
+    async def run():
+        async with ChatClient("test-key", base_url=stub.url, model="tiny") as client:
+            llm = LLMIntentClassifier(client)
+            return await test(HybridIntentClassifier(llm, budget=budget), llm)
+    return asyncio.run(run())
+
+
+def test_helpers():
+    assert normalize("Yes, sure!") == normalize("yes   SURE") == "yes sure"
+    assert parse_intent('{"intent": "unavailable"}') is Intent.UNAVAILABLE
+    assert parse_intent('Sure: {"intent": "YES"}') is Intent.YES
+    assert parse_intent("no") is Intent.NO
+    assert parse_intent('{"intent": "unknown"}') is None
+    assert parse_intent("???") is None
+
+    assert not is_ambiguous(classify("yes please"))
+    assert is_ambiguous(classify("at my cousin's wedding"))
+    assert not is_ambiguous(classify("the 28th"), understood=True)
+    assert is_ambiguous(classify("yes, no wait"), understood=True)
+
+
+def test_parse_batch_reply():
+    assert parse_intents('["yes", "unknown", "Unavailable"]', 3) == [
+        Intent.YES, None, Intent.UNAVAILABLE,
+    ]
+    with pytest.raises(LLMError):
+        parse_intents('["yes"]', 2)
+    with pytest.raises(LLMError):
+        parse_intents("no idea", 1)
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("last_mile_delivery.intent_llm.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", None)
+    assert cache.get("b", "missing") is None
+    cache.put("c", 3)
+    assert cache.get("a") is None and len(cache) == 2
+    now[0] += 11
+    assert cache.get("c") is None
+
+
+def test_clear_answers_never_reach_the_llm(stub):
+    async def test(hybrid, llm):
+        return await hybrid.classify("yes that's fine")
+
+    assert _run(stub, test).polarity is Intent.YES
+    assert stub.requests == []
+
+
+def test_ambiguous_answer_uses_llm_and_cache(stub):
+    stub.answers["i'll be at my cousin's wedding"] = '{"intent": "unavailable"}'
+
+    async def test(hybrid, llm):
+        first = await hybrid.classify("I'll be at my cousin's wedding.")
+        second = await hybrid.classify("i'll be at my cousin's wedding")
+        return first, second, llm.cache_hits
+
+    first, second, hits = _run(stub, test)
+    assert first.polarity is Intent.NO and Intent.UNAVAILABLE in first
+    assert second == first and hits == 1
+    assert len(stub.requests) == 1
+
+    path, auth, body = stub.requests[0]
+    assert path == "/v1/chat/completions" and auth == "Bearer test-key"
+    assert body["model"] == "tiny"
+
+
+def test_identical_questions_are_coalesced(stub):
+    stub.delay = 0.2
+    stub.answers["hmm let me see"] = '{"intent": "uncertain"}'
+
+    async def test(hybrid, llm):
+        results = await asyncio.gather(*(hybrid.classify("Hmm, let me see") for _ in range(10)))
+        return results, llm.coalesced
+
+    results, coalesced = _run(stub, test)
+    assert {r.polarity for r in results} == {Intent.UNCERTAIN}
+    assert coalesced == 9
+    assert len(stub.requests) == 1
+
+
+def test_connections_are_pooled(stub):
+    for i in range(5):
+        stub.answers[f"odd answer {i}"] = '{"intent": "yes"}'
+
+    async def test(hybrid, llm):
+        for i in range(5):
+            await hybrid.classify(f"odd answer {i}")
+
+    _run(stub, test)
+    assert len(stub.requests) == 5
+    assert len(stub.connections) == 1
+
+
+def test_budget_falls_back_to_rules_and_fills_cache(stub):
+    stub.delay = 0.3
+    stub.answers["something odd"] = '{"intent": "no"}'
+
+    async def test(hybrid, llm):
+        started = time.perf_counter()
+        result = await hybrid.classify("something odd")
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.5)       # the request finishes in the background
+        return result, elapsed, await hybrid.classify("something odd"), hybrid.fallbacks
+
+    result, elapsed, later, fallbacks = _run(stub, test, budget=0.05)
+    assert result.polarity is None and elapsed < 0.25
+    assert fallbacks == 1
+    assert later.polarity is Intent.NO
+    assert len(stub.requests) == 1
+
+
+def test_scheduler_batches_concurrent_questions(stub):
+    stub.answers["1. on holiday\n2. hmm let me see\n3. something odd"] = (
+        '["unavailable", "uncertain", "unknown"]'
+    )
+
+    async def run():
+        async with ChatClient(base_url=stub.url) as client:
+            llm = LLMIntentClassifier(client, scheduler={"batch_window": 0.05})
+            results = await asyncio.gather(
+                llm.classify("On holiday"),
+                llm.classify("Hmm, let me see"),
+                llm.classify("something odd"),
+            )
+            await llm.aclose()
+            return results, llm.scheduler.metrics()
+
+    results, metrics = asyncio.run(run())
+    assert results == [Intent.UNAVAILABLE, Intent.UNCERTAIN, None]
+    assert metrics["batches"] == 1 and metrics["completed"] == 3
+    assert len(stub.requests) == 1
+    assert "JSON list" in stub.requests[0][2]["messages"][0]["content"]
+
+
+def test_server_errors_fall_back(stub):
+    async def run():
+        async with ChatClient("test-key", base_url=stub.url + "/missing") as client:
+            llm = LLMIntentClassifier(client)
+            with pytest.raises(LLMError):
+                await llm.classify("anything else")
+
+            hybrid = HybridIntentClassifier(llm)
+            return await hybrid.classify("something else entirely"), hybrid.fallbacks
+
+    result, fallbacks = asyncio.run(run())
+    assert result.polarity is None and fallbacks == 1
+
+
+def test_voice_agent_escalates_unclear_turns(stub):
+    from campaign.runner import _simulated_orders
+    from campaign.simulated import ScriptedSTT, SilentTTS, SimulatedChannel
+    from last_mile_delivery.agent import ConversationState
+    from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+
+    stub.answers["i'm at my cousin's wedding all week"] = '{"intent": "unavailable"}'
+    order = next(_simulated_orders(1))
+
+    async def run():
+        async with ChatClient(base_url=stub.url) as client:
+            voice = LastMileDeliveryVoiceAgent(
+                order["phone"],
+                order=order,
+                channel=SimulatedChannel(
+                    ["yes", "I'm at my cousin's wedding all week"], time_scale=0.001
+                ),
+                stt=ScriptedSTT(time_scale=0.001),
+                tts=SilentTTS(time_scale=0.001),
+                intent_classifier=HybridIntentClassifier(LLMIntentClassifier(client)),
+                verbose=False,
+            )
+            await voice.run()
+            return voice
+
+    voice = asyncio.run(run())
+    assert ConversationState.OFFER_NEIGHBOR.value in voice.state_path
+    assert voice.intent_classifier.escalated == 1
+    assert len(stub.requests) == 1
+
+
+def test_campaign_shares_one_classifier_and_reports_its_queue(stub):
+    from campaign.runner import CampaignRunner, _simulated_orders
+    from campaign.simulated import ScriptedSTT, SilentTTS, SimulatedChannel
+    from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+
+    stub.answers["i'm at my cousin's wedding all week"] = '{"intent": "unavailable"}'
+
+    async def run():
+        async with ChatClient(base_url=stub.url) as client:
+            llm = LLMIntentClassifier(client, scheduler={"batch_window": 0.01})
+            hybrid = HybridIntentClassifier(llm)
+
+            def factory(order):
+                return LastMileDeliveryVoiceAgent(
+                    order["phone"],
+                    order=order,
+                    channel=SimulatedChannel(
+                        ["yes", "I'm at my cousin's wedding all week"], time_scale=0.001
+                    ),
+                    stt=ScriptedSTT(time_scale=0.001),
+                    tts=SilentTTS(time_scale=0.001),
+                    intent_classifier=hybrid,
+                    verbose=False,
+                )
+
+            runner = CampaignRunner(factory, concurrency=4, intent_classifier=hybrid)
+            stats = await runner.run(_simulated_orders(8))
+            return stats, llm
+
+    stats, llm = asyncio.run(run())
+    assert stats.count("completed") == 8
+    assert stats.intent["escalated"] == 8
+    # Concurrent calls share one cache and scheduler: one request
+    assert stats.intent["submitted"] == stats.intent["completed"] == 1
+    assert len(stub.requests) == 1
+    assert "queue max=" in stats.summary()
+    # Closed with the run
+    assert llm.scheduler._dispatcher.done()
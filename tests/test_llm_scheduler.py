@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from llm.chat_client import LLMError
+from llm.scheduler import (
+    PRIORITY_ACTIVE,
+    PRIORITY_NEW,
+    DeadlineExceeded,
+    LLMScheduler,
+    TokenBucket,
+)
+
+
+class FakeLLM:
+    """
+    Records what was sent; `gate` holds every request until set.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.batches = []
+        self.gate = None
+        self.error = None
+
+    async def send(self, payload):
+        self.sent.append(payload)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error:
+            raise self.error
+        return payload.upper()
+
+    async def send_batch(self, payloads):
+        self.batches.append(list(payloads))
+        if self.error:
+            raise self.error
+        return [p.upper() for p in payloads]
+
+
+def test_concurrent_requests_share_one_batch():
+    llm = FakeLLM()
+
+    async def run():
+        scheduler = LLMScheduler(llm.send, llm.send_batch, batch_window=0.02)
+        results = await asyncio.gather(*(scheduler.submit(w) for w in ("a", "b", "c")))
+        await scheduler.close()
+        return scheduler, results
+
+    scheduler, results = asyncio.run(run())
+    assert results == ["A", "B", "C"]
+    assert llm.batches == [["a", "b", "c"]] and llm.sent == []
+    metrics = scheduler.metrics()
+    assert metrics["batches"] == 1 and metrics["completed"] == 3
+    assert metrics["mean_batch"] == 3.0
+    assert metrics["max_queue_depth"] == 3 and metrics["queue_depth"] == 0
+    assert metrics["wait_p95_ms"] > 0
+
+
+def test_max_batch_splits_large_bursts():
+    llm = FakeLLM()
+
+    async def run():
+        scheduler = LLMScheduler(llm.send, llm.send_batch, batch_window=0.02, max_batch=2)
+        results = await asyncio.gather(*(scheduler.submit(w) for w in "abcde"))
+        await scheduler.close()
+        return results
+
+    assert asyncio.run(run()) == list("ABCDE")
+    assert [len(b) for b in llm.batches] == [2, 2]
+    assert llm.sent == ["e"]
+
+
+def test_active_calls_go_before_new_calls():
+    llm = FakeLLM()
+
+    async def run():
+        llm.gate = asyncio.Event()
+        scheduler = LLMScheduler(llm.send, max_in_flight=1, batch_window=0)
+        first = asyncio.create_task(scheduler.submit("busy"))
+        await asyncio.sleep(0.01)
+
+        new = asyncio.create_task(scheduler.submit("greeting", PRIORITY_NEW))
+        active = asyncio.create_task(scheduler.submit("mid-call", PRIORITY_ACTIVE))
+        await asyncio.sleep(0.01)
+        assert scheduler.queue_depth == 2 and scheduler.in_flight == 1
+
+        llm.gate.set()
+        await asyncio.gather(first, new, active)
+        await scheduler.close()
+
+    asyncio.run(run())
+    assert llm.sent == ["busy", "mid-call", "greeting"]
+
+
+def test_queued_request_past_deadline_is_never_sent():
+    llm = FakeLLM()
+
+    async def run():
+        llm.gate = asyncio.Event()
+        scheduler = LLMScheduler(llm.send, max_in_flight=1, batch_window=0)
+        first = asyncio.create_task(scheduler.submit("busy"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(DeadlineExceeded):
+            await scheduler.submit("late", timeout=0.05)
+
+        llm.gate.set()
+        assert await first == "BUSY"
+        await asyncio.sleep(0.01)
+        await scheduler.close()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert llm.sent == ["busy"]
+    assert scheduler.completed == 1
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    llm = FakeLLM()
+    llm.error = LLMError("rate limited")
+
+    async def run():
+        scheduler = LLMScheduler(llm.send, llm.send_batch, batch_window=0.02)
+        results = await asyncio.gather(
+            *(scheduler.submit(w) for w in ("a", "b")), return_exceptions=True
+        )
+        await scheduler.close()
+        return scheduler, results
+
+    scheduler, results = asyncio.run(run())
+    assert all(isinstance(r, LLMError) for r in results)
+    assert scheduler.failed == 2
+
+
+def test_short_batch_reply_is_an_error():
+    async def send_batch(payloads):
+        return payloads[:1]
+
+    async def run():
+        scheduler = LLMScheduler(None, send_batch, batch_window=0.02)
+        results = await asyncio.gather(
+            *(scheduler.submit(w) for w in ("a", "b")), return_exceptions=True
+        )
+        await scheduler.close()
+        return results
+
+    assert all(isinstance(r, LLMError) for r in asyncio.run(run()))
+
+
+def test_token_bucket(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("llm.scheduler.time.monotonic", lambda: now[0])
+
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.delay() == 0.0
+    bucket.tokens -= 2
+    assert bucket.delay() == pytest.approx(0.1)
+
+    now[0] = 0.05
+    assert bucket.delay() == pytest.approx(0.05)
+    now[0] = 10.0
+    assert bucket.delay() == 0.0 and bucket.tokens == 2
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_rate_limit_spaces_out_requests():
+    llm = FakeLLM()
+
+    async def run():
+        scheduler = LLMScheduler(llm.send, batch_window=0, rate=50, burst=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(scheduler.submit(w) for w in "abc"))
+        elapsed = loop.time() - started
+        await scheduler.close()
+        return elapsed
+
+    # burst of 1, then one request every 20 ms
+    assert asyncio.run(run()) >= 0.035
+    assert sorted(llm.sent) == ["a", "b", "c"]
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from memory.memory import ConversationMemory, Message
+
+
+def test_messages_read_like_dicts():
+    memory = ConversationMemory()
+    memory.start_session("call")
+    memory.add_message("agent", "Hello")
+    memory.append({"role": "user", "text": "hi"})
+
+    turns = memory.get_conversation()
+    assert turns == [{"role": "agent", "text": "Hello"}, {"role": "user", "text": "hi"}]
+    assert turns[1]["text"] == "hi"
+    assert turns[1].get("missing") is None
+    assert dict(turns[0]) == {"role": "agent", "text": "Hello"}
+    with pytest.raises(KeyError):
+        turns[0]["missing"]
+
+
+def test_rolling_window_keeps_latest_turns():
+    memory = ConversationMemory(max_turns=3)
+    memory.start_session("call")
+    for i in range(5):
+        memory.add_message("user", str(i))
+
+    assert [m.text for m in memory.get_conversation()] == ["2", "3", "4"]
+
+
+def test_oldest_sessions_evicted_and_archived(tmp_path):
+    archive = tmp_path / "transcripts.jsonl"
+    memory = ConversationMemory(max_sessions=2, archive_path=archive)
+    for call in ("a", "b", "c"):
+        memory.start_session(call)
+        memory.add_message("agent", f"hello {call}")
+
+    assert list(memory.sessions) == ["b", "c"]
+    assert memory.current_session == "c"
+
+    lines = [json.loads(line) for line in archive.read_text().splitlines()]
+    assert lines == [{"session_id": "a", "turns": [["agent", "hello a"]]}]
+
+
+def test_end_session_frees_and_archives(tmp_path):
+    archive = tmp_path / "transcripts.jsonl"
+    memory = ConversationMemory(archive_path=archive)
+    memory.start_session("call")
+    memory.add_message("agent", "Hello")
+    memory.add_message("user", "yes")
+    memory.end_session()
+
+    assert memory.sessions == {}
+    assert memory.get_conversation() == []
+    with pytest.raises(RuntimeError):
+        memory.add_message("agent", "too late")
+
+    record = json.loads(archive.read_text())
+    assert record["turns"] == [["agent", "Hello"], ["user", "yes"]]
+
+
+def test_message_roles_are_shared():
+    a, b = Message("".join(["ag", "ent"]), "x"), Message("agent", "y")
+    assert a.role is b.role
+    assert a == Message("agent", "x")
@@ -0,0 +1,289 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from last_mile_delivery import data
+from last_mile_delivery.data import OrderRepository
+from last_mile_delivery.journal import OrderJournal, FSYNC_NEVER
+from last_mile_delivery.sqlite_store import SQLiteOrderStore, import_csv
+
+
+HEADER = (
+    "order_id,customer_name,phone,failed_date,available_dates,"
+    "status,scheduled_date,neighbor_name,neighbor_phone\n"
+)
+
+
+@pytest.fixture
+def orders_file(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text(
+        HEADER
+        + '101,Raj Kumar,9876543210,Jan 10,"Jan 25|Jan 28",failed,"","",""\n'
+        + '102,Anita Sharma,9123456789,Jan 12,"Jan 26|Jan 29",failed,"","",""\n',
+        encoding="utf-8",
+    )
+    return path
+
+
+def _touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_lookup_by_phone_and_order_id(orders_file):
+    repo = OrderRepository(orders_file)
+
+    assert repo.find_by_phone("9123456789")["order_id"] == "102"
+    assert repo.find_by_order_id("101")["customer_name"] == "Raj Kumar"
+    assert repo.find_by_phone("0000000000") is None
+
+
+def test_returned_orders_are_copies(orders_file):
+    repo = OrderRepository(orders_file)
+
+    order = repo.find_by_phone("9876543210")
+    order["status"] = "mutated"
+
+    assert repo.find_by_phone("9876543210")["status"] == "failed"
+
+
+def test_appended_rows_are_loaded_incrementally(orders_file):
+    repo = OrderRepository(orders_file)
+    repo.all()
+    offset = repo._offset
+
+    with open(orders_file, "a", encoding="utf-8") as f:
+        f.write('103,Vikram Rao,9000000000,Jan 13,"Jan 27",failed,"","",""\n')
+    _touch_later(orders_file)
+
+    assert repo.find_by_phone("9000000000")["order_id"] == "103"
+    assert repo._offset > offset
+    assert len(repo.all()) == 3
+
+
+def test_rewritten_file_triggers_full_reload(orders_file):
+    repo = OrderRepository(orders_file)
+    repo.all()
+
+    orders_file.write_text(
+        HEADER + '201,New Customer,9111111111,Jan 14,"Jan 30",failed,"","",""\n',
+        encoding="utf-8",
+    )
+    _touch_later(orders_file)
+
+    assert repo.find_by_phone("9876543210") is None
+    assert repo.find_by_order_id("201")["customer_name"] == "New Customer"
+
+
+def test_update_persists_and_reloads(orders_file):
+    repo = OrderRepository(orders_file)
+    assert repo.update("101", {"status": "scheduled", "scheduled_date": "Jan 25"})
+    assert not repo.update("999", {"status": "scheduled"})
+
+    fresh = OrderRepository(orders_file)
+    order = fresh.find_by_order_id("101")
+    assert order["status"] == "scheduled"
+    assert order["scheduled_date"] == "Jan 25"
+
+
+# --------------------------------------------------
+# JOURNAL
+# --------------------------------------------------
+
+def _journaled(orders_file, **kwargs):
+    journal = OrderJournal(orders_file.with_suffix(".journal"), fsync=FSYNC_NEVER)
+    return OrderRepository(orders_file, journal=journal, **kwargs)
+
+
+def test_journal_updates_do_not_rewrite_snapshot(orders_file):
+    repo = _journaled(orders_file)
+    before = orders_file.read_bytes()
+
+    repo.update("101", {"status": "scheduled", "scheduled_date": "Jan 25"})
+
+    assert orders_file.read_bytes() == before
+    assert repo.find_by_phone("9876543210")["status"] == "scheduled"
+
+
+def test_reads_do_not_create_the_journal(orders_file):
+    repo = _journaled(orders_file)
+    journal = orders_file.with_suffix(".journal")
+
+    assert repo.find_by_phone("9876543210")["order_id"] == "101"
+    assert len(repo.all()) == 2
+    assert not journal.exists()
+
+    repo.update("101", {"status": "scheduled"})
+    assert journal.exists()
+
+
+def test_journal_is_replayed_by_other_readers(orders_file):
+    writer = _journaled(orders_file)
+    reader = _journaled(orders_file)
+    reader.all()
+
+    writer.update("102", {"status": "cancelled"})
+
+    assert reader.find_by_order_id("102")["status"] == "cancelled"
+
+
+def test_recovery_skips_torn_record(orders_file):
+    repo = _journaled(orders_file)
+    repo.update("101", {"status": "scheduled"})
+
+    journal_path = orders_file.with_suffix(".journal")
+    with open(journal_path, "ab") as f:
+        f.write(b'{"order_id":"102","changes":{"sta')
+
+    recovered = _journaled(orders_file)
+    assert recovered.find_by_order_id("101")["status"] == "scheduled"
+    assert recovered.find_by_order_id("102")["status"] == "failed"
+    assert journal_path.read_bytes().endswith(b"\n")
+
+    recovered.update("102", {"status": "cancelled"})
+    assert _journaled(orders_file).find_by_order_id("102")["status"] == "cancelled"
+
+
+def test_compaction_folds_journal_into_snapshot(orders_file):
+    repo = _journaled(orders_file, compact_every=2)
+    repo.update("101", {"status": "scheduled"})
+    repo.update("102", {"status": "cancelled"})
+
+    assert orders_file.with_suffix(".journal").stat().st_size == 0
+
+    plain = OrderRepository(orders_file)
+    assert plain.find_by_order_id("101")["status"] == "scheduled"
+    assert plain.find_by_order_id("102")["status"] == "cancelled"
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    orders_file = tmp_path / "orders.csv"
+    orders_file.write_text(
+        HEADER + "".join(
+            f'{i},Customer {i},90000000{i:02d},Jan 10,"Jan 25",failed,"","",""\n'
+            for i in range(40)
+        ),
+        encoding="utf-8",
+    )
+
+    # Several repositories stand in for several worker processes
+    repos = [_journaled(orders_file, compact_every=7) for _ in range(4)]
+
+    def outcome(i):
+        repos[i % len(repos)].update(str(i), {"status": "scheduled"})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(outcome, range(40)))
+
+    repos[0].compact()
+    fresh = OrderRepository(orders_file)
+    assert all(order["status"] == "scheduled" for order in fresh.all())
+
+
+def test_concurrent_saves_use_their_own_temp_files(orders_file):
+    orders = OrderRepository(orders_file).all()
+
+    def save(i):
+        rows = [dict(order, status=f"status-{i}") for order in orders]
+        data.save_orders(rows, orders_file)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(32)))
+
+    # One writer's complete file wins; no temp file is left behind
+    statuses = {order["status"] for order in OrderRepository(orders_file).all()}
+    assert len(statuses) == 1
+    assert [p.name for p in orders_file.parent.iterdir()] == ["orders.csv"]
+
+
+# --------------------------------------------------
+# SQLITE STORE
+# --------------------------------------------------
+
+def test_sqlite_import_and_lookup(orders_file, tmp_path):
+    db_path = tmp_path / "orders.db"
+    assert import_csv(orders_file, db_path) == 2
+
+    store = SQLiteOrderStore(db_path)
+    assert store.find_by_phone("9123456789")["order_id"] == "102"
+    assert store.find_by_order_id("101")["available_dates"] == "Jan 25|Jan 28"
+    assert [o["order_id"] for o in store.find_by_status("failed")] == ["101", "102"]
+
+
+def test_sqlite_batched_updates(orders_file, tmp_path):
+    db_path = tmp_path / "orders.db"
+    import_csv(orders_file, db_path)
+
+    writer = SQLiteOrderStore(db_path, batch_size=10, flush_interval=60)
+    reader = SQLiteOrderStore(db_path)
+
+    with writer.batch():
+        assert writer.update("101", {"status": "scheduled"})
+        assert writer.update("102", {"status": "cancelled"})
+        assert not writer.update("999", {"status": "scheduled"})
+
+        # Own reads see queued changes, other connections do not yet
+        assert writer.find_by_order_id("101")["status"] == "scheduled"
+        assert reader.find_by_order_id("101")["status"] == "failed"
+
+    assert reader.find_by_order_id("101")["status"] == "scheduled"
+    assert reader.find_by_order_id("102")["status"] == "cancelled"
+
+    with pytest.raises(ValueError):
+        writer.update("101", {"status; DROP TABLE orders": "x"})
+
+
+def test_sqlite_update_survives_reopen(orders_file, tmp_path):
+    db_path = tmp_path / "orders.db"
+    import_csv(orders_file, db_path)
+
+    # Default store writes through: nothing left to flush on exit
+    store = SQLiteOrderStore(db_path)
+    assert store.update("101", {"status": "scheduled", "scheduled_date": "Jan 25"})
+    del store
+    assert SQLiteOrderStore(db_path).find_by_order_id("101")["status"] == "scheduled"
+
+    # A batching store hands its queue to the database on close
+    previous = data.get_repository()
+    data.set_repository(SQLiteOrderStore(db_path, batch_size=10, flush_interval=60))
+    try:
+        data.mark_failed("101")
+        assert SQLiteOrderStore(db_path).find_by_order_id("101")["status"] == "scheduled"
+        data.close_repository()
+    finally:
+        data.set_repository(previous)
+    assert SQLiteOrderStore(db_path).find_by_order_id("101")["status"] == "failed"
+
+
+def test_sqlite_close_closes_every_thread_connection(orders_file, tmp_path):
+    db_path = tmp_path / "orders.db"
+    import_csv(orders_file, db_path)
+    store = SQLiteOrderStore(db_path)
+
+    # Executor threads (run_blocking, the exporter) get their own connections
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(lambda _: store.find_by_phone("9876543210"), range(12)))
+    connections = set(store._connections)
+    assert len(connections) >= 2
+
+    store.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+            conn.execute("SELECT 1")
+
+    # Still usable: the calling thread reconnects
+    assert store.find_by_order_id("102")["status"] == "failed"
+
+
+def test_sqlite_repository_batching_from_env(monkeypatch, orders_file, tmp_path):
+    monkeypatch.setattr(data, "ORDER_DB", tmp_path / "orders.db")
+    monkeypatch.setattr(data, "DATA_FILE", orders_file)
+    monkeypatch.setattr(data, "ORDER_DB_BATCH_SIZE", 50)
+    monkeypatch.setattr(data, "ORDER_DB_FLUSH_MS", 250)
+
+    store = data.create_repository("sqlite")
+    assert (store.batch_size, store.flush_interval) == (50, 0.25)
+    store.close()
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from audio.channel import CallDropped
+from campaign.runner import _simulated_orders
+from campaign.simulated import ScriptedSTT, SilentTTS, SimulatedChannel
+from last_mile_delivery.agent import ConversationState, LastMileDeliveryAgent
+from last_mile_delivery.session import (
+    DictSessionStore,
+    FileSessionStore,
+    SessionError,
+    SessionManager,
+    SessionSnapshot,
+    SQLiteSessionStore,
+    decode,
+    encode,
+)
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+from memory.memory import ConversationMemory
+
+ORDER = next(_simulated_orders(1))
+
+
+def _agent(order=ORDER):
+    memory = ConversationMemory()
+    memory.start_session("call")
+    return LastMileDeliveryAgent(memory, order)
+
+
+def test_codec_round_trip():
+    snapshot = SessionSnapshot(
+        flow="delivery",
+        state="confirm_date",
+        order_id="101",
+        context={"date": "Jan 25", "tries": 2, "score": 0.5, "ok": True, "none": None},
+        turns=[("agent", "Hello, am I speaking with Rāj?"), ("user", "yes"), ("system", "note")],
+    )
+    assert decode(encode(snapshot)) == snapshot
+
+
+def test_long_turn_logs_are_compressed():
+    turns = [("agent", "Please confirm if the delivery date is okay.")] * 50
+    data = encode(SessionSnapshot("delivery", "confirm_date", "1", turns=turns))
+    assert data[3] & 1
+    assert len(data) < 300
+    assert decode(data).turns == turns
+
+
+def test_bad_snapshots_are_rejected():
+    data = encode(SessionSnapshot("delivery", "close", "1"))
+    with pytest.raises(SessionError):
+        decode(b"XX" + data[2:])
+    with pytest.raises(SessionError):
+        decode(data[:-2])
+    with pytest.raises(SessionError):
+        encode(SessionSnapshot("delivery", "close", context={"bad": [1]}))
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: DictSessionStore(),
+    lambda tmp_path: FileSessionStore(tmp_path),
+    lambda tmp_path: SQLiteSessionStore(tmp_path / "sessions.db"),
+])
+def test_stores(tmp_path, make_store):
+    store = make_store(tmp_path)
+    assert store.get("a") is None
+    store.put("a", b"one")
+    store.put("a", b"two")
+    assert store.get("a") == b"two"
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_agent_moves_between_workers():
+    agent = _agent()
+    agent.start()
+    agent.handle_input("yes")
+    agent.handle_input("jan 28 please")
+
+    sessions = SessionManager()
+    size = sessions.save("call-1", agent)
+    assert size < 400
+
+    memory = ConversationMemory()
+    memory.start_session("call")
+    resumed = LastMileDeliveryAgent.from_snapshot(sessions.load("call-1"), memory, order=ORDER)
+
+    assert resumed.state == ConversationState.CONFIRM_DATE
+    assert resumed.context == {"date": "Jan 28"}
+    assert resumed.memory.get_conversation() == agent.memory.get_conversation()
+
+
+def test_voice_agent_resumes_saved_call(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        "last_mile_delivery.agent.mark_scheduled",
+        lambda order_id, date: scheduled.append(date),
+    )
+
+    # First worker got as far as the date confirmation
+    agent = _agent()
+    agent.start()
+    agent.handle_input("yes")
+    agent.handle_input("jan 28")
+    sessions = SessionManager()
+    sessions.save(f"order_{ORDER['order_id']}", agent)
+
+    voice = LastMileDeliveryVoiceAgent(
+        ORDER["phone"],
+        order=ORDER,
+        channel=SimulatedChannel(["yes"], time_scale=0.001),
+        stt=ScriptedSTT(time_scale=0.001),
+        tts=SilentTTS(time_scale=0.001),
+        sessions=sessions,
+        verbose=False,
+    )
+    asyncio.run(voice.run())
+
+    assert scheduled == ["Jan 28"]
+    assert voice.agent.state == ConversationState.CLOSE
+    assert sessions.load(voice.call_id) is None
+
+
+class FailingSTT:
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        raise RuntimeError("STT down")
+
+
+class DroppingChannel(SimulatedChannel):
+    async def record(self, preroll=None) -> bytes:
+        raise CallDropped("trunk lost")
+
+
+def _saved_call(sessions, channel, stt=None):
+    # A previous attempt left a snapshot mid-conversation
+    agent = _agent()
+    agent.start()
+    agent.handle_input("yes")
+    sessions.save(f"order_{ORDER['order_id']}", agent)
+
+    return LastMileDeliveryVoiceAgent(
+        ORDER["phone"],
+        order=ORDER,
+        channel=channel,
+        stt=stt or ScriptedSTT(time_scale=0.001),
+        tts=SilentTTS(time_scale=0.001),
+        sessions=sessions,
+        verbose=False,
+    )
+
+
+def test_no_response_call_discards_session():
+    sessions = SessionManager()
+    voice = _saved_call(sessions, SimulatedChannel([], time_scale=0.001))
+    asyncio.run(voice.run())
+
+    assert voice.outcome == "no_response"
+    assert sessions.load(voice.call_id) is None
+
+
+def test_failed_call_discards_session():
+    sessions = SessionManager()
+    voice = _saved_call(sessions, SimulatedChannel(["yes"], time_scale=0.001), FailingSTT())
+    with pytest.raises(RuntimeError, match="STT down"):
+        asyncio.run(voice.run())
+
+    assert voice.outcome == "error"
+    assert sessions.load(voice.call_id) is None
+
+
+def test_dropped_call_keeps_session_for_resume():
+    sessions = SessionManager()
+    voice = _saved_call(sessions, DroppingChannel([], time_scale=0.001))
+    with pytest.raises(CallDropped):
+        asyncio.run(voice.run())
+
+    assert voice.outcome == "dropped"
+    assert sessions.load(voice.call_id).state == voice.agent.engine.state
@@ -0,0 +1,182 @@
+import asyncio
+
+from campaign.runner import _simulated_orders
+from campaign.simulated import ScriptedSTT, SilentTTS, SimulatedChannel, script_for
+from last_mile_delivery.agent import ConversationState, LastMileDeliveryAgent
+from last_mile_delivery.speculation import Speculator
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+from memory.memory import ConversationMemory
+
+ORDER = next(_simulated_orders(1))
+TIME_SCALE = 0.001
+
+
+def _agent():
+    memory = ConversationMemory()
+    memory.start_session("call")
+    agent = LastMileDeliveryAgent(memory, ORDER)
+    agent.start()
+    agent.handle_input("yes")
+    return agent
+
+
+def test_matching_final_keeps_prepared_reply(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        "last_mile_delivery.agent.mark_scheduled",
+        lambda order_id, date: scheduled.append(date),
+    )
+
+    async def run():
+        agent = _agent()
+        agent.handle_input("jan 28")
+        speculator = Speculator(agent, SilentTTS(time_scale=TIME_SCALE))
+
+        speculator.offer("yes")
+        speculator.offer("yes")           # same reply: not restarted
+        assert speculator.started == 1
+        assert scheduled == []            # preview has no side effects
+
+        prepared = speculator.take("yes please")
+        assert prepared is not None and speculator.hits == 1
+        assert prepared.response == agent.handle_input("yes please")
+        assert len(await prepared.audio()) > 0
+
+    asyncio.run(run())
+    assert scheduled == ["Jan 28"]
+
+
+def test_different_final_discards_prepared_reply():
+    async def run():
+        agent = _agent()
+        speculator = Speculator(agent, SilentTTS(time_scale=TIME_SCALE))
+
+        speculator.offer("jan 25")
+        speculator.offer("jan 25 or")     # still Jan 25
+        speculator.offer("hmm")           # not understood: kept
+        assert speculator.current.resolution.captured == {"date": "Jan 25"}
+
+        assert speculator.take("jan 25 or jan 28, jan 28 is better") is None
+        assert speculator.misses == 1
+        assert agent.state == ConversationState.OFFER_DATES
+
+    asyncio.run(run())
+
+
+def test_prepared_stream_replays_buffered_chunks():
+    async def run():
+        tts = SilentTTS(time_scale=TIME_SCALE)
+        speculator = Speculator(_agent(), tts)
+        speculator.offer("jan 30")
+        await asyncio.sleep(0.01)
+
+        prepared = speculator.take("jan 30")
+        chunks = [chunk async for chunk in prepared.stream()]
+        expected = [chunk async for chunk in tts.stream(prepared.response)]
+        assert b"".join(chunks) == b"".join(expected)
+
+    asyncio.run(run())
+
+
+def test_speculative_call_uses_pause_transcripts(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        "last_mile_delivery.agent.mark_scheduled",
+        lambda order_id, date: scheduled.append(date),
+    )
+
+    voice = LastMileDeliveryVoiceAgent(
+        ORDER["phone"],
+        order=ORDER,
+        channel=SimulatedChannel(script_for(ORDER, "schedule"), time_scale=TIME_SCALE),
+        stt=ScriptedSTT(time_scale=TIME_SCALE),
+        tts=SilentTTS(time_scale=TIME_SCALE),
+        speculative=True,
+        verbose=False,
+    )
+    asyncio.run(voice.run())
+
+    assert voice.agent.state == ConversationState.CLOSE
+    assert scheduled == ["Jan 25"]
+    assert voice.speculator.hits == 3
+    assert voice.speculator.misses == 0
+
+
+class _StreamingChannel(SimulatedChannel):
+    async def frames(self):
+        while True:
+            yield b"\x00\x00" * 320
+            await asyncio.sleep(0.001)
+
+
+class _FakeStreamingSTT:
+    """
+    Emits (text, is_final, speech_final) results every `gap` frames.
+    """
+
+    def __init__(self, results, gap=30):
+        self.results = list(results)
+        self.gap = gap
+        self.frames = 0
+
+    async def start(self, on_result):
+        self.on_result = on_result
+
+    async def send(self, frame):
+        self.frames += 1
+        if self.results and self.frames % self.gap == 0:
+            self.on_result(*self.results.pop(0))
+
+    async def close(self):
+        pass
+
+
+def test_streaming_partials_prepare_replies(monkeypatch):
+    monkeypatch.setattr("last_mile_delivery.agent.mark_scheduled", lambda *args: None)
+
+    voice = LastMileDeliveryVoiceAgent(
+        ORDER["phone"],
+        order=ORDER,
+        channel=_StreamingChannel([], time_scale=TIME_SCALE),
+        streaming_stt=_FakeStreamingSTT([
+            ("yes", False, False), ("yes", True, True),
+            ("jan 25", False, False), ("jan 25 works", True, True),
+            ("yes", False, False), ("yes", True, True),
+        ]),
+        tts=SilentTTS(time_scale=TIME_SCALE),
+        speculative=True,
+        verbose=False,
+    )
+    asyncio.run(voice.run())
+
+    assert voice.agent.state == ConversationState.CLOSE
+    assert voice.speculator.hits == 3
+
+
+def test_new_pause_cancels_the_previous_transcription():
+    class SlowSTT:
+        def __init__(self):
+            self.started = self.finished = 0
+
+        async def transcribe(self, audio_bytes: bytes) -> str:
+            self.started += 1
+            await asyncio.sleep(0.05)
+            self.finished += 1
+            return audio_bytes.decode()
+
+    async def run():
+        stt = SlowSTT()
+        speculator = Speculator(_agent(), SilentTTS(time_scale=TIME_SCALE), stt=stt)
+        speculator.offer_audio(b"jan 25")
+        await asyncio.sleep(0.01)
+        speculator.offer_audio(b"jan 25 no jan 28")
+        await asyncio.sleep(0.01)
+        assert len(speculator._pending) == 1
+
+        await asyncio.sleep(0.1)
+        return stt, speculator
+
+    stt, speculator = asyncio.run(run())
+    assert (stt.started, stt.finished) == (2, 1)
+    assert speculator.started == 1
+    assert speculator.current.resolution.captured == {"date": "Jan 28"}
@@ -0,0 +1,34 @@
+from telemetry.startup import StartupProfile, main, parse_importtime
+
+REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _json
+import time:       300 |        420 | json
+import time:        50 |         50 |     b.c
+import time:        80 |        130 |   b
+import time:       200 |        330 | a
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(REPORT)
+    assert [(r.module, r.depth) for r in records] == [
+        ("_json", 1), ("json", 0), ("b.c", 2), ("b", 1), ("a", 0),
+    ]
+    assert records[1].self_us == 300 and records[1].cumulative_us == 420
+
+
+def test_profile_counts_only_what_the_modules_import():
+    profile = StartupProfile(["json"])
+    names = {r.module for r in profile.records}
+    assert "json" in names and "site" not in names
+    assert profile.total_ms > 0
+    assert "json" in profile.by_package()
+    assert "Startup imports for json" in profile.report(budget_ms=10_000)
+
+
+def test_budget_sets_exit_status(capsys):
+    assert main(["json", "--budget-ms", "10000"]) == 0
+    assert main(["json", "--budget-ms", "0"]) == 1
+    assert "❌" in capsys.readouterr().out
+    assert main(["no_such_module_anywhere"]) == 2
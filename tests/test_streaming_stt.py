@@ -0,0 +1,150 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from stt.deepgram_streaming_stt import DeepgramStreamingSTT
+from stt.stt_adapter import STTAdapter
+from stt.streaming_events import PartialTranscript, FinalTranscript
+from stt.streaming_transcriber import StreamingTranscriber
+
+
+def _results(text, is_final=False, speech_final=False):
+    return json.dumps({
+        "type": "Results",
+        "channel": {"alternatives": [{"transcript": text}]},
+        "is_final": is_final,
+        "speech_final": speech_final,
+    })
+
+
+# Mock Deepgram: replies are keyed on the number of audio frames received
+SCRIPT = {
+    2: _results("yes"),
+    4: _results("yes that's", is_final=True),
+    5: _results("fine", is_final=True, speech_final=True),
+}
+
+
+async def _mock_deepgram(connection):
+    query = parse_qs(urlparse(connection.request.path).query)
+    assert query["endpointing"] == ["300"]
+    assert query["interim_results"] == ["true"]
+
+    frames = 0
+    async for message in connection:
+        if isinstance(message, str):
+            if json.loads(message)["type"] == "CloseStream":
+                break
+            continue
+        frames += 1
+        if frames in SCRIPT:
+            await connection.send(SCRIPT[frames])
+
+
+async def _with_server(test):
+    async with websockets.serve(_mock_deepgram, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        client = DeepgramStreamingSTT("test-key", url=f"ws://127.0.0.1:{port}")
+        return await test(client)
+
+
+async def _frames(count, frame=b"\x00\x00" * 320):
+    for _ in range(count):
+        yield frame
+        await asyncio.sleep(0)
+
+
+def test_adapter_emits_partial_and_final_events():
+    partials, finals = [], []
+
+    async def test(client):
+        adapter = STTAdapter(client, on_transcript=finals.append, on_partial=partials.append)
+        await adapter.start()
+        async for frame in _frames(5):
+            await client.send(frame)
+        await client.finish()
+
+    asyncio.run(_with_server(test))
+
+    assert partials == [PartialTranscript(text="yes")]
+    assert finals == [FinalTranscript(text="yes that's fine", language="en")]
+
+
+def test_transcriber_returns_one_turn_per_endpoint():
+    async def test(client):
+        transcriber = StreamingTranscriber(client, _frames(6))
+        await transcriber.start()
+        try:
+            turn = await transcriber.next_turn(timeout=2)
+            silence = await transcriber.next_turn(timeout=0.05)
+        finally:
+            await transcriber.close()
+        return turn, silence
+
+    turn, silence = asyncio.run(_with_server(test))
+
+    assert turn.text == "yes that's fine"
+    assert silence is None
+
+
+def test_adapter_without_endpointing_treats_finals_as_turns():
+    finals = []
+    adapter = STTAdapter(stt_client=None, on_transcript=finals.append)
+
+    adapter._handle_result("no thanks", True)
+
+    assert finals == [FinalTranscript(text="no thanks", language="en")]
+
+
+def test_dropped_stream_raises_instead_of_timing_out():
+    async def drop_after_two_frames(connection):
+        frames = 0
+        async for message in connection:
+            frames += 1
+            if frames == 2:
+                await connection.close(code=1011, reason="internal error")
+
+    async def run():
+        async with websockets.serve(drop_after_two_frames, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = DeepgramStreamingSTT("test-key", url=f"ws://127.0.0.1:{port}")
+            transcriber = StreamingTranscriber(client, _frames(3))
+            await transcriber.start()
+            try:
+                with pytest.raises(ConnectionError, match="receiver failed"):
+                    await transcriber.next_turn(timeout=2)
+                # Still failed on the next turn
+                with pytest.raises(ConnectionError):
+                    await transcriber.next_turn(timeout=0.01)
+            finally:
+                await transcriber.close()
+
+    asyncio.run(run())
+
+
+def test_failed_send_raises_from_next_turn():
+    class BrokenClient:
+        async def start(self, on_result):
+            pass
+
+        async def send(self, frame):
+            raise OSError("socket gone")
+
+        async def close(self):
+            pass
+
+    async def run():
+        transcriber = StreamingTranscriber(BrokenClient(), _frames(3))
+        await transcriber.start()
+        try:
+            await transcriber.wait_for_speech()   # a failure also ends a barge-in wait
+            with pytest.raises(ConnectionError, match="audio pump failed.*socket gone"):
+                await transcriber.next_turn(timeout=2)
+        finally:
+            await transcriber.close()
+
+    asyncio.run(run())
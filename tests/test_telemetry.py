@@ -0,0 +1,111 @@
+import asyncio
+import urllib.request
+
+import pytest
+
+from campaign.runner import _simulated_orders
+from campaign.simulated import ScriptedSTT, SilentTTS, SimulatedChannel, script_for
+from last_mile_delivery.voice_agent import LastMileDeliveryVoiceAgent
+from telemetry import tracing
+from telemetry.exporters import LogExporter, MemoryCollector, PrometheusExporter
+from telemetry.tracing import NULL_TRACE, NULL_TRACER, Histogram, Tracer
+
+
+def test_histogram_quantiles():
+    h = Histogram()
+    for ms in range(1, 101):
+        h.observe(ms / 1000)
+
+    assert h.count == 100
+    assert h.mean == pytest.approx(0.0505)
+    assert h.quantile(0.5) == pytest.approx(0.05, abs=0.01)
+    assert h.quantile(0.95) == pytest.approx(0.095, abs=0.01)
+    assert h.quantile(1.0) == pytest.approx(0.1)
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_histogram_merge_and_cumulative():
+    a, b = Histogram(), Histogram()
+    a.observe(0.02)
+    b.observe(20.0)
+    a.merge(b)
+
+    buckets = list(a.cumulative())
+    assert buckets[-1] == (float("inf"), 2)
+    assert a.min == 0.02 and a.max == 20.0
+    with pytest.raises(ValueError):
+        a.merge(Histogram((1.0,)))
+
+
+def test_call_traces_merge_into_tracer():
+    collector = MemoryCollector()
+    tracer = Tracer([collector])
+    for call in ("a", "b"):
+        trace = tracer.call(call)
+        trace.record(tracing.STT, 0.2)
+        with trace.span(tracing.HANDLE_INPUT):
+            pass
+        trace.end()
+
+    assert tracer.calls == 2
+    assert tracer.histograms()[tracing.STT].count == 2
+    assert collector.samples(tracing.STT) == [0.2, 0.2]
+    assert tracing.STT in tracer.report()
+
+
+def test_null_tracer_records_nothing():
+    trace = NULL_TRACER.call("a")
+    assert trace is NULL_TRACE
+    with trace.span(tracing.STT):
+        trace.record(tracing.TURN, 1.0)
+    trace.end()
+    assert NULL_TRACER.calls == 0
+
+
+def test_log_and_prometheus_exporters():
+    lines = []
+    tracer = Tracer([LogExporter(lines.append)])
+    prometheus = PrometheusExporter(tracer, {"intent_llm": lambda: {"queue_depth": 3}})
+    tracer.exporters.append(prometheus)
+
+    trace = tracer.call("order_1")
+    trace.record(tracing.STT, 0.3)
+    trace.end()
+
+    assert lines[0].startswith("⏱️ order_1") and "stt=300ms" in lines[0]
+
+    port = prometheus.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as r:
+            text = r.read().decode()
+    finally:
+        prometheus.close()
+
+    assert 'voice_stage_seconds_bucket{stage="stt",le="0.5"} 1' in text
+    assert 'voice_stage_seconds_count{stage="stt"} 1' in text
+    assert "voice_calls_total 1" in text
+    assert "# TYPE intent_llm_queue_depth gauge\nintent_llm_queue_depth 3" in text
+
+
+def test_voice_agent_times_every_stage():
+    order = next(_simulated_orders(1))
+    collector = MemoryCollector()
+
+    voice = LastMileDeliveryVoiceAgent(
+        order["phone"],
+        order=order,
+        channel=SimulatedChannel(script_for(order, "schedule"), time_scale=0.001),
+        stt=ScriptedSTT(time_scale=0.001),
+        tts=SilentTTS(time_scale=0.001),
+        tracer=Tracer([collector]),
+        verbose=False,
+    )
+    asyncio.run(voice.run())
+
+    (trace,) = collector.traces
+    assert trace.call_id == voice.call_id
+    for stage in set(tracing.STAGES) - {tracing.INTENT}:
+        assert stage in trace.stages, stage
+    assert trace.stages[tracing.STT].count == 3
+    assert trace.stages[tracing.HANDLE_INPUT].count == 3
+    assert len(collector.samples(tracing.TURN)) == len(voice.turn_latencies)
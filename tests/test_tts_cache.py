@@ -0,0 +1,160 @@
+import asyncio
+import os
+import threading
+
+from audio.codec import MULAW_8K
+from tts.cache import (
+    CachedTTS,
+    DiskCache,
+    MemoryCache,
+    TTSCache,
+    cache_key,
+    static_prompts,
+    warm,
+)
+
+
+class CountingTTS:
+    model = "test-voice"
+    sample_rate = 8000
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text: str) -> bytes:
+        self.calls += 1
+        return text.encode() * 100
+
+    async def stream(self, text: str):
+        self.calls += 1
+        audio = text.encode() * 100
+        for i in range(0, len(audio), 50):
+            yield audio[i:i + 50]
+
+
+def test_cache_key_depends_on_voice_and_rate():
+    key = cache_key("Hello", "aura", 24000)
+    assert key == cache_key("Hello", "aura", 24000, "linear16")
+    assert key != cache_key("Hello", "aura", 24000, "mulaw")
+    assert key != cache_key("Hello", "aura", 16000)
+    assert key != cache_key("Hello", "orion", 24000)
+    assert key != cache_key("Hello.", "aura", 24000)
+
+
+def test_cached_tts_key_includes_the_output_encoding():
+    class MulawTTS(CountingTTS):
+        format = MULAW_8K
+
+    cache = TTSCache()
+    linear, mulaw = CachedTTS(CountingTTS(), cache=cache), CachedTTS(MulawTTS(), cache=cache)
+    assert linear.key("Hello") != mulaw.key("Hello")
+    # One byte per sample: 100 ms chunks are 800 bytes
+    assert mulaw.chunk_bytes == 800 and linear.chunk_bytes == 1600
+
+
+def test_memory_cache_evicts_least_recently_used_by_size():
+    cache = MemoryCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # "b" is now the oldest
+
+    cache.put("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.size == 8
+
+    # Larger than the whole tier: not cached, nothing evicted
+    cache.put("d", b"d" * 11)
+    assert cache.get("d") is None
+    assert len(cache) == 2
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    TTSCache(directory=tmp_path).put("k", b"pcm")
+
+    cache = TTSCache(directory=tmp_path)
+    assert cache.get("k") == b"pcm"
+    assert cache.memory.get("k") == b"pcm"
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=100, low_water=0.6)
+    for i, key in enumerate(("aa1", "bb2", "cc3")):
+        cache.put(key, b"x" * 30)
+        # Distinct mtimes, oldest first
+        os.utime(cache._path(key), (i, i))
+
+    assert cache.get("aa1") == b"x" * 30   # refreshed: now the newest
+    cache.put("dd4", b"x" * 30)            # 120 bytes > cap
+
+    assert cache.size == 60
+    assert cache.get("bb2") is None and cache.get("cc3") is None
+    assert cache.get("aa1") is not None and cache.get("dd4") is not None
+
+    cache.put("huge", b"x" * 101)
+    assert cache.get("huge") is None
+
+
+def test_disk_io_stays_off_the_event_loop(tmp_path, monkeypatch):
+    threads = set()
+    disk_get, disk_put = DiskCache.get, DiskCache.put
+
+    def get(self, key):
+        threads.add(threading.get_ident())
+        return disk_get(self, key)
+
+    def put(self, key, audio):
+        threads.add(threading.get_ident())
+        disk_put(self, key, audio)
+
+    monkeypatch.setattr(DiskCache, "get", get)
+    monkeypatch.setattr(DiskCache, "put", put)
+    cached = CachedTTS(CountingTTS(), cache=TTSCache(directory=tmp_path))
+
+    async def run():
+        await cached.synthesize("Hello")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads and loop_thread not in threads
+
+
+def test_cached_tts_renders_once():
+    tts = CountingTTS()
+    cached = CachedTTS(tts, cache=TTSCache())
+
+    first = asyncio.run(cached.synthesize("Hello"))
+    second = asyncio.run(cached.synthesize("Hello"))
+    assert first == second
+    assert tts.calls == 1
+
+
+def test_cached_stream_stores_only_complete_renders():
+    tts = CountingTTS()
+    cached = CachedTTS(tts, cache=TTSCache())
+
+    async def first_chunk():
+        stream = cached.stream("Hi")
+        chunk = await stream.__anext__()
+        await stream.aclose()
+        return chunk
+
+    async def collect():
+        return b"".join([c async for c in cached.stream("Hi")])
+
+    asyncio.run(first_chunk())
+    assert cached.cache.get(cached.key("Hi")) is None
+
+    assert asyncio.run(collect()) == b"Hi" * 100
+    assert asyncio.run(collect()) == b"Hi" * 100
+    assert tts.calls == 2
+
+
+def test_warm_up_renders_static_prompts_once(tmp_path):
+    tts = CountingTTS()
+    cached = CachedTTS(tts, cache=TTSCache(directory=tmp_path))
+    prompts = static_prompts()
+
+    assert asyncio.run(warm(cached, prompts)) == len(prompts)
+    assert asyncio.run(warm(cached, prompts)) == 0
+    assert tts.calls == len(prompts)
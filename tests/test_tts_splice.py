@@ -0,0 +1,123 @@
+import asyncio
+
+import numpy as np
+
+from audio.codec import MULAW_8K, decode, encode
+from last_mile_delivery.agent import CONFIRM_DATE, GREETING, OFFER_DATES, TEMPLATES
+from tts.cache import TTSCache, CachedTTS
+from tts.splice import Template, TemplateTTS, crossfade_concat, trim_silence
+
+
+class ToneTTS:
+    """
+    Renders 10 ms of a constant tone per character, padded with silence.
+    """
+
+    model = "test-voice"
+    sample_rate = 8000
+
+    def __init__(self):
+        self.rendered: list[str] = []
+
+    def synthesize(self, text: str) -> bytes:
+        self.rendered.append(text)
+        pad = np.zeros(160, dtype=np.int16)
+        tone = np.full(80 * len(text), 1000, dtype=np.int16)
+        return np.concatenate([pad, tone, pad]).tobytes()
+
+
+def test_template_splits_slot_and_moves_punctuation():
+    template = Template(CONFIRM_DATE)
+    values = template.match("Just to confirm, should we deliver the parcel on Jan 25?")
+
+    assert values == {"date": "Jan 25"}
+    assert template.split(values) == [
+        ("text", "Just to confirm, should we deliver the parcel on"),
+        ("slot", "Jan 25?"),
+    ]
+    assert template.match("Please confirm if the delivery date is okay.") is None
+
+
+def test_template_with_text_after_slot():
+    template = Template(OFFER_DATES)
+    parts = template.split(template.match(OFFER_DATES.format(dates="Jan 25, Jan 28")))
+
+    assert [kind for kind, _ in parts] == ["text", "slot", "text"]
+    assert parts[1] == ("slot", "Jan 25, Jan 28.")
+    assert parts[2] == ("text", "Which date would you prefer?")
+
+
+def test_crossfade_concat_overlaps_boundaries():
+    a = np.full(100, 1000, dtype=np.int16)
+    b = np.full(100, -1000, dtype=np.int16)
+    out = crossfade_concat([a, b], fade_samples=10)
+
+    assert len(out) == 190
+    assert out[0] == 1000 and out[-1] == -1000
+    # Monotonic ramp across the overlap
+    assert np.all(np.diff(out[89:101].astype(int)) <= 0)
+
+
+def test_trim_silence():
+    samples = np.array([0, 3, 500, -700, 2, 0], dtype=np.int16)
+    assert list(trim_silence(samples)) == [500, -700]
+    assert len(trim_silence(np.zeros(10, dtype=np.int16))) == 0
+
+
+def test_template_tts_renders_fixed_text_once():
+    tts = ToneTTS()
+    spliced = TemplateTTS(CachedTTS(tts, cache=TTSCache()), templates=TEMPLATES)
+
+    asyncio.run(spliced.synthesize(GREETING.format(customer_name="Rahul")))
+    asyncio.run(spliced.synthesize(GREETING.format(customer_name="Priya")))
+    audio = asyncio.run(spliced.synthesize(GREETING.format(customer_name="Rahul")))
+
+    assert tts.rendered == ["Hello, am I speaking with", "Rahul?", "Priya?"]
+
+    # Both pieces, trimmed, joined by the gap minus two crossfades
+    expected = 80 * len("Hello, am I speaking with") + 80 * len("Rahul?")
+    expected += len(spliced.gap) - 2 * spliced.fade_samples
+    assert len(audio) == expected * 2
+
+
+def test_template_tts_passes_other_text_through():
+    tts = ToneTTS()
+    spliced = TemplateTTS(CachedTTS(tts, cache=TTSCache()), templates=TEMPLATES)
+
+    asyncio.run(spliced.synthesize("Thank you for your time. Have a good day."))
+    assert tts.rendered == ["Thank you for your time. Have a good day."]
+    assert "Hello, am I speaking with" in spliced.constants()
+
+
+def test_template_tts_keeps_names_off_disk(tmp_path):
+    cache = TTSCache(directory=tmp_path)
+    spliced = TemplateTTS(CachedTTS(ToneTTS(), cache=cache), templates=TEMPLATES)
+
+    asyncio.run(spliced.synthesize(GREETING.format(customer_name="Rahul")))
+    asyncio.run(spliced.synthesize(CONFIRM_DATE.format(date="Jan 25")))
+
+    on_disk = {path.stem for path in tmp_path.rglob("*.pcm")}
+    assert spliced.tts.key("Rahul?") not in on_disk
+    assert spliced.tts.key("Hello, am I speaking with") in on_disk
+    assert spliced.tts.key("Jan 25?") in on_disk
+    # Still replayed from memory within the process
+    assert cache.memory.get(spliced.tts.key("Rahul?")) is not None
+
+
+def test_template_tts_splices_mulaw_in_the_linear_domain():
+    class MulawToneTTS(ToneTTS):
+        format = MULAW_8K
+
+        def synthesize(self, text: str) -> bytes:
+            return encode(np.frombuffer(super().synthesize(text), dtype=np.int16), "mulaw").tobytes()
+
+    spliced = TemplateTTS(CachedTTS(MulawToneTTS(), cache=TTSCache()), templates=TEMPLATES)
+    audio = asyncio.run(spliced.synthesize(GREETING.format(customer_name="Rahul")))
+
+    # Same length as the linear16 splice, one byte per sample
+    expected = 80 * len("Hello, am I speaking with") + 80 * len("Rahul?")
+    expected += len(spliced.gap) - 2 * spliced.fade_samples
+    assert len(audio) == expected
+    pcm = decode(audio, "mulaw")
+    # Both tones survive: leading and trailing samples are not line noise
+    assert abs(int(pcm[0]) - 1000) < 64 and abs(int(pcm[-1]) - 1000) < 64
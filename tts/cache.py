@@ -0,0 +1,352 @@
+"""
+TTS Audio Cache
+---------------
+
+Content-addressed PCM cache for agent replies. The key is the
+sha256 of (text, voice model, sample rate, encoding), so the same sentence in
+the same voice is rendered once and replayed on every later call.
+
+  - memory tier: LRU, evicted by total bytes held
+  - disk tier:   one raw PCM file per key, shared between processes
+                 and kept across restarts, evicted least recently
+                 used first once it holds more than its byte cap
+                 (read and written off the event loop)
+
+Renders stored with persist=False (e.g. customer names) stay in the
+memory tier only, so personal data never reaches the disk.
+
+Warm-up (pre-render every static prompt into the disk tier):
+    python -m tts.cache --warm
+"""
+
+import argparse
+import asyncio
+import hashlib
+import inspect
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator
+
+from audio.channel import run_blocking
+from audio.codec import AudioFormat
+
+CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", ".tts_cache"))
+CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+CACHE_DISK_BYTES = int(os.getenv("TTS_CACHE_DISK_MB", "512")) * 1024 * 1024
+
+
+def cache_key(text: str, model: str, sample_rate: int, encoding: str = "linear16") -> str:
+    data = f"{model}\x00{sample_rate}\x00{encoding}\x00{text}".encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+# --------------------------------------------------
+# TIERS
+# --------------------------------------------------
+
+class MemoryCache:
+    def __init__(self, max_bytes: int = CACHE_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            audio = self._items.get(key)
+            if audio is not None:
+                self._items.move_to_end(key)
+            return audio
+
+    def put(self, key: str, audio: bytes):
+        # Never let one oversized entry flush the whole tier
+        if len(audio) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+
+            self._items[key] = audio
+            self.size += len(audio)
+
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DiskCache:
+    """
+    Files are ordered by mtime, which every hit refreshes. The size
+    is tracked per process from one directory scan; files written by
+    other processes are counted at the next eviction, which rescans.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str = CACHE_DIR,
+        max_bytes: int = CACHE_DISK_BYTES,
+        low_water: float = 0.9,
+    ):
+        """
+        Eviction brings the tier down to `low_water` of `max_bytes`,
+        so it does not rescan on every put once full.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.size: int | None = None     # unknown until first put
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pcm"
+
+    def _files(self) -> list[tuple[float, int, Path]]:
+        files = []
+        for path in self.directory.glob("*/*.pcm"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue   # evicted by another process
+            files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)   # most recently used
+        except FileNotFoundError:
+            return None
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write aside and rename, so readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self._files())
+            else:
+                self.size += len(audio)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes * self.low_water:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.size = total
+
+
+class TTSCache:
+    """
+    Memory tier in front of an optional disk tier. Disk hits are
+    promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = CACHE_MEMORY_BYTES,
+        directory: Path | str | None = None,
+        max_disk_bytes: int = CACHE_DISK_BYTES,
+    ):
+        self.memory = MemoryCache(max_memory_bytes)
+        self.disk = DiskCache(directory, max_disk_bytes) if directory is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        audio = self.memory.get(key)
+        if audio is None and self.disk is not None:
+            audio = self.disk.get(key)
+            if audio is not None:
+                self.memory.put(key, audio)
+        return self._counted(audio)
+
+    def put(self, key: str, audio: bytes):
+        self.memory.put(key, audio)
+        if self.disk is not None:
+            self.disk.put(key, audio)
+
+    async def fetch(self, key: str) -> bytes | None:
+        """
+        get() for the event loop: disk reads run in a worker thread.
+        """
+        audio = self.memory.get(key)
+        if audio is None and self.disk is not None:
+            audio = await asyncio.to_thread(self.disk.get, key)
+            if audio is not None:
+                self.memory.put(key, audio)
+        return self._counted(audio)
+
+    async def store(self, key: str, audio: bytes, disk: bool = True):
+        """
+        put() for the event loop: disk writes run in a worker thread.
+        disk=False keeps the audio in the memory tier only.
+        """
+        self.memory.put(key, audio)
+        if disk and self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, audio)
+
+    def _counted(self, audio: bytes | None) -> bytes | None:
+        if audio is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return audio
+
+
+_cache: TTSCache | None = None
+
+
+def get_cache() -> TTSCache:
+    """
+    Process-wide cache shared by every call.
+    """
+    global _cache
+    if _cache is None:
+        _cache = TTSCache(directory=CACHE_DIR)
+    return _cache
+
+
+# --------------------------------------------------
+# CACHED TTS
+# --------------------------------------------------
+
+class CachedTTS:
+    """
+    Wraps any TTS with `synthesize` (sync or async) and optionally
+    an async `stream`. Cached audio is replayed without a request;
+    misses are rendered by the wrapped TTS and stored once complete.
+    """
+
+    def __init__(self, tts, cache: TTSCache | None = None, chunk_ms: int = 100):
+        self.tts = tts
+        self.cache = cache or get_cache()
+        self.model = getattr(tts, "model", type(tts).__name__)
+        self.sample_rate = getattr(tts, "sample_rate", 24000)
+        # Output encoding (e.g. mu-law from DeepgramTTS); linear16 if not declared
+        self.format = getattr(tts, "format", None) or AudioFormat("linear16", self.sample_rate)
+        self.chunk_bytes = int(self.sample_rate * chunk_ms / 1000) * self.format.sample_width
+
+    def key(self, text: str) -> str:
+        return cache_key(text, self.model, self.sample_rate, self.format.encoding)
+
+    async def synthesize(self, text: str, persist: bool = True) -> bytes:
+        """
+        persist=False keeps the render out of the disk tier.
+        """
+        key = self.key(text)
+        audio = await self.cache.fetch(key)
+        if audio is None:
+            audio = await run_blocking(self.tts.synthesize, text)
+            await self.cache.store(key, audio, disk=persist)
+        return audio
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        key = self.key(text)
+        audio = await self.cache.fetch(key)
+
+        if audio is not None:
+            for i in range(0, len(audio), self.chunk_bytes):
+                yield audio[i:i + self.chunk_bytes]
+            return
+
+        if not inspect.isasyncgenfunction(getattr(self.tts, "stream", None)):
+            audio = await run_blocking(self.tts.synthesize, text)
+            await self.cache.store(key, audio)
+            yield audio
+            return
+
+        # Only a stream played to the end is stored; a barge-in
+        # closes this generator early and leaves the cache alone
+        chunks = []
+        async for chunk in self.tts.stream(text):
+            chunks.append(chunk)
+            yield chunk
+        await self.cache.store(key, b"".join(chunks))
+
+
+# --------------------------------------------------
+# WARM-UP
+# --------------------------------------------------
+
+def static_prompts() -> tuple[str, ...]:
+    """
+    Fixed agent lines plus the fixed segments of templated replies.
+    """
+    from last_mile_delivery.agent import STATIC_RESPONSES, TEMPLATES
+    from last_mile_delivery.voice_agent import STATIC_PROMPTS
+    from tts.splice import Template
+
+    segments = tuple(c for t in TEMPLATES for c in Template(t).constants())
+    return STATIC_RESPONSES + STATIC_PROMPTS + segments
+
+
+async def warm(tts: CachedTTS, prompts: tuple[str, ...]) -> int:
+    """
+    Render every prompt not yet cached. Returns how many were rendered.
+    """
+    rendered = 0
+    for text in prompts:
+        if await tts.cache.fetch(tts.key(text)) is None:
+            await tts.synthesize(text)
+            rendered += 1
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS audio cache")
+    parser.add_argument("--warm", action="store_true",
+                        help="pre-render every static agent prompt")
+    parser.add_argument("--dir", default=str(CACHE_DIR),
+                        help="disk cache directory")
+    parser.add_argument("--model", default="aura-asteria-en")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    args = parser.parse_args()
+
+    if not args.warm:
+        parser.print_help()
+        return
+
+    from dotenv import load_dotenv
+    from tts.deepgram_tts import AsyncDeepgramTTS
+
+    load_dotenv()
+    api_key = os.getenv("DEEPGRAM_API_KEY")
+    if not api_key:
+        raise RuntimeError("DEEPGRAM_API_KEY not set")
+
+    tts = CachedTTS(
+        AsyncDeepgramTTS(api_key, model=args.model, sample_rate=args.sample_rate),
+        cache=TTSCache(directory=args.dir),
+    )
+    prompts = static_prompts()
+    rendered = asyncio.run(warm(tts, prompts))
+    print(f"🔥 Rendered {rendered} prompts, {len(prompts) - rendered} already cached ({args.dir})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,57 @@
 Deepgram Text-to-Speech
 REST streaming (deepgram-sdk 3.2.4)
 Audio is delivered ONLY via response.stream
+
+deepgram-sdk 3.2.4 downloads the whole body before returning, so
+stream() talks to the /v1/speak endpoint directly and yields raw
+PCM chunks while the rest of the sentence is still being rendered.
+
+`encoding` / `sample_rate` pick the output format: mulaw or alaw at
+8 kHz go straight onto a telephony line (see DeepgramTTS.formats).
 """
 
+import asyncio
+import threading
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterator
+
+import requests
 from deepgram import DeepgramClient, SpeakOptions
 
+from audio.codec import ALAW_8K, LINEAR16_8K, LINEAR16_16K, LINEAR16_24K, MULAW_8K, AudioFormat
+
+SPEAK_URL = "https://api.deepgram.com/v1/speak"
+
 
 class DeepgramTTS:
-    def __init__(self, api_key: str):
+    # Output formats, preferred first
+    formats = (LINEAR16_24K, MULAW_8K, ALAW_8K, LINEAR16_8K, LINEAR16_16K)
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "aura-asteria-en",
+        sample_rate: int = 24000,
+        encoding: str = "linear16",
+        url: str = SPEAK_URL,
+    ):
         self.client = DeepgramClient(api_key)
+        self.api_key = api_key
+        self.model = model
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.format = AudioFormat(encoding, sample_rate)
+        self.url = url
 
     def synthesize(self, text: str) -> bytes:
         """
         Convert text to speech and return raw PCM audio bytes
         """
         options = SpeakOptions(
-            model="aura-asteria-en",
-            encoding="linear16",
-            sample_rate=24000,
+            model=self.model,
+            encoding=self.encoding,
+            container="none",
+            sample_rate=self.sample_rate,
         )
 
         response = self.client.speak.v("1").stream(
@@ -27,13 +61,102 @@ class DeepgramTTS:
         )
 
         # ✅ AUDIO IS ONLY IN response.stream
-        audio_bytes = b""
-
-        for chunk in response.stream:
-            if isinstance(chunk, (bytes, bytearray)):
-                audio_bytes += chunk
+        audio_bytes = b"".join(
+            chunk for chunk in response.stream
+            if isinstance(chunk, (bytes, bytearray))
+        )
 
         if not audio_bytes:
             raise RuntimeError("Deepgram TTS returned empty audio stream")
 
         return audio_bytes
+
+    def stream(self, text: str, chunk_size: int = 4800) -> Iterator[bytes]:
+        """
+        Yield raw audio chunks (self.format, mono) as they arrive
+        """
+        response = requests.post(
+            self.url,
+            params={
+                "model": self.model,
+                "encoding": self.encoding,
+                "sample_rate": self.sample_rate,
+                "container": "none",
+            },
+            headers={"Authorization": f"Token {self.api_key}"},
+            json={"text": text},
+            stream=True,
+            timeout=30,
+        )
+
+        with response:
+            response.raise_for_status()
+
+            received = False
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    received = True
+                    yield chunk
+
+        if not received:
+            raise RuntimeError("Deepgram TTS returned empty audio stream")
+
+
+class AsyncDeepgramTTS(DeepgramTTS):
+    """
+    Non-blocking DeepgramTTS.
+    The SDK call runs in `executor` (the loop's default if None).
+    Cancelling the awaiting task returns at once; the request
+    finishes in the background and its result is dropped.
+    """
+
+    def __init__(self, api_key: str, executor: Executor | None = None, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.executor = executor
+
+    async def synthesize(self, text: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            super().synthesize,
+            text,
+        )
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Async version of DeepgramTTS.stream.
+        The HTTP read loop runs in `executor` and hands chunks to the
+        event loop; closing / cancelling the iterator stops the read.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for chunk in super(AsyncDeepgramTTS, self).stream(text):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as e:
+                if not stop.is_set():
+                    loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                if not stop.is_set():
+                    loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(self.executor, produce)
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            # Do not leave an unretrieved future behind
+            producer.add_done_callback(lambda f: f.exception())
@@ -0,0 +1,220 @@
+"""
+Template-Splicing TTS
+---------------------
+
+Most dynamic replies are a fixed sentence with one variable, e.g.
+"Just to confirm, should we deliver the parcel on {date}?". Instead
+of rendering the whole sentence on every call, TemplateTTS renders
+the fixed segments and the slot values separately (both through the
+TTS cache, so each is synthesized once) and splices the PCM with a
+short linear crossfade.
+
+Only the fixed segments and the `persistent_slots` (dates) go to the
+disk tier of the cache; other slot values, customer and neighbour
+names, are kept in memory only.
+
+Pieces in a G.711 encoding (mu-law / alaw TTS output for a phone
+line) are decoded to linear16 for trimming and crossfading, and the
+spliced reply is encoded back, so the output format is the TTS's own.
+
+Replies that match no template go to the wrapped TTS unchanged.
+"""
+
+import asyncio
+import re
+import string
+from typing import AsyncIterator, Iterable
+
+import numpy as np
+
+from audio.codec import decode, encode
+from tts.cache import CachedTTS
+
+# Leading punctuation of the segment after a slot is rendered with
+# the slot ("Jan 25?"), so the value keeps its sentence intonation
+_PUNCTUATION = ".,?!;:"
+
+
+class Template:
+    """
+    A str.format-style template compiled to a regex, e.g.
+    "Hello, am I speaking with {customer_name}?"
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        # (literal, slot name or None) pairs
+        self.fields = [
+            (literal, name)
+            for literal, name, _, _ in string.Formatter().parse(template)
+        ]
+        # Slot names in the order split() returns their parts
+        self.slots = [name for _, name in self.fields if name]
+
+        pattern = "".join(
+            re.escape(literal) + (f"(?P<{name}>.+?)" if name else "")
+            for literal, name in self.fields
+        )
+        self.regex = re.compile(f"^{pattern}$", re.DOTALL)
+
+    def constants(self) -> list[str]:
+        """
+        Fixed segments as rendered (slot punctuation removed).
+        """
+        return [text for kind, text in self.split(self._placeholders()) if kind == "text"]
+
+    def _placeholders(self) -> dict:
+        return {name: "" for _, name in self.fields if name}
+
+    def match(self, text: str) -> dict | None:
+        m = self.regex.match(text)
+        return m.groupdict() if m else None
+
+    def split(self, values: dict) -> list[tuple[str, str]]:
+        """
+        ("text" | "slot", words to render) parts in playback order.
+        """
+        parts = []
+
+        for literal, name in self.fields:
+            # Hand punctuation right after a slot to that slot
+            if parts and parts[-1][0] == "slot":
+                stripped = literal.lstrip(_PUNCTUATION)
+                punctuation = literal[:len(literal) - len(stripped)]
+                if punctuation:
+                    parts[-1] = ("slot", parts[-1][1] + punctuation)
+                literal = stripped
+
+            if literal.strip():
+                parts.append(("text", literal.strip()))
+
+            if name:
+                parts.append(("slot", values[name]))
+
+        return parts
+
+
+def crossfade_concat(pieces: list[np.ndarray], fade_samples: int) -> np.ndarray:
+    """
+    Join int16 clips, overlapping each boundary by `fade_samples`
+    with a linear fade-out / fade-in.
+    """
+    pieces = [p for p in pieces if len(p)]
+    if not pieces:
+        return np.zeros(0, dtype=np.int16)
+
+    fades = [
+        min(fade_samples, len(a), len(b))
+        for a, b in zip(pieces, pieces[1:])
+    ]
+    out = np.empty(sum(len(p) for p in pieces) - sum(fades), dtype=np.int16)
+
+    out[:len(pieces[0])] = pieces[0]
+    pos = len(pieces[0])
+
+    for piece, fade in zip(pieces[1:], fades):
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+            tail = out[pos - fade:pos].astype(np.float32)
+            head = piece[:fade].astype(np.float32)
+            out[pos - fade:pos] = (tail * (1.0 - ramp) + head * ramp).astype(np.int16)
+
+        out[pos:pos + len(piece) - fade] = piece[fade:]
+        pos += len(piece) - fade
+
+    return out
+
+
+def trim_silence(samples: np.ndarray, level: int = 64) -> np.ndarray:
+    """
+    Drop leading / trailing samples quieter than `level`, which TTS
+    engines pad every render with.
+    """
+    loud = np.flatnonzero(np.abs(samples.astype(np.int32)) > level)
+    if not len(loud):
+        return samples[:0]
+    return samples[loud[0]:loud[-1] + 1]
+
+
+class TemplateTTS:
+    def __init__(
+        self,
+        tts,
+        templates: Iterable[str] | None = None,
+        crossfade_ms: int = 10,
+        gap_ms: int = 60,
+        chunk_ms: int = 100,
+        persistent_slots: Iterable[str] = ("date", "dates"),
+    ):
+        if templates is None:
+            from last_mile_delivery.agent import TEMPLATES
+            templates = TEMPLATES
+
+        self.tts = tts if isinstance(tts, CachedTTS) else CachedTTS(tts)
+        self.templates = [Template(t) for t in templates]
+        self.persistent_slots = set(persistent_slots)
+        self.sample_rate = self.tts.sample_rate
+        self.model = self.tts.model
+        self.format = self.tts.format
+        self.fade_samples = int(self.sample_rate * crossfade_ms / 1000)
+        # Short pause between words so trimmed pieces do not run together
+        self.gap = np.zeros(int(self.sample_rate * gap_ms / 1000), dtype=np.int16)
+        self.chunk_bytes = int(self.sample_rate * chunk_ms / 1000) * self.format.sample_width
+
+    # --------------------------------------------------
+
+    def parts(self, text: str) -> list[tuple[str, bool]] | None:
+        """
+        (words to render, whether the render may be cached on disk)
+        in playback order, or None when no template matches.
+        """
+        for template in self.templates:
+            values = template.match(text)
+            if values is not None:
+                slots = iter(template.slots)
+                return [
+                    (words, kind == "text" or next(slots) in self.persistent_slots)
+                    for kind, words in template.split(values)
+                ]
+        return None
+
+    def constants(self) -> list[str]:
+        """
+        Every fixed segment, for cache warm-up.
+        """
+        return [c for t in self.templates for c in t.constants()]
+
+    async def _render(self, words: str, persist: bool) -> np.ndarray:
+        audio = await self.tts.synthesize(words, persist=persist)
+        return trim_silence(decode(audio, self.format.encoding))
+
+    async def _splice(self, parts: list[tuple[str, bool]]) -> bytes:
+        rendered = await asyncio.gather(*(self._render(*part) for part in parts))
+
+        pieces = []
+        for clip in rendered:
+            if pieces:
+                pieces.append(self.gap)
+            pieces.append(clip)
+
+        spliced = crossfade_concat(pieces, self.fade_samples)
+        return encode(spliced, self.format.encoding).tobytes()
+
+    # --------------------------------------------------
+
+    async def synthesize(self, text: str) -> bytes:
+        parts = self.parts(text)
+        if parts is None:
+            return await self.tts.synthesize(text)
+        return await self._splice(parts)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        parts = self.parts(text)
+        if parts is None:
+            async for chunk in self.tts.stream(text):
+                yield chunk
+            return
+
+        audio = await self._splice(parts)
+        for i in range(0, len(audio), self.chunk_bytes):
+            yield audio[i:i + self.chunk_bytes]
@@ -3,11 +3,19 @@ TTS Adapter - Abstract interface for text-to-speech services
 """
 
 import asyncio
-import os
 from abc import ABC, abstractmethod
-from dotenv import load_dotenv
+from typing import Awaitable, Protocol
 
-load_dotenv()
+
+class TextToSpeech(Protocol):
+    """
+    What the voice loop calls on a TTS: providers need not inherit
+    from anything. synthesize() may be sync (run in a worker thread)
+    or async; an async `stream(text)` is used when present.
+    """
+
+    def synthesize(self, text: str) -> bytes | Awaitable[bytes]:
+        ...
 
 
 class TTSAdapter(ABC):